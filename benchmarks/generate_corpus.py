@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Generate a synthetic mdbook tree of ASPICE specs for benchmarking spicy."""
+
+import random
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import click
+
+from spicy.parser.spec_index import anchorify
+from spicy.parser.spec_utils import _spec_link_mapping, _spec_name_variants
+
+# variants in an order where every link target is generated before the specs linking to it
+VARIANT_ORDER = [
+    "StakeholderNeed",
+    "StakeholderRequirement",
+    "SystemRequirement",
+    "SystemElement",
+    "SystemIntegration",
+    "SystemQualification",
+    "Validation",
+    "SoftwareRequirement",
+    "SoftwareArchitecture",
+    "SoftwareComponent",
+    "SoftwareUnit",
+    "SoftwareUnitTest",
+    "SoftwareUnitIntegration",
+    "SoftwareComponentTest",
+    "SoftwareIntegration",
+    "SoftwareQualification",
+    "UseCase",
+]
+
+VARIANT_CODES = {variant: code for code, variant in _spec_name_variants.items()}
+
+
+@dataclass
+class CorpusSettings:
+    """Shape of the generated corpus."""
+
+    spec_count: int
+    prefix: str = "BENCH"
+    specs_per_file: int = 50
+    max_links: int = 3
+    broken_ref_rate: float = 0.01
+    prose_words: int = 40
+    seed: int = 0
+
+
+@dataclass
+class GeneratedSpec:
+    """A spec placed in a file of the corpus."""
+
+    name: str
+    variant: str
+    file_path: Path
+
+
+@dataclass
+class CorpusSummary:
+    """What was written."""
+
+    root: Path
+    files: list[Path] = field(default_factory=list)
+    specs: list[GeneratedSpec] = field(default_factory=list)
+    broken_refs: int = 0
+
+    @property
+    def bytes(self) -> int:
+        """Return the total size of the generated markdown."""
+        return sum(path.stat().st_size for path in self.files)
+
+
+WORDS = ["the", "cookie", "delivery", "unit", "shall", "provide", "kids", "with", "warm", "cookies", "and", "milk"]
+
+
+def _snake_case(variant: str) -> str:
+    return re.sub(r"(?<!^)([A-Z])", r"_\1", variant).lower()
+
+
+def _spec_name(prefix: str, variant: str, index: int) -> str:
+    # use case IDs are feature names, not prefixed spec names, as in the test data
+    if variant == "UseCase":
+        return f"FEAT_{prefix}_{index:06d}"
+    return f"{prefix}_{VARIANT_CODES[variant]}_spec_{index:06d}"
+
+
+def _prose(rng: random.Random, word_count: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(word_count)]
+    lines = [" ".join(words[index : index + 12]) for index in range(0, len(words), 12)]
+    return "\n".join(lines).capitalize() + "."
+
+
+def _link_lines(
+    rng: random.Random,
+    settings: CorpusSettings,
+    root: Path,
+    targets: list[GeneratedSpec],
+    summary: CorpusSummary,
+) -> list[str]:
+    lines = []
+    for target in rng.sample(targets, min(len(targets), rng.randint(1, settings.max_links))):
+        if rng.random() < settings.broken_ref_rate:
+            summary.broken_refs += 1
+            lines.append(f"- {target.name}_missing")
+            continue
+        # links across directories are written from the book root, as spicy --fix-refs would
+        rel_path = target.file_path.relative_to(root).as_posix()
+        lines.append(f"- [{target.name}](/{rel_path}#{anchorify(target.name)})")
+    return lines
+
+
+def _spec_section(  # noqa: PLR0913
+    rng: random.Random,
+    settings: CorpusSettings,
+    spec: GeneratedSpec,
+    index: int,
+    *,
+    specs_by_variant: dict[str, list[GeneratedSpec]],
+    summary: CorpusSummary,
+) -> list[str]:
+    if spec.variant == "UseCase":
+        lines = [f"## Use case {index}", "", f"    ID: {spec.name}", "", _prose(rng, settings.prose_words), ""]
+    else:
+        lines = [f"## {spec.name}", "", _prose(rng, settings.prose_words), ""]
+        lines += [f"Qualification relevant: {rng.choice(['yes', 'no'])}", ""]
+    for link, target_variant in _spec_link_mapping.get(spec.variant, []):
+        if targets := specs_by_variant.get(target_variant):
+            lines += [f"{link}:", "", *_link_lines(rng, settings, summary.root, targets, summary), ""]
+    if spec.variant == "UseCase":
+        lines += ["### Description of usage", ""]
+        lines += [f"- **{title}:** {_prose(rng, 8)}" for title in ["Purpose", "Inputs", "Outputs", "Usage procedure"]]
+        lines += [f"- **Environmental constraints:** {_prose(rng, 8)}", ""]
+        lines += ["### Features, functions, and technical properties", "", _prose(rng, settings.prose_words), ""]
+        lines += ["### Impact analysis of feature", "", f"    TI class: TI{rng.randint(1, 2)}", ""]
+        lines += [_prose(rng, settings.prose_words // 2), ""]
+        lines += ["### Detectability analysis of feature", "", f"    TD class: TD{rng.randint(1, 3)}", ""]
+        lines += [_prose(rng, settings.prose_words // 2), ""]
+    return lines
+
+
+def generate_corpus(root: Path, settings: CorpusSettings) -> CorpusSummary:
+    """Write a corpus of specs across all the variants, with realistic links and a few broken refs."""
+    rng = random.Random(settings.seed)
+    summary = CorpusSummary(root)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "spicy.yaml").write_text(f"---\nprefix: {settings.prefix}\n")
+
+    specs_by_variant: dict[str, list[GeneratedSpec]] = {}
+    per_variant, remainder = divmod(settings.spec_count, len(VARIANT_ORDER))
+    for variant_index, variant in enumerate(VARIANT_ORDER):
+        count = per_variant + (1 if variant_index < remainder else 0)
+        directory = root / _snake_case(variant)
+        directory.mkdir(exist_ok=True)
+        specs: list[GeneratedSpec] = []
+        for file_index, first in enumerate(range(0, count, settings.specs_per_file)):
+            file_path = directory / f"{_snake_case(variant)}_{file_index:04d}.md"
+            lines = [f"# {variant} part {file_index}", "", _prose(rng, settings.prose_words * 2), ""]
+            for index in range(first, min(count, first + settings.specs_per_file)):
+                spec = GeneratedSpec(_spec_name(settings.prefix, variant, index), variant, file_path)
+                lines += _spec_section(rng, settings, spec, index, specs_by_variant=specs_by_variant, summary=summary)
+                specs.append(spec)
+            file_path.write_text("\n".join(lines))
+            summary.files.append(file_path)
+        specs_by_variant[variant] = specs
+        summary.specs.extend(specs)
+
+    summary_lines = ["# Summary", ""]
+    summary_lines += [f"- [{path.stem}]({path.relative_to(root).as_posix()})" for path in summary.files]
+    (root / "SUMMARY.md").write_text("\n".join(summary_lines) + "\n")
+    return summary
+
+
+@click.command()
+@click.argument("root", type=Path)
+@click.option("-n", "--spec-count", default=1000, type=int, help="Number of specs to generate.")
+@click.option("--prefix", default="BENCH", help="Project prefix for the specs.")
+@click.option("--seed", default=0, type=int, help="Random seed, for a repeatable corpus.")
+def main(root: Path, spec_count: int, prefix: str, seed: int) -> None:
+    """Generate a synthetic spec corpus under ROOT."""
+    summary = generate_corpus(root, CorpusSettings(spec_count, prefix=prefix, seed=seed))
+    click.echo(f"Wrote {len(summary.specs)} specs in {len(summary.files)} files ({summary.bytes} bytes) to {root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Measure the memory held by the parsed and linked spec elements of a synthetic corpus."""
+
+import gc
+import json
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import click
+from generate_corpus import CorpusSettings, generate_corpus
+
+from spicy.gather import build_expected_links, expand_spec_paths, parse_spec_text
+from spicy.parser.spec_index import SpecIndex
+
+if TYPE_CHECKING:
+    from spicy.parser.spec_element import SpecElement
+
+
+def measure(root: Path, prefix: str) -> dict[str, Any]:
+    """Return the bytes allocated for the elements and their links, once parsing garbage is released."""
+    files = expand_spec_paths([root])
+    texts = {path: path.read_text() for path in files}
+
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    elements: list[SpecElement] = []
+    for path, text in texts.items():
+        elements.extend(parse_spec_text(prefix, text, path))
+    build_expected_links(elements, SpecIndex(elements))
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "specs": len(elements),
+        "bytes": current - baseline,
+        "peak_bytes": peak - baseline,
+        "bytes_per_spec": (current - baseline) // max(1, len(elements)),
+    }
+
+
+@click.command()
+@click.option("-n", "--spec-count", default=10000, type=int, help="Number of specs to generate.")
+@click.option("--seed", default=0, type=int, help="Random seed for the generated corpus.")
+@click.option("-o", "--output", type=Path, default=None, help="Write the result to this JSON file.")
+def main(spec_count: int, seed: int, output: Path | None) -> None:
+    """Generate a corpus and report the memory held per parsed spec."""
+    with tempfile.TemporaryDirectory() as directory:
+        settings = CorpusSettings(spec_count, seed=seed)
+        generate_corpus(Path(directory), settings)
+        result = measure(Path(directory), settings.prefix)
+    click.echo(f"{result['specs']} specs hold {result['bytes']} bytes, {result['bytes_per_spec']} bytes per spec")
+    if output is not None:
+        output.write_text(json.dumps(result, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Compare the memory allocated and the time taken by the syntax tree and token stream spec parsers."""
+
+from __future__ import annotations
+
+import gc
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import click
+from generate_corpus import CorpusSettings, generate_corpus
+
+from spicy.gather import expand_spec_paths
+from spicy.md_read import parse_text_to_tokens
+from spicy.parser import parse_syntax_tree_to_spec_elements, parse_tokens_to_spec_elements
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from markdown_it.token import Token
+
+    from spicy.parser.spec_element import SpecElement
+
+
+def _parse_tree(prefix: str, tokens: list[Token], path: Path) -> list[SpecElement]:
+    from markdown_it.tree import SyntaxTreeNode  # noqa: PLC0415
+
+    return parse_syntax_tree_to_spec_elements(prefix, SyntaxTreeNode(tokens), path)
+
+
+BACKENDS: dict[str, Callable[[str, list[Token], Path], list[SpecElement]]] = {
+    "tree": _parse_tree,
+    "tokens": parse_tokens_to_spec_elements,
+}
+
+
+def measure(root: Path, prefix: str) -> dict[str, Any]:
+    """Return the peak bytes allocated and the seconds taken to parse each file's tokens, summed, for each backend."""
+    files = expand_spec_paths([root])
+    tokens = {path: parse_text_to_tokens(path.read_text()) for path in files}
+
+    result: dict[str, Any] = {}
+    specs: dict[str, list[dict[str, Any]]] = {}
+    for name, backend in BACKENDS.items():
+        peak_bytes = 0
+        seconds = 0.0
+        parsed = []
+        for path, file_tokens in tokens.items():
+            gc.collect()
+            tracemalloc.start()
+            elements = backend(prefix, file_tokens, path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_bytes += peak
+            start = time.perf_counter()
+            backend(prefix, file_tokens, path)
+            seconds += time.perf_counter() - start
+            parsed.extend(element.__getstate__() for element in elements)
+        specs[name] = parsed
+        result[name] = {"peak_bytes": peak_bytes, "seconds": seconds}
+    result["specs"] = len(specs["tree"])
+    result["identical"] = specs["tree"] == specs["tokens"]
+    return result
+
+
+@click.command()
+@click.option("-n", "--spec-count", default=10000, type=int, help="Number of specs to generate.")
+@click.option("--seed", default=0, type=int, help="Random seed for the generated corpus.")
+@click.option("-o", "--output", type=Path, default=None, help="Write the result to this JSON file.")
+def main(spec_count: int, seed: int, output: Path | None) -> None:
+    """Generate a corpus and compare the spec parsers on it."""
+    with tempfile.TemporaryDirectory() as directory:
+        settings = CorpusSettings(spec_count, seed=seed)
+        generate_corpus(Path(directory), settings)
+        result = measure(Path(directory), settings.prefix)
+    click.echo(f"{result['specs']} specs, identical elements: {result['identical']}")
+    for name in BACKENDS:
+        backend_result = result[name]
+        click.echo(f"{name}: {backend_result['peak_bytes']} peak bytes, {backend_result['seconds']:.2f}s")
+    if output is not None:
+        output.write_text(json.dumps(result, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Time each phase of a spicy run over synthetic corpora of increasing size."""
+
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, TypeVar
+
+import click
+from generate_corpus import CorpusSettings, generate_corpus
+
+from spicy.gather import build_expected_links, expand_spec_paths, parse_spec_text
+from spicy.md_link_check import check_markdown_refs
+from spicy.parser.spec_element import SpecElement
+from spicy.parser.spec_index import SpecIndex
+from spicy.review import render_issues_with_elements
+
+T = TypeVar("T")
+
+DEFAULT_SIZES = "1000,10000,100000"
+
+
+def timed(phase_times: dict[str, float], phase: str, function: Callable[[], T], repeat: int) -> T:
+    """Run the function repeat times, keep the best time for the phase, and return the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    phase_times[phase] = best
+    return result
+
+
+def run_phases(root: Path, prefix: str, repeat: int) -> dict[str, Any]:
+    """Time the parse, link, review and ref check phases separately over the corpus."""
+    phase_times: dict[str, float] = {}
+    files = expand_spec_paths([root])
+    texts = {path: path.read_text() for path in files}
+
+    def parse() -> list[SpecElement]:
+        return [element for path, text in texts.items() for element in parse_spec_text(prefix, text, path)]
+
+    def link() -> SpecIndex:
+        spec_index = SpecIndex(elements)
+        build_expected_links(elements, spec_index)
+        return spec_index
+
+    def review() -> bool:
+        return render_issues_with_elements(elements, config={}, render_function=issues.append, spec_index=spec_index)
+
+    def check_refs() -> list[str]:
+        return check_markdown_refs(files, base_path=root, prefix=prefix, fix_refs=False, ignored_refs=[])
+
+    elements = timed(phase_times, "parse", parse, repeat)
+    spec_index = timed(phase_times, "link", link, repeat)
+    issues: list[str] = []
+    timed(phase_times, "review", review, repeat)
+    ref_issues = timed(phase_times, "check_markdown_refs", check_refs, repeat)
+
+    return {
+        "files": len(files),
+        "bytes": sum(len(text) for text in texts.values()),
+        "specs": len(elements),
+        "review_lines": len(issues) // repeat,
+        "ref_issues": len(ref_issues),
+        "seconds": phase_times,
+    }
+
+
+def git_revision() -> str | None:
+    """Return the commit being benchmarked, if this is a git checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+@click.command()
+@click.option("--sizes", default=DEFAULT_SIZES, help="Comma separated spec counts to benchmark.")
+@click.option("--repeat", default=1, type=click.IntRange(min=1), help="Times to run each phase, keeping the best.")
+@click.option("--seed", default=0, type=int, help="Random seed for the generated corpora.")
+@click.option("-o", "--output", type=Path, default=None, help="Write the results to this JSON file.")
+def main(sizes: str, repeat: int, seed: int, output: Path | None) -> None:
+    """Generate a corpus of each size and time the phases of spicy over it."""
+    results: dict[str, Any] = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+        "repeat": repeat,
+        "runs": [],
+    }
+    for size in (int(size) for size in sizes.split(",")):
+        with tempfile.TemporaryDirectory() as directory:
+            settings = CorpusSettings(size, seed=seed)
+            generate_corpus(Path(directory), settings)
+            run = {"spec_count": size, **run_phases(Path(directory), settings.prefix, repeat)}
+        results["runs"].append(run)
+        phases = ", ".join(f"{phase} {seconds:.3f}s" for phase, seconds in run["seconds"].items())
+        click.echo(f"{size} specs in {run['files']} files: {phases}")
+
+    if output is not None:
+        output.write_text(json.dumps(results, indent=2) + "\n")
+        click.echo(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Write the parsed specs of some of the files as a JSON index, and merge the indexes for checking together.
+
+An index of one file depends only on the file and the prefix, so build systems can cache it as a compiled artifact.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .md_scan import MarkdownScan
+from .parser.spec_element import SpecElement
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .documents import DocumentStore
+
+logger = logging.getLogger(__name__)
+
+# bump this when the layout of an index changes
+ARTIFACT_FORMAT = 1
+
+
+@dataclass
+class FileArtifact:
+    """The specs, and the sections, references and links, found in one markdown file."""
+
+    path: Path
+    # the sha256 of the text of the file
+    digest: str
+    elements: list[SpecElement]
+    scan: MarkdownScan
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the file as plain data, for writing as JSON."""
+        return {
+            "path": self.path.as_posix(),
+            "digest": self.digest,
+            "specs": [element.to_dict() for element in self.elements],
+            "scan": self.scan.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> FileArtifact:
+        """Return the file from the data written by to_dict."""
+        return cls(
+            Path(data["path"]),
+            data["digest"],
+            [SpecElement.from_dict(element) for element in data["specs"]],
+            MarkdownScan.from_dict(data["scan"]),
+        )
+
+
+@dataclass
+class PartialIndex:
+    """The parsed files of a run, or of one shard of a run, with what is needed to check them without the files."""
+
+    prefix: str
+    files: list[FileArtifact] = field(default_factory=list)
+    # the shard number, counting from 1, and the number of shards, if this is one shard of a run
+    shard: tuple[int, int] | None = None
+
+    @property
+    def elements(self) -> list[SpecElement]:
+        """Return the specs of every file, in the order of the files."""
+        return [element for artifact in self.files for element in artifact.elements]
+
+    @property
+    def scans(self) -> dict[Path, MarkdownScan]:
+        """Return the scan of each file."""
+        return {artifact.path: artifact.scan for artifact in self.files}
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the index as plain data, for writing as JSON."""
+        return {
+            "format": ARTIFACT_FORMAT,
+            "prefix": self.prefix,
+            "shard": self.shard,
+            "files": [artifact.to_dict() for artifact in self.files],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PartialIndex:
+        """Return the index from the data written by to_dict, raising ValueError if it is of another format."""
+        if not isinstance(data, dict) or data.get("format") != ARTIFACT_FORMAT:
+            msg = f"not a spicy index of format {ARTIFACT_FORMAT}"
+            raise ValueError(msg)
+        shard = data.get("shard")
+        return cls(
+            data["prefix"],
+            [FileArtifact.from_dict(artifact) for artifact in data["files"]],
+            None if shard is None else (shard[0], shard[1]),
+        )
+
+    def write(self, path: Path) -> None:
+        """Write the index as compact JSON."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), separators=(",", ":")))
+
+    @classmethod
+    def read(cls, path: Path) -> PartialIndex:
+        """Read an index, raising ValueError if it is not one."""
+        try:
+            return cls.from_dict(json.loads(path.read_text()))
+        except (json.JSONDecodeError, KeyError, TypeError) as error:
+            msg = f"not a spicy index ({error})"
+            raise ValueError(msg) from error
+
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """Return the shard number and the number of shards from I/N, raising ValueError if it is not one of them."""
+    number, _, count = text.partition("/")
+    if not (number.isdigit() and count.isdigit() and 1 <= int(number) <= int(count)):
+        msg = f"{text} is not a shard: use I/N, with I from 1 to N"
+        raise ValueError(msg)
+    return int(number), int(count)
+
+
+def shard_of(path: Path, base_path: Path, count: int) -> int:
+    """Return the shard of a file, from a checksum of its path relative to the base path, counting from 1."""
+    relative = path.relative_to(base_path) if path.is_relative_to(base_path) else path
+    return zlib.crc32(relative.as_posix().encode()) % count + 1
+
+
+def select_shard(paths: list[Path], base_path: Path, shard: tuple[int, int]) -> list[Path]:
+    """Return the files in the shard, in the order given."""
+    number, count = shard
+    return [path for path in paths if shard_of(path, base_path, count) == number]
+
+
+def build_partial_index(
+    prefix: str,
+    paths: list[Path],
+    elements_per_file: list[list[SpecElement]],
+    documents: DocumentStore,
+    *,
+    shard: tuple[int, int] | None = None,
+) -> PartialIndex:
+    """Return the index of the parsed files, scanning each for its sections, references and links."""
+    files = [
+        FileArtifact(
+            path,
+            hashlib.sha256(documents.text(path).encode()).hexdigest(),
+            elements,
+            documents.scan(path, prefix),
+        )
+        for path, elements in zip(paths, elements_per_file, strict=True)
+    ]
+    return PartialIndex(prefix, files, shard)
+
+
+def read_indexes(paths: list[Path]) -> list[PartialIndex]:
+    """Read the indexes, taking every JSON file in a directory, raising ValueError naming any unreadable file."""
+    index_paths = [
+        index_path for path in paths for index_path in (sorted(path.glob("*.json")) if path.is_dir() else [path])
+    ]
+    return [_read_index(index_path) for index_path in index_paths]
+
+
+def _read_index(path: Path) -> PartialIndex:
+    try:
+        return PartialIndex.read(path)
+    except (OSError, ValueError) as error:
+        msg = f"{path}: {error}"
+        raise ValueError(msg) from error
+
+
+def merge_indexes(indexes: list[PartialIndex]) -> PartialIndex:
+    """Return one index of the files of all the indexes, in the order a run over every file would parse them.
+
+    Raises ValueError if the indexes are for different prefixes, if they are shards of runs split into different
+    numbers of shards, if shards of a run are missing, or if two indexes have different content for the same file.
+    """
+    if not indexes:
+        msg = "no indexes to merge"
+        raise ValueError(msg)
+    prefix = indexes[0].prefix
+    if other_prefixes := {index.prefix for index in indexes} - {prefix}:
+        msg = f"cannot merge indexes of {prefix} and of {', '.join(sorted(other_prefixes))}"
+        raise ValueError(msg)
+    if shards := {index.shard for index in indexes if index.shard is not None}:
+        counts = {shard_count for _, shard_count in shards}
+        if len(counts) > 1:
+            listed = ", ".join(f"{number}/{shard_count}" for number, shard_count in sorted(shards))
+            msg = f"cannot merge shards of runs split {' and '.join(map(str, sorted(counts)))} ways: {listed}"
+            raise ValueError(msg)
+        (count,) = counts
+        if missing := [f"{number}/{count}" for number in range(1, count + 1) if (number, count) not in shards]:
+            msg = f"missing shards {', '.join(missing)}"
+            raise ValueError(msg)
+
+    files: dict[Path, FileArtifact] = {}
+    for index in indexes:
+        for artifact in index.files:
+            if files.setdefault(artifact.path, artifact).digest != artifact.digest:
+                msg = f"more than one version of {artifact.path}"
+                raise ValueError(msg)
+    return PartialIndex(prefix, [files[path] for path in sorted(files)])
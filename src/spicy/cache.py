@@ -0,0 +1,213 @@
+"""Persistent cache of parsed spec elements, keyed by the content of each markdown file.
+
+Entries are written as JSON, never pickled, so a cache entry planted in a checkout cannot run any code.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from functools import cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable
+
+    from .parser.spec_element import SpecElement
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# bump this when the layout of a cache entry changes
+CACHE_FORMAT = 3
+
+REVISIONS = "revisions"
+# the names of the directories of entries, and of the entries and their temporary files, as spicy writes them
+_re_entry_directory = re.compile(r"[0-9a-f]{2}")
+_re_entry_file = re.compile(r"[0-9a-f]{64}\.(?:json|tmp)")
+
+
+def user_cache_directory() -> Path:
+    """Return the directory for spicy's caches in the user's cache directory of the platform."""
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "spicy"
+
+
+def default_cache_directory(working_directory: Path | None = None) -> Path:
+    """Return the cache directory for runs from the working directory, outside of it.
+
+    Each working directory has its own, so runs in different checkouts keep their own caches and daemons.
+    """
+    working_directory = (working_directory or Path.cwd()).resolve()
+    return user_cache_directory() / hashlib.sha256(str(working_directory).encode()).hexdigest()[:16]
+
+
+def spicy_version() -> str:
+    """Return the installed version of spicy, or a placeholder if it is not installed."""
+    from importlib.metadata import PackageNotFoundError, version  # noqa: PLC0415
+
+    try:
+        return version("spicy")
+    except PackageNotFoundError:  # pragma: no cover
+        return "unknown"
+
+
+@cache
+def source_digest() -> str:
+    """Return a digest of the source files of spicy.
+
+    The version of a checkout does not change as its code is edited, so the parses of an edited parser are told
+    apart from those of the code it replaced by its source.
+    """
+    package_directory = Path(__file__).parent
+    digest = hashlib.sha256()
+    for source_path in sorted(package_directory.rglob("*.py")):
+        digest.update(source_path.relative_to(package_directory).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(source_path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def cache_fingerprint(project_prefix: str) -> str:
+    """Return the part of the cache key shared by every file in a run."""
+    return f"{CACHE_FORMAT}:{spicy_version()}:{source_digest()}:{project_prefix}"
+
+
+class ParseCache:
+    """Store and retrieve the parsed elements of a file on disk."""
+
+    def __init__(self, cache_directory: Path, project_prefix: str) -> None:
+        """Construct the basic properties."""
+        self.cache_directory = cache_directory
+        self.fingerprint = cache_fingerprint(project_prefix)
+        self.hits = 0
+        self.misses = 0
+        # cleared when the cache cannot be written, so the run carries on without storing anything more
+        self.writable = True
+
+    def key(self, file_path: Path, text: str) -> str:
+        """Return the cache key for a file with the given content."""
+        digest = hashlib.sha256()
+        for part in (self.fingerprint, str(file_path), text):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_directory / key[:2] / f"{key}.json"
+
+    def load(self, file_path: Path, text: str) -> list[SpecElement] | None:
+        """Return the cached elements for the file, or None if there are none."""
+        from .parser.spec_element import SpecElement  # noqa: PLC0415
+
+        entry_path = self._entry_path(self.key(file_path, text))
+        elements = _read_elements(entry_path, lambda data: [SpecElement.from_dict(x) for x in data])
+        if elements is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return elements
+
+    def store(self, file_path: Path, text: str, elements: list[SpecElement]) -> None:
+        """Write the parsed elements for the file to the cache."""
+        self._write(self._entry_path(self.key(file_path, text)), [element.to_dict() for element in elements])
+
+    def _revision_path(self, revision: str) -> Path:
+        digest = hashlib.sha256(f"{self.fingerprint}\0{revision}".encode()).hexdigest()
+        return self.cache_directory / REVISIONS / f"{digest}.json"
+
+    def load_revision(self, revision: str) -> dict[str, list[SpecElement]]:
+        """Return the elements recorded for the files of a revision, by path, or nothing if none are."""
+        from .parser.spec_element import SpecElement  # noqa: PLC0415
+
+        elements_by_path = _read_elements(
+            self._revision_path(revision),
+            lambda data: {path: [SpecElement.from_dict(x) for x in elements] for path, elements in data.items()},
+        )
+        return elements_by_path or {}
+
+    def store_revision(self, revision: str, elements_by_path: dict[str, list[SpecElement]]) -> None:
+        """Write the elements of the files of a revision, by path."""
+        self._write(
+            self._revision_path(revision),
+            {path: [element.to_dict() for element in elements] for path, elements in elements_by_path.items()},
+        )
+
+    def _write(self, path: Path, data: Any) -> None:  # noqa: ANN401
+        """Write the entry, or warn and stop writing if the cache directory cannot be written."""
+        if not self.writable:
+            return
+        try:
+            _write_json(path, data)
+        except OSError as error:
+            self.writable = False
+            logger.warning("Unable to write to the parse cache, so running without it: %s", error)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache.
+
+        Only the files spicy writes are removed, so anything else in the directory, such as a daemon's socket, is kept.
+        The directories are removed once they are empty.
+        """
+        if not self.cache_directory.is_dir():
+            return
+        try:
+            for directory in self.cache_directory.iterdir():
+                if directory.name != REVISIONS and not _re_entry_directory.fullmatch(directory.name):
+                    continue
+                if directory.is_symlink() or not directory.is_dir():
+                    continue
+                for entry in directory.iterdir():
+                    if _re_entry_file.fullmatch(entry.name) and entry.is_file():
+                        entry.unlink()
+                _remove_if_empty(directory)
+        except OSError as error:
+            logger.warning("Unable to clear the parse cache: %s", error)
+        _remove_if_empty(self.cache_directory)
+
+    def summary(self) -> str:
+        """Return a short report of the cache usage."""
+        return f"Parse cache: {self.hits} hits, {self.misses} misses"
+
+
+def _remove_if_empty(directory: Path) -> None:
+    try:
+        directory.rmdir()
+    except OSError:
+        logger.debug("Kept %s, which holds files spicy did not write", directory)
+
+
+def _read_elements(path: Path, from_data: Callable[[Any], T]) -> T | None:
+    """Return the elements read from the JSON file, or None if there is no such file, or it is unreadable."""
+    try:
+        with path.open(encoding="utf-8") as fh:
+            return from_data(json.load(fh))
+    except FileNotFoundError:
+        return None
+    except OSError as error:
+        logger.debug("Unable to read cache entry %s: %s", path, error)
+        return None
+    except (ValueError, KeyError, TypeError, AttributeError):
+        logger.warning("Ignoring unreadable cache entry %s", path)
+        return None
+
+
+def _write_json(path: Path, data: Any) -> None:  # noqa: ANN401
+    """Write the data as JSON, replacing the file at once, so a reader never sees it half written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_suffix(".tmp")
+    with temporary_path.open("w", encoding="utf-8") as fh:
+        json.dump(data, fh, separators=(",", ":"))
+    temporary_path.replace(path)
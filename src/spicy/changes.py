@@ -0,0 +1,190 @@
+"""Analyse only the specs affected by the files changed since a git revision."""
+
+import logging
+import subprocess
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .cache import ParseCache
+from .documents import DocumentStore
+from .gather import expand_spec_paths, index_spec_elements, parse_spec_files, parse_spec_text
+from .parser.spec_element import SpecElement
+from .parser.spec_index import SpecIndex
+from .parser.spec_utils import expected_links_for_variant, section_name_to_key
+from .stats import RunStats
+
+logger = logging.getLogger(__name__)
+
+# the slots of a spec element set by where it is, or derived from other specs
+POSITION_SLOTS = ("expected_links", "file_path", "ordering_id")
+
+
+def git(*args: str, cwd: Path) -> str:
+    """Return the output of a git command, raising CalledProcessError if it fails."""
+    result = subprocess.run(["git", *args], capture_output=True, check=True, text=True, cwd=cwd)
+    return result.stdout
+
+
+def git_directory(path: Path) -> Path:
+    """Return a directory to run git in for the path."""
+    return path if path.is_dir() else path.parent
+
+
+@dataclass
+class Changes:
+    """The files changed between a revision and the working tree."""
+
+    revision: str
+    top_level: Path
+    # paths relative to the top level, including files added, removed and not yet tracked
+    paths: set[str]
+
+    @classmethod
+    def since(cls, ref: str, cwd: Path) -> "Changes":
+        """Ask git for the files changed since the ref."""
+        revision = git("rev-parse", "--verify", f"{ref}^{{commit}}", cwd=cwd).strip()
+        top_level = Path(git("rev-parse", "--show-toplevel", cwd=cwd).strip())
+        changed = git("diff", "--name-only", "--no-renames", revision, "--", cwd=cwd).splitlines()
+        untracked = git("ls-files", "--others", "--exclude-standard", cwd=top_level).splitlines()
+        return cls(revision, top_level, {*changed, *untracked})
+
+    def relative(self, path: Path) -> str | None:
+        """Return the path as git names it, relative to the top level, or None if it is outside the repository."""
+        try:
+            return path.resolve().relative_to(self.top_level.resolve()).as_posix()
+        except ValueError:
+            return None
+
+    def contains(self, path: Path) -> bool:
+        """Return whether the file changed, counting files outside the repository as changed."""
+        relative = self.relative(path)
+        return relative is None or relative in self.paths
+
+    def base_text(self, path: str) -> str | None:
+        """Return the text of a file at the revision, or None if it did not exist then."""
+        try:
+            return git("show", f"{self.revision}:{path}", cwd=self.top_level)
+        except subprocess.CalledProcessError:
+            return None
+
+
+@dataclass
+class ChangedSpecIndex:
+    """The index of every spec, and the names of the specs affected by the changes."""
+
+    spec_index: SpecIndex
+    affected: set[str]
+    changed_files: int
+
+
+def gather_changed_spec_index(  # noqa: PLR0913
+    project_prefix: str,
+    file_paths: list[Path],
+    changes: Changes,
+    *,
+    cache: ParseCache,
+    jobs: int = 1,
+    documents: DocumentStore | None = None,
+    stats: RunStats | None = None,
+    config: Mapping[str, Any] | None = None,
+) -> ChangedSpecIndex:
+    """Return the index with only the changed files parsed, and the rest from the index of the revision.
+
+    The revision index is kept in the cache, and filled in from the working tree for unchanged files
+    it does not have yet, and from git for changed files, so later runs against the same revision parse less.
+    """
+    paths = expand_spec_paths(file_paths, config=config)
+    base = cache.load_revision(changes.revision)
+    base_size = len(base)
+
+    changed_paths = [path for path in paths if changes.contains(path)]
+    unknown_paths = [path for path in paths if str(path) not in base and not changes.contains(path)]
+    parsed = parse_spec_files(
+        project_prefix,
+        changed_paths + unknown_paths,
+        jobs=jobs,
+        cache=cache,
+        documents=documents,
+        stats=stats,
+    )
+    current = dict(zip(map(str, changed_paths), parsed, strict=False))
+    base.update(zip(map(str, unknown_paths), parsed[len(changed_paths) :], strict=True))
+
+    # the specs of the changed files as they were, to find the specs changed, removed or renamed by the change
+    before_specs: list[SpecElement] = []
+    for path in changed_paths:
+        if str(path) not in base and (relative := changes.relative(path)) is not None:
+            base_text = changes.base_text(relative)
+            base[str(path)] = [] if base_text is None else parse_spec_text(project_prefix, base_text, path)
+        before_specs.extend(base.get(str(path), []))
+    listed = {changes.relative(path) for path in paths}
+    roots = [changes.relative(root) for root in file_paths]
+    for removed in sorted(changes.paths - listed):
+        if removed.endswith(".md") and any(_is_within(removed, root) for root in roots):
+            base_text = changes.base_text(removed)
+            if base_text is not None:
+                before_specs.extend(parse_spec_text(project_prefix, base_text, Path(removed)))
+    before = {element.name: _statement(element) for element in before_specs}
+    after = {element.name: _statement(element) for elements in current.values() for element in elements}
+    changed_names = {name for name in before.keys() | after.keys() if before.get(name) != after.get(name)}
+    # a link a changed spec no longer has affects the spec it linked to, which may now be missing a link
+    previous_targets = {
+        name for element in before_specs if element.name in changed_names for name in _link_targets(element)
+    }
+
+    if len(base) > base_size:
+        cache.store_revision(changes.revision, base)
+    logger.info(
+        "Parsed %s changed files, the other %s are from the index of %s",
+        len(changed_paths),
+        len(paths) - len(changed_paths),
+        changes.revision,
+    )
+
+    specs = [spec for path in paths for spec in (current[str(path)] if str(path) in current else base[str(path)])]
+    spec_index = index_spec_elements(specs, stats=stats)
+    affected = affected_specs(spec_index, changed_names, previous_targets)
+    return ChangedSpecIndex(spec_index, affected, len(changed_paths))
+
+
+def _statement(element: SpecElement) -> dict[str, Any]:
+    """Return what the spec says, leaving out where it is, so moving it within its file is not a change."""
+    state = element.__getstate__()
+    for slot in POSITION_SLOTS:
+        state.pop(slot)
+    return state
+
+
+def _is_within(path: str, root: str | None) -> bool:
+    return root is not None and (root in {".", path} or path.startswith(f"{root}/"))
+
+
+def _link_targets(element: SpecElement) -> set[str]:
+    """Return the names the spec links to, under any of the links of its variant."""
+    return {
+        name
+        for link, _ in expected_links_for_variant(element.variant, include_optional=True)
+        for name in element.get_linked_by(section_name_to_key(link) or link)
+    }
+
+
+def affected_specs(
+    spec_index: SpecIndex,
+    changed_names: set[str],
+    previous_targets: set[str] | None = None,
+) -> set[str]:
+    """Return the changed names, with the specs linking to them and the specs they link to.
+
+    The previous targets, the specs the changed specs linked to before the change, are affected too.
+    """
+    affected = changed_names | (previous_targets or set())
+    for spec in spec_index.elements:
+        for link, _ in expected_links_for_variant(spec.variant, include_optional=True):
+            targets = spec_index.links_from(spec, section_name_to_key(link) or link)
+            if spec.name in changed_names:
+                affected.update(targets)
+            elif not changed_names.isdisjoint(targets):
+                affected.add(spec.name)
+    return affected
@@ -1,20 +1,60 @@
 """Handle looking for and loading the spicy config file for a target document directory."""
 
 import logging
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
-import yaml
+from .md_link_check import IgnoredRefs
+from .parser.spec_utils import IgnoredTable, ignored_table
 
 logger = logging.getLogger(__name__)
 
+CONFIG_FILE_NAME = "spicy.yaml"
 
-def load_spicy_config(config_directory: Path, **kwargs: str | None) -> dict[str, Any]:
-    """Load the spicy.yaml file from the config path provided, or default to an empty dictionary."""
-    config: dict[str, str] = {}
+
+class CompiledConfig(dict[str, Any]):
+    """The config, with the lookup tables used by the checks built once rather than for every spec.
+
+    The tables are built the first time they are used, so the config should not change after that.
+    """
+
+    @cached_property
+    def ignored_link_table(self) -> IgnoredTable:
+        """Return the ignored links, as the lower case target for each lower case link name of a variant."""
+        return ignored_table(self.get("ignored_links", {}))
+
+    @cached_property
+    def ignored_dependency_table(self) -> IgnoredTable:
+        """Return the ignored dependencies, as the lower case link name for each lower case source of a variant."""
+        return ignored_table(self.get("ignored_dependencies", {}))
+
+    @cached_property
+    def ignored_ref_matcher(self) -> IgnoredRefs:
+        """Return the matcher for the ignored_refs patterns."""
+        return IgnoredRefs(self.get("ignored_refs", []))
+
+
+def compile_config(config: dict[str, Any]) -> CompiledConfig:
+    """Return the config as a CompiledConfig, without copying it if it already is one."""
+    if isinstance(config, CompiledConfig):
+        return config
+    return CompiledConfig(config)
+
+
+def find_config_file(config_directory: Path) -> Path:
+    """Return the path of the spicy.yaml file for the config path, the directory itself or that of a file in it."""
     if not config_directory.is_dir():
         config_directory = config_directory.parent
-    config_file_path = config_directory / "spicy.yaml"
+    return config_directory / CONFIG_FILE_NAME
+
+
+def load_spicy_config(config_directory: Path, **kwargs: str | None) -> CompiledConfig:
+    """Load the spicy.yaml file from the config path provided, or default to an empty dictionary."""
+    import yaml  # noqa: PLC0415
+
+    config: dict[str, str] = {}
+    config_file_path = find_config_file(config_directory)
     loaded_config: dict[Any, Any] | None = None
     try:
         with config_file_path.open() as fh:
@@ -28,4 +68,4 @@ def load_spicy_config(config_directory: Path, **kwargs: str | None) -> dict[str,
     for keyword, value in kwargs.items():
         if isinstance(value, str):
             config[keyword] = value
-    return config
+    return CompiledConfig(config)
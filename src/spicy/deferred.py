@@ -0,0 +1,23 @@
+"""Defer expensive logging arguments until a log record is actually formatted."""
+
+from collections.abc import Callable
+from typing import Any
+
+
+class Deferred:
+    """Call a function to produce a logging argument only when the message is rendered.
+
+    Logging formats its arguments lazily, so wrapping an expensive call in Deferred
+    means it is never made when the log level is disabled.
+    """
+
+    __slots__ = ("args", "function")
+
+    def __init__(self, function: Callable[..., Any], *args: Any) -> None:  # noqa: ANN401
+        """Store the function and the arguments to call it with."""
+        self.function = function
+        self.args = args
+
+    def __str__(self) -> str:
+        """Return the result of the deferred call as a string."""
+        return str(self.function(*self.args))
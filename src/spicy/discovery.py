@@ -0,0 +1,227 @@
+"""Find the markdown files of a spec tree, leaving out the excluded and git ignored ones."""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterable, Mapping, Sequence
+
+logger = logging.getLogger(__name__)
+
+GITIGNORE = ".gitignore"
+# a directory modified this recently could change again within the resolution of its modification time,
+# so its listing is not kept
+_RACY_NANOSECONDS = 2_000_000_000
+
+# the parts of a gitignore glob: a leading or inner **/, a trailing /**, wildcards, classes, escapes and characters
+_re_glob_token = re.compile(r"(?:^|(?<=/))\*\*/|/\*\*$|\*\*?|\?|\[!?\]?[^]]*\]|\\.|.", re.DOTALL)
+_re_trailing_spaces = re.compile(r"(?<!\\) +$")
+
+
+def _translate_token(token: str) -> str:
+    if token == "**/":
+        return "(?:.*/)?"
+    if token == "/**":
+        return "/.*"
+    if token in {"*", "**"}:
+        return "[^/]*"
+    if token == "?":
+        return "[^/]"
+    if token.startswith("[") and len(token) > 1:
+        body = token[1:-1].replace("\\", "\\\\").replace("[", "\\[")
+        return f"[^{body[1:]}]" if body.startswith("!") else f"[{body}]"
+    return re.escape(token.removeprefix("\\") or token)
+
+
+@dataclass(frozen=True)
+class IgnorePattern:
+    """A gitignore pattern, as a regular expression matching the whole path relative to the file it is in."""
+
+    regex: re.Pattern[str]
+    negated: bool
+    directory_only: bool
+
+    @classmethod
+    def parse(cls, line: str) -> IgnorePattern | None:
+        """Return the pattern of a gitignore line, or None for blank lines and comments."""
+        line = _re_trailing_spaces.sub("", line.rstrip("\r\n"))
+        if not line or line.startswith("#"):
+            return None
+        negated = line.startswith("!")
+        line = line.removeprefix("!")
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+        # a pattern with a slash before its end is relative to the file's directory, any other matches at any depth
+        anchored = "/" in line
+        body = "".join(map(_translate_token, _re_glob_token.findall(line.removeprefix("/"))))
+        return cls(re.compile(body if anchored else f"(?:.*/)?{body}"), negated, directory_only)
+
+
+def parse_ignore_patterns(lines: Iterable[str]) -> tuple[IgnorePattern, ...]:
+    """Return the patterns of the lines of a gitignore file."""
+    return tuple(pattern for line in lines if (pattern := IgnorePattern.parse(line)) is not None)
+
+
+@dataclass(frozen=True)
+class IgnoreRules:
+    """The patterns of one gitignore file, and where it is relative to the directory being searched.
+
+    Paths are given relative to the searched directory, with / separators.
+    The rules of a file inside it strip the directory of the file from them,
+    and the rules of a file above it add the searched directory's path relative to the file.
+    """
+
+    patterns: tuple[IgnorePattern, ...]
+    directory: str = ""
+    offset: str = ""
+
+    def decide(self, relative: str, *, is_dir: bool) -> bool | None:
+        """Return whether the last pattern matching the path ignores it, or None if no pattern matches it."""
+        path = self.offset + relative[len(self.directory) :]
+        for pattern in reversed(self.patterns):
+            if (is_dir or not pattern.directory_only) and pattern.regex.fullmatch(path):
+                return not pattern.negated
+        return None
+
+
+def is_ignored(rules: Sequence[IgnoreRules], relative: str, *, is_dir: bool) -> bool:
+    """Return whether the path is ignored, the rules given last taking precedence."""
+    for file_rules in reversed(rules):
+        if (decision := file_rules.decide(relative, is_dir=is_dir)) is not None:
+            return decision
+    return False
+
+
+def find_git_root(directory: Path) -> Path | None:
+    """Return the top directory of the git work tree the directory is in, or None if it is not in one."""
+    # abspath rather than resolve, so .. is taken as written, not through symbolic links
+    directory = Path(os.path.abspath(directory))  # noqa: PTH100
+    return next((parent for parent in (directory, *directory.parents) if (parent / ".git").exists()), None)
+
+
+# the markdown file and subdirectory names of a directory, sorted, each with whether it is a directory,
+# and whether the directory has a gitignore file
+Listing = tuple[tuple[tuple[str, bool], ...], bool]
+
+
+class SpecFileFinder:
+    """Find the markdown files under a directory, in the order of their paths, with one walk of the tree.
+
+    Files matching the exclude patterns, given in gitignore syntax relative to the directory, are left out,
+    as are the files ignored by git, when the directory is in a git work tree.
+    Directories which are left out are not walked at all, and symbolic links to directories are not followed.
+    The listing of each directory is kept until the directory changes,
+    so finding the files again, as watching does, only lists the directories which changed.
+    """
+
+    def __init__(self, root: Path, *, exclude: Iterable[str] = (), gitignore: bool = True) -> None:
+        """Construct the finder, looking for the git work tree the directory is in, if git ignores are used."""
+        self.root = root
+        self.exclude = IgnoreRules(parse_ignore_patterns(exclude))
+        self.git_root = find_git_root(root) if gitignore else None
+        self.listed = 0
+        self._listings: dict[str, tuple[int, Listing]] = {}
+        self._ignore_files: dict[str, tuple[tuple[int, int], tuple[IgnorePattern, ...]]] = {}
+
+    def find(self) -> list[Path]:
+        """Return the markdown files which are not left out, sorted as their paths are."""
+        found: list[Path] = []
+        self._walk(str(self.root), "", self._outer_rules(), found)
+        return found
+
+    def _outer_rules(self) -> list[IgnoreRules]:
+        """Return the rules of the gitignore files in the directories of the work tree above the root."""
+        if self.git_root is None:
+            return []
+        root = Path(os.path.abspath(self.root))  # noqa: PTH100
+        rules = []
+        for directory in reversed(root.parents):
+            if not directory.is_relative_to(self.git_root):
+                continue
+            patterns = self._ignore_patterns(str(directory / GITIGNORE))
+            if patterns:
+                rules.append(IgnoreRules(patterns, offset=f"{root.relative_to(directory).as_posix()}/"))
+        return rules
+
+    def _walk(self, directory: str, relative: str, rules: list[IgnoreRules], found: list[Path]) -> None:
+        # the tree is walked with paths as strings, as building a Path for every entry costs more than listing it
+        entries, has_gitignore = self._list(directory)
+        if has_gitignore and self.git_root is not None:
+            patterns = self._ignore_patterns(os.path.join(directory, GITIGNORE))  # noqa: PTH118
+            rules = [*rules, IgnoreRules(patterns, relative)]
+        # the excludes take precedence over any gitignore file
+        all_rules = [*rules, self.exclude]
+        for name, is_dir in entries:
+            path = relative + name
+            if is_ignored(all_rules, path, is_dir=is_dir):
+                continue
+            if is_dir:
+                self._walk(os.path.join(directory, name), f"{path}/", rules, found)  # noqa: PTH118
+            else:
+                found.append(Path(directory, name))
+
+    def _list(self, directory: str) -> Listing:
+        """Return the listing of the directory, listing it again only if it changed since it was last listed."""
+        try:
+            modified = os.stat(directory).st_mtime_ns  # noqa: PTH116
+        except OSError:
+            return (), False
+        cached = self._listings.get(directory)
+        if cached is not None and cached[0] == modified:
+            return cached[1]
+        try:
+            listing = _list_directory(directory)
+        except OSError as error:
+            logger.debug("Unable to list %s: %s", directory, error)
+            return (), False
+        self.listed += 1
+        if time.time_ns() - modified > _RACY_NANOSECONDS:
+            self._listings[directory] = (modified, listing)
+        return listing
+
+    def _ignore_patterns(self, path: str) -> tuple[IgnorePattern, ...]:
+        """Return the patterns of the gitignore file, reading it again only if it changed."""
+        try:
+            stat = os.stat(path)  # noqa: PTH116
+        except OSError:
+            return ()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._ignore_files.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with Path(path).open(encoding="utf-8", errors="replace") as fh:
+            patterns = parse_ignore_patterns(fh)
+        self._ignore_files[path] = (signature, patterns)
+        return patterns
+
+
+def _list_directory(directory: str) -> Listing:
+    entries = []
+    has_gitignore = False
+    with os.scandir(directory) as scan:
+        for entry in scan:
+            name = entry.name
+            if name == GITIGNORE:
+                has_gitignore = True
+            elif entry.is_dir(follow_symlinks=False):
+                # git keeps its own files in .git, never specs
+                if name != ".git":
+                    entries.append((name, True))
+            elif name.endswith(".md") and entry.is_file():
+                entries.append((name, False))
+    entries.sort()
+    return tuple(entries), has_gitignore
+
+
+def spec_file_finder(root: Path, config: Mapping[str, Any]) -> SpecFileFinder:
+    """Return the finder for the markdown files under the root, with the exclude and gitignore options of the config."""
+    return SpecFileFinder(root, exclude=config.get("exclude", ()), gitignore=config.get("gitignore", True))
@@ -0,0 +1,76 @@
+"""In-memory store of markdown documents, so each file is read only once per run."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from .md_scan import MarkdownScan, scan_markdown_lines
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentStore:
+    """Hold the text of each markdown file and the views derived from it.
+
+    Link checking uses the line and scan views, and spec parsing reads the text.
+    All come from the same buffer, and edits are written through to the buffer and the disk.
+    """
+
+    def __init__(self) -> None:
+        """Construct the basic properties."""
+        self._texts: dict[Path, str] = {}
+        self._lines: dict[Path, list[str]] = {}
+        self._scans: dict[Path, dict[str, MarkdownScan]] = {}
+        self.reads = 0
+        self.writes = 0
+
+    def __contains__(self, path: Path) -> bool:
+        """Return whether the file has been read into the store."""
+        return path in self._texts
+
+    def text(self, path: Path) -> str:
+        """Return the text of the file, reading it from disk the first time."""
+        if (text := self._texts.get(path)) is None:
+            text = path.read_text()
+            self.reads += 1
+            self._texts[path] = text
+        return text
+
+    def lines(self, path: Path) -> list[str]:
+        """Return the lines of the file."""
+        if (lines := self._lines.get(path)) is None:
+            lines = self.text(path).split("\n")
+            self._lines[path] = lines
+        return lines
+
+    def scan(self, path: Path, prefix: str) -> MarkdownScan:
+        """Return the sections, references and links for the prefix found in the file."""
+        scans = self._scans.setdefault(path, {})
+        if (scan := scans.get(prefix)) is None:
+            scan = scans[prefix] = scan_markdown_lines(self.lines(path), prefix)
+        return scan
+
+    @property
+    def regex_evaluations(self) -> int:
+        """Return how many times a regular expression was run over a line by the scans."""
+        return sum(scan.regex_evaluations for scans in self._scans.values() for scan in scans.values())
+
+    def write(self, path: Path, text: str) -> None:
+        """Replace the text of the file, in the store and on disk."""
+        path.write_text(text)
+        self.writes += 1
+        self._texts[path] = text
+        self._drop_views(path)
+
+    def forget(self, path: Path) -> None:
+        """Drop the buffered text of the file, so the next access reads it from disk again."""
+        self._texts.pop(path, None)
+        self._drop_views(path)
+
+    def _drop_views(self, path: Path) -> None:
+        self._lines.pop(path, None)
+        self._scans.pop(path, None)
@@ -1,29 +1,254 @@
-"""Spicy is like needs, but for mdbook."""
+"""Spicy is like needs, but for mdbook.
 
+The subsystems are imported when a run needs them, so --help and small runs start quickly.
+"""
+
+from __future__ import annotations
+
+import json
 import logging
+import subprocess
 import sys
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import IO, TYPE_CHECKING, Any
 
 import click
 
-from .config import load_spicy_config
-from .gather import get_elements_from_files
-from .md_link_check import check_markdown_refs
-from .review import render_issues_with_elements
+from .cache import ParseCache, default_cache_directory
 
 if TYPE_CHECKING:  # pragma: no cover
-    from collections.abc import Callable
+    from collections.abc import Callable, Mapping
+
+    from .artifacts import PartialIndex
+    from .changes import Changes
+    from .config import CompiledConfig
+    from .documents import DocumentStore
+    from .parser.spec_index import SpecIndex
+    from .stats import RunStats
 
 logger = logging.getLogger(__name__)
 
 
-def get_spec_files(root_path: Path | None = None) -> list[Path]:
-    """Fetch a list of all the use-case files under a root path."""
+def get_spec_files(root_path: Path | None = None, config: Mapping[str, Any] | None = None) -> list[Path]:
+    """Fetch a list of all the use-case files under a root path.
+
+    Files excluded by the config, or ignored by git, are left out.
+    """
+    from .discovery import spec_file_finder  # noqa: PLC0415
+
     glob_root = root_path or Path("src/")
     if glob_root.is_file():
         return [glob_root]
-    return sorted(glob_root.glob("**/*.md"))
+    return spec_file_finder(glob_root, config or {}).find()
+
+
+def get_changes(ref: str, base_path: Path) -> Changes:
+    """Ask git for the files changed since the ref, exiting if git cannot tell."""
+    from .changes import Changes, git_directory  # noqa: PLC0415
+
+    try:
+        return Changes.since(ref, git_directory(base_path))
+    except subprocess.CalledProcessError as error:
+        reason = error.stderr.strip()
+    except OSError as error:
+        reason = str(error)
+    logger.error("Unable to find the files changed since %s: %s", ref, reason)
+    sys.exit(1)
+
+
+def gather_run_spec_index(  # noqa: PLR0913
+    project_prefix: str,
+    filenames: list[Path],
+    *,
+    merged: PartialIndex | None,
+    changed_since: str | None,
+    base_path: Path,
+    jobs: int,
+    cache: ParseCache | None,
+    documents: DocumentStore,
+    stats: RunStats | None,
+    config: CompiledConfig,
+) -> tuple[SpecIndex, set[str] | None]:
+    """Return the index of the specs, and the names of the specs to report if only some are."""
+    if merged is not None:
+        from .gather import index_spec_elements  # noqa: PLC0415
+
+        if changed_since is not None:
+            logger.error("Unable to check changes in merged indexes")
+            sys.exit(1)
+        return index_spec_elements(merged.elements, stats=stats), None
+
+    if changed_since is None:
+        from .gather import gather_spec_index  # noqa: PLC0415
+
+        spec_index = gather_spec_index(
+            project_prefix,
+            filenames,
+            jobs=jobs,
+            cache=cache,
+            documents=documents,
+            stats=stats,
+            config=config,
+        )
+        return spec_index, None
+
+    if cache is None:
+        logger.error("Unable to check changes without the cache, which holds the index of the git ref")
+        sys.exit(1)
+    from .changes import gather_changed_spec_index  # noqa: PLC0415
+
+    changed = gather_changed_spec_index(
+        project_prefix,
+        filenames,
+        get_changes(changed_since, base_path),
+        cache=cache,
+        jobs=jobs,
+        documents=documents,
+        stats=stats,
+        config=config,
+    )
+    return changed.spec_index, changed.affected
+
+
+def check_with_daemon(
+    base_path: Path,
+    project_prefix: str | None,
+    cache_dir: Path,
+    *,
+    check_refs: bool,
+    helpful: bool,
+) -> None:
+    """Print the check from a daemon serving the base path and exit, or return if there is no such daemon."""
+    from .serve_client import send_request, socket_path_for  # noqa: PLC0415
+
+    request = {
+        "command": "check",
+        "path": str(base_path.resolve()),
+        "cwd": str(Path.cwd()),
+        "prefix": project_prefix,
+        "check_refs": check_refs,
+        "helpful": helpful,
+    }
+    response = send_request(socket_path_for(cache_dir), request)
+    if response is None:
+        return
+    lines, exit_code = response.get("lines"), response.get("exit_code")
+    if not response.get("ok") or not isinstance(lines, list) or not isinstance(exit_code, int):
+        logger.debug("Checking here, as the daemon cannot: %s", response.get("error", "bad response"))
+        return
+    if lines:
+        click.echo("\n".join(map(str, lines)))
+    sys.exit(exit_code)
+
+
+def stop_daemon(cache_dir: Path) -> None:
+    """Ask the daemon serving from the cache directory to stop."""
+    from .serve_client import send_request, socket_path_for  # noqa: PLC0415
+
+    if send_request(socket_path_for(cache_dir), {"command": "stop"}) is None:
+        logger.error("No spicy daemon is serving from %s", cache_dir)
+        sys.exit(1)
+    click.echo("Stopped the spicy daemon.")
+
+
+def parse_shard_option(value: str) -> tuple[int, int]:
+    """Return the shard number and the number of shards of the --shard option."""
+    from .artifacts import parse_shard  # noqa: PLC0415
+
+    try:
+        return parse_shard(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error)) from error
+
+
+def read_merged_index(index_paths: list[Path], project_prefix: str, base_path: Path) -> PartialIndex:
+    """Return the indexes merged into one, exiting if they cannot be, or are not for this run."""
+    from .artifacts import merge_indexes, read_indexes  # noqa: PLC0415
+
+    try:
+        merged = merge_indexes(read_indexes(index_paths))
+    except ValueError as error:
+        reason = str(error)
+    else:
+        outside = [str(artifact.path) for artifact in merged.files if not artifact.path.is_relative_to(base_path)]
+        if merged.prefix == project_prefix and not outside:
+            logger.info("Merged the indexes of %s files", len(merged.files))
+            return merged
+        reason = f"they are of {merged.prefix}, not {project_prefix}"
+        if outside:
+            reason = f"{', '.join(outside)} not in {base_path}"
+    logger.error("Unable to merge the indexes: %s", reason)
+    sys.exit(1)
+
+
+def write_run_index(  # noqa: PLR0913
+    output: Path,
+    project_prefix: str,
+    filenames: list[Path],
+    *,
+    shard: tuple[int, int] | None,
+    jobs: int,
+    cache: ParseCache | None,
+    documents: DocumentStore,
+    stats: RunStats | None,
+) -> None:
+    """Parse the files and write their index, for checking later with the indexes of the other files."""
+    from .artifacts import build_partial_index  # noqa: PLC0415
+    from .gather import parse_spec_files  # noqa: PLC0415
+    from .stats import timed_phase  # noqa: PLC0415
+
+    elements_per_file = parse_spec_files(
+        project_prefix,
+        filenames,
+        jobs=jobs,
+        cache=cache,
+        documents=documents,
+        stats=stats,
+    )
+    with timed_phase(stats, "write"):
+        partial_index = build_partial_index(project_prefix, filenames, elements_per_file, documents, shard=shard)
+        partial_index.write(output)
+    click.echo(f"Wrote the {len(partial_index.elements)} specs of {len(filenames)} files to {output}")
+
+
+def start_profile(profile_path: Path) -> None:
+    """Profile the rest of the command, writing the profile when it finishes."""
+    import cProfile  # noqa: PLC0415
+
+    profiler = cProfile.Profile()
+
+    def finish() -> None:
+        profiler.disable()
+        profiler.dump_stats(profile_path)
+        logger.info("Profile written to %s", profile_path)
+
+    click.get_current_context().call_on_close(finish)
+    profiler.enable()
+
+
+def start_stats(
+    documents: DocumentStore,
+    config: CompiledConfig,
+    *,
+    show: bool,
+    json_file: IO[str] | None,
+) -> RunStats:
+    """Return the stats to record the run in, reported when the command finishes, even if it exits early."""
+    from .stats import RunStats  # noqa: PLC0415
+
+    stats = RunStats()
+
+    def finish() -> None:
+        stats.counts["regex_evaluations"] += documents.regex_evaluations + config.ignored_ref_matcher.evaluations
+        if show:
+            for line in stats.report():
+                click.echo(line, err=True)
+        if json_file is not None:
+            json.dump(stats.to_dict(), json_file, indent=2)
+            json_file.write("\n")
+
+    click.get_current_context().call_on_close(finish)
+    return stats
 
 
 @click.command()
@@ -46,15 +271,130 @@ def get_spec_files(root_path: Path | None = None) -> list[Path]:
     "--helpful",
     is_flag=True,
     default=False,
-    help="When checking refs, offer a suggestion for a correct link.",
+    help="Suggest the closest spec name for bad references and unexpected link targets.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Number of processes to use when parsing spec files.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Parse every file, ignoring and not updating the parse cache.",
 )
-def run(  # noqa: PLR0913
+@click.option(
+    "--clear-cache",
+    is_flag=True,
+    default=False,
+    help="Remove all entries from the parse cache before running.",
+)
+@click.option(
+    "--cache-dir",
+    default=None,
+    type=Path,
+    help="Directory to store the parse cache and the daemon's socket in. "
+    "By default, a directory for the working directory in the user's cache directory.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    default=False,
+    help="Keep running, re-checking whenever a spec file changes (refs are checked, never fixed).",
+)
+@click.option(
+    "--serve",
+    is_flag=True,
+    default=False,
+    help="Keep the parsed specs in a daemon, which later runs with the same path ask instead of parsing again.",
+)
+@click.option(
+    "--stop-serving",
+    is_flag=True,
+    default=False,
+    help="Stop the daemon serving from the cache directory.",
+)
+@click.option(
+    "--no-daemon",
+    is_flag=True,
+    default=False,
+    help="Run the checks here, even if a daemon is serving the specs.",
+)
+@click.option(
+    "--shard",
+    default=None,
+    callback=lambda _context, _parameter, value: None if value is None else parse_shard_option(value),
+    metavar="I/N",
+    help="Only parse the files in shard I of N, chosen by a checksum of their paths. Use with --output.",
+)
+@click.option(
+    "-o",
+    "--output",
+    default=None,
+    type=Path,
+    help="Write the specs, sections and references of the files to this index rather than checking them. "
+    "The index of a single file depends only on the file and the prefix, so it can be cached by a build system.",
+)
+@click.option(
+    "--merge",
+    multiple=True,
+    type=Path,
+    metavar="INDEX",
+    help="Check the specs of written indexes, or of every index in a directory, rather than parsing the files. "
+    "This links the indexes of single files as well as merging shards.",
+)
+@click.option(
+    "--changed-since",
+    default=None,
+    type=str,
+    metavar="GIT-REF",
+    help="Only parse the files changed since the git ref, and only report the specs affected by them.",
+)
+@click.option(
+    "--stats",
+    "show_stats",
+    is_flag=True,
+    default=False,
+    help="Report the time spent in each phase, what was counted, and the slowest files, on stderr.",
+)
+@click.option(
+    "--stats-json",
+    default=None,
+    type=click.File("w"),
+    help="Write the stats as JSON to this file, or - for stdout.",
+)
+@click.option(
+    "--profile",
+    "profile_path",
+    default=None,
+    type=Path,
+    help="Profile the run with cProfile, writing the profile to this file.",
+)
+def run(  # noqa: C901, PLR0912, PLR0913, PLR0915
     path_override: Path | None,
     project_prefix: str | None,
     verbose: bool,  # noqa: FBT001
     fix_refs: bool,  # noqa: FBT001
     check_refs: bool,  # noqa: FBT001
     helpful: bool,  # noqa: FBT001
+    jobs: int,
+    no_cache: bool,  # noqa: FBT001
+    clear_cache: bool,  # noqa: FBT001
+    cache_dir: Path | None,
+    watch: bool,  # noqa: FBT001
+    serve: bool,  # noqa: FBT001
+    stop_serving: bool,  # noqa: FBT001
+    no_daemon: bool,  # noqa: FBT001
+    shard: tuple[int, int] | None,
+    output: Path | None,
+    merge: tuple[Path, ...],
+    changed_since: str | None,
+    show_stats: bool,  # noqa: FBT001
+    stats_json: IO[str] | None,
+    profile_path: Path | None,
 ) -> None:
     """Parse and analyze markdown spec files, optionally checking and/or fixing reference links.
 
@@ -63,6 +403,33 @@ def run(  # noqa: PLR0913
     and --fix-refs to update files in-place with correct links.
     """
     base_path = path_override or Path()
+    cache_dir = cache_dir or default_cache_directory()
+    if stop_serving:
+        stop_daemon(cache_dir)
+        return
+    local_only = (
+        verbose,
+        fix_refs,
+        watch,
+        serve,
+        no_daemon,
+        no_cache,
+        clear_cache,
+        show_stats,
+        stats_json,
+        profile_path,
+    )
+    if changed_since is None and shard is None and output is None and not merge and not any(local_only):
+        check_with_daemon(base_path, project_prefix, cache_dir, check_refs=check_refs, helpful=helpful)
+
+    if profile_path is not None:
+        start_profile(profile_path)
+
+    from .config import load_spicy_config  # noqa: PLC0415
+    from .documents import DocumentStore  # noqa: PLC0415
+    from .review import render_issues_with_elements  # noqa: PLC0415
+    from .stats import timed_phase  # noqa: PLC0415
+
     spicy_config = load_spicy_config(base_path, prefix=project_prefix)
 
     logging.basicConfig(level=logging.DEBUG if verbose else logging.INFO)
@@ -75,35 +442,127 @@ def run(  # noqa: PLR0913
         logger.error("Unable to scan without a known prefix")
         sys.exit(1)
 
-    filenames = get_spec_files(base_path)
+    documents = DocumentStore()
+    stats = None
+    if show_stats or stats_json is not None:
+        stats = start_stats(documents, spicy_config, show=show_stats, json_file=stats_json)
+
+    merged = None
+    if merge:
+        with timed_phase(stats, "merge"):
+            merged = read_merged_index(list(merge), project_prefix, base_path)
+        filenames = [artifact.path for artifact in merged.files]
+    else:
+        with timed_phase(stats, "discovery"):
+            filenames = get_spec_files(base_path, spicy_config)
+        if shard is not None:
+            from .artifacts import select_shard  # noqa: PLC0415
+
+            filenames = select_shard(filenames, base_path, shard)
 
     logger.debug("Found %s files to read.", len(filenames))
 
-    if fix_refs or check_refs:
-        result = check_markdown_refs(
-            filenames,
+    if serve:
+        from .serve import serve_specs  # noqa: PLC0415
+        from .serve_client import socket_path_for  # noqa: PLC0415
+
+        serve_specs(base_path, project_prefix, config=spicy_config, socket_path=socket_path_for(cache_dir))
+        return
+
+    if watch:
+        from .watch import watch_specs  # noqa: PLC0415
+
+        watch_specs(
+            [base_path],
+            project_prefix,
+            config=spicy_config,
             base_path=base_path,
-            prefix=project_prefix,
-            fix_refs=fix_refs,
-            ignored_refs=spicy_config.get("ignored_refs", []),
+            check_refs=check_refs or fix_refs,
             helpful=helpful,
         )
+        return
+
+    parse_cache = None if no_cache else ParseCache(cache_dir, project_prefix)
+    if clear_cache:
+        ParseCache(cache_dir, project_prefix).clear()
+
+    if output is not None:
+        write_run_index(
+            output,
+            project_prefix,
+            filenames,
+            shard=shard,
+            jobs=jobs,
+            cache=parse_cache,
+            documents=documents,
+            stats=stats,
+        )
+        return
+    if shard is not None:
+        logger.error("Unable to check a shard on its own, write its index with --output and merge it with the rest")
+        sys.exit(1)
+
+    if fix_refs or check_refs:
+        from .md_link_check import check_markdown_refs, check_scanned_refs  # noqa: PLC0415
+
+        with timed_phase(stats, "check_refs"):
+            if merged is not None:
+                if fix_refs:
+                    logger.error("Unable to fix refs in merged indexes, as the files may not be here")
+                    sys.exit(1)
+                result, _ = check_scanned_refs(
+                    merged.scans,
+                    base_path=base_path,
+                    fix_refs=False,
+                    ignored_refs=spicy_config.ignored_ref_matcher,
+                    helpful=helpful,
+                )
+            else:
+                result = check_markdown_refs(
+                    filenames,
+                    base_path=base_path,
+                    prefix=project_prefix,
+                    fix_refs=fix_refs,
+                    ignored_refs=spicy_config.ignored_ref_matcher,
+                    helpful=helpful,
+                    documents=documents,
+                )
         if result:
             click.echo("Found issues during markdown link checking.")
             for issue in result:
                 click.echo(issue)
             sys.exit(1)
 
-    elements = get_elements_from_files(project_prefix, filenames)
+    spec_index, focus = gather_run_spec_index(
+        project_prefix,
+        filenames,
+        merged=merged,
+        changed_since=changed_since,
+        base_path=base_path,
+        jobs=jobs,
+        cache=parse_cache,
+        documents=documents,
+        stats=stats,
+        config=spicy_config,
+    )
+    elements = spec_index.elements
 
     logger.debug("Discovered %s elements.", len(elements))
 
     render_function: Callable[[str], None] = print
 
-    if render_issues_with_elements(
-        elements,
-        config=spicy_config,
-        render_function=render_function,
-    ):
+    with timed_phase(stats, "review"):
+        any_issues = render_issues_with_elements(
+            elements,
+            config=spicy_config,
+            render_function=render_function,
+            spec_index=spec_index,
+            focus=focus,
+            helpful=helpful,
+        )
+    if any_issues:
         sys.exit(1)
+    if focus is not None:
+        render_function(f"No issues found with the {len(focus)} specs affected by changes since {changed_since}")
+        return
     render_function(f"No issues found with any of the {len(elements)} specs")
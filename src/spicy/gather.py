@@ -1,77 +1,258 @@
 """Collecting spec data from a file or directory."""
 
 import logging
-import os
+import mmap
 import re
-from collections.abc import Callable
+import string
+import sys
+from collections.abc import Callable, Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache, partial
 from pathlib import Path
+from typing import Any
 
-from spicy.md_read import load_syntax_tree, strip_link
+from spicy.md_read import parse_text_to_tokens, strip_link
 
-from .parser import parse_syntax_tree_to_spec_elements
+from .cache import ParseCache
+from .discovery import spec_file_finder
+from .documents import DocumentStore
+from .parser import parse_tokens_to_spec_elements
 from .parser.spec_element import SpecElement
+from .parser.spec_index import SpecIndex
 from .parser.spec_utils import expected_links_for_variant, section_name_to_key
+from .parser.use_case_constants import USE_CASE_ID
+from .stats import RunStats, parse_spec_text_with_stats, timed_phase
 
 logger = logging.getLogger(__name__)
 
 RenderFunction = Callable[[str], None]
 
 
-def gather_all_elements(project_prefix: str, from_file: Path) -> list[SpecElement]:
-    """Use markdown-it to get all the elements of the markdown files in the project."""
+# A spec is either a heading starting with the project prefix, or a code block starting with the use case id,
+# so a file with neither written anywhere in it has no specs, and need not be parsed.
+
+
+@cache
+def _prefix_pattern(project_prefix: str) -> re.Pattern[str]:
+    """Return the pattern of the prefix as it can be written, with any punctuation escaped by a backslash."""
+    return re.compile(
+        "".join(rf"\\?{re.escape(char)}" if char in string.punctuation else re.escape(char) for char in project_prefix),
+    )
+
+
+@cache
+def _prefix_bytes_pattern(project_prefix: str) -> re.Pattern[bytes]:
+    return re.compile(_prefix_pattern(project_prefix).pattern.encode())
+
+
+def may_contain_specs(project_prefix: str, text: str) -> bool:
+    """Return whether the markdown text could have any specs in it."""
+    return USE_CASE_ID in text or _prefix_pattern(project_prefix).search(text) is not None
+
+
+def file_may_contain_specs(project_prefix: str, path: Path) -> bool:
+    """Return whether the markdown file could have any specs in it, searching its bytes without decoding them."""
+    with path.open("rb") as fh:
+        if not path.stat().st_size:
+            return False
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return (
+                data.find(USE_CASE_ID.encode()) != -1 or _prefix_bytes_pattern(project_prefix).search(data) is not None
+            )
+
+
+def gather_all_elements(
+    project_prefix: str,
+    from_file: Path,
+    *,
+    config: Mapping[str, Any] | None = None,
+) -> list[SpecElement]:
+    """Use markdown-it to get all the elements of the markdown files in the project.
+
+    The files of a directory are found with the exclude and gitignore options of the config.
+    """
     if from_file.is_dir():
-        complete_list: list[SpecElement] = []
-        for path in from_file.glob("**/*.md"):
-            if path.is_file():
-                complete_list.extend(gather_all_elements(project_prefix, path))
-        return complete_list
-    node = load_syntax_tree(from_file)
-    return parse_syntax_tree_to_spec_elements(project_prefix, node, from_file)
+        return [
+            element
+            for path in expand_spec_paths([from_file], config=config)
+            for element in gather_all_elements(project_prefix, path)
+        ]
+    if not file_may_contain_specs(project_prefix, from_file):
+        return []
+    return parse_spec_text(project_prefix, from_file.read_text(), from_file)
 
 
-def get_elements_from_files(project_prefix: str, file_paths: list[Path]) -> list[SpecElement]:
-    """Return the combined use cases from all the md files."""
-    specs: list[SpecElement] = []
+def parse_spec_text(project_prefix: str, text: str, from_file: Path) -> list[SpecElement]:
+    """Use markdown-it to get all the elements of markdown text read from a file.
 
-    for filename in file_paths:
-        specs.extend(gather_all_elements(project_prefix, filename))
+    The spec parser reads the token stream directly, building a syntax tree only for the lists it reads.
+    Text with no specs in it is not parsed at all.
+    """
+    if not may_contain_specs(project_prefix, text):
+        return []
+    return parse_tokens_to_spec_elements(project_prefix, parse_text_to_tokens(text), from_file)
 
-    # Always build expected_links for all elements
-    build_expected_links(specs)
 
-    return specs
+def expand_spec_paths(file_paths: list[Path], *, config: Mapping[str, Any] | None = None) -> list[Path]:
+    """Return the markdown files to parse, expanding any directories in place.
 
+    The files in a directory are in the order of their paths,
+    leaving out any excluded by the config or, unless the config turns it off, ignored by git.
+    """
+    expanded: list[Path] = []
+    for path in file_paths:
+        if path.is_dir():
+            expanded.extend(spec_file_finder(path, config or {}).find())
+        else:
+            expanded.append(path)
+    return expanded
 
-def build_expected_links(elements: list[SpecElement]) -> None:
-    """Populate each SpecElement with an expected_links dict for each link field."""
-    lookup = {}
-    for el in elements:
-        lookup[(el.variant, el.name)] = el.file_path
 
-    def anchorify(text: str) -> str:
-        anchor = text.strip().lower().replace(" ", "-")
-        anchor = re.sub(r"[^a-z0-9_-]", "", anchor)
-        anchor = re.sub(r"-+", "-", anchor)
-        return anchor.strip("-")
+def _map_files(
+    parse_function: Callable[..., list[SpecElement]],
+    *iterables: list[Any],
+    jobs: int,
+) -> list[list[SpecElement]]:
+    """Apply the parse function to each file, in a process pool if there is more than one job."""
+    file_count = len(iterables[0])
+    if jobs > 1 and file_count > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, file_count)) as executor:
+            chunksize = max(1, file_count // (jobs * 4))
+            return list(executor.map(parse_function, *iterables, chunksize=chunksize))
+    return list(map(parse_function, *iterables))
+
+
+def parse_spec_files(  # noqa: PLR0913
+    project_prefix: str,
+    paths: list[Path],
+    *,
+    jobs: int = 1,
+    cache: ParseCache | None = None,
+    documents: DocumentStore | None = None,
+    stats: RunStats | None = None,
+) -> list[list[SpecElement]]:
+    """Return the elements of each of the markdown files, in the order of the files.
+
+    Files which cannot have any specs in them are skipped, neither looked up in the cache nor parsed.
+    With stats, the time spent on each parsed file and the markdown nodes in it are recorded too.
+    """
+    if cache is None and documents is None and stats is None:
+        return _map_files(partial(gather_all_elements, project_prefix), paths, jobs=jobs)
+
+    read_text = documents.text if documents is not None else Path.read_text
+    with timed_phase(stats, "read"):
+        texts = [read_text(path) for path in paths]
+        skipped = [not may_contain_specs(project_prefix, text) for text in texts]
+        cached = [
+            [] if skip else (cache.load(path, text) if cache is not None else None)
+            for path, text, skip in zip(paths, texts, skipped, strict=True)
+        ]
+    missing = [index for index, elements in enumerate(cached) if elements is None]
+    missing_texts = [texts[index] for index in missing]
+    missing_paths = [paths[index] for index in missing]
+    if stats is None:
+        parsed = _map_files(partial(parse_spec_text, project_prefix), missing_texts, missing_paths, jobs=jobs)
+    else:
+        with stats.phase("parse"):
+            parsed_with_stats = _map_files(
+                partial(parse_spec_text_with_stats, project_prefix),
+                missing_texts,
+                missing_paths,
+                jobs=jobs,
+            )
+        parsed = [elements for elements, _ in parsed_with_stats]
+        for _, file_stats in parsed_with_stats:
+            stats.add_file(file_stats)
+        stats.counts.update(
+            files=len(paths),
+            bytes=sum(len(text.encode()) for text in texts),
+            parsed_files=len(missing),
+            skipped_files=sum(skipped),
+        )
+    for index, elements in zip(missing, parsed, strict=True):
+        if cache is not None:
+            cache.store(paths[index], texts[index], elements)
+        cached[index] = elements
+    if cache is not None:
+        logger.info(cache.summary())
+    return [elements or [] for elements in cached]
+
+
+def gather_spec_index(  # noqa: PLR0913
+    project_prefix: str,
+    file_paths: list[Path],
+    *,
+    jobs: int = 1,
+    cache: ParseCache | None = None,
+    documents: DocumentStore | None = None,
+    stats: RunStats | None = None,
+    config: Mapping[str, Any] | None = None,
+) -> SpecIndex:
+    """Return an index of the combined use cases from all the md files.
+
+    With more than one job, the files are parsed in a process pool.
+    The results are merged in the order of the files, so the output is the same for any number of jobs.
+    With a cache, only files with content not seen before are parsed.
+    With a document store, files already read (and perhaps fixed) by link checking are not read again.
+    Directories are expanded with the exclude and gitignore options of the config.
+    """
+    per_file = parse_spec_files(
+        project_prefix,
+        expand_spec_paths(file_paths, config=config),
+        jobs=jobs,
+        cache=cache,
+        documents=documents,
+        stats=stats,
+    )
+    return index_spec_elements([spec for file_specs in per_file for spec in file_specs], stats=stats)
+
+
+def index_spec_elements(specs: list[SpecElement], *, stats: RunStats | None = None) -> SpecIndex:
+    """Return the index of the elements, with the expected links of every element built."""
+    with timed_phase(stats, "link"):
+        spec_index = SpecIndex(specs)
+        # Always build expected_links for all elements
+        build_expected_links(specs, spec_index)
+    if stats is not None:
+        stats.add_specs(spec_index)
+    return spec_index
+
+
+def get_elements_from_files(  # noqa: PLR0913
+    project_prefix: str,
+    file_paths: list[Path],
+    *,
+    jobs: int = 1,
+    cache: ParseCache | None = None,
+    documents: DocumentStore | None = None,
+    config: Mapping[str, Any] | None = None,
+) -> list[SpecElement]:
+    """Return the combined use cases from all the md files."""
+    return gather_spec_index(
+        project_prefix,
+        file_paths,
+        jobs=jobs,
+        cache=cache,
+        documents=documents,
+        config=config,
+    ).elements
+
+
+def build_expected_links(elements: list[SpecElement], spec_index: SpecIndex | None = None) -> None:
+    """Populate each SpecElement with an expected_links dict for each link field."""
+    spec_index = spec_index or SpecIndex(elements)
 
     for el in elements:
-        expected_links: dict[str, list[tuple[str, str, str]]] = {}
+        expected_links: dict[str, tuple[tuple[str, str, str], ...]] = {}
         required_links = expected_links_for_variant(el.variant, include_optional=True)
         for link, _ in required_links:
             link_key = section_name_to_key(link) or link
-            expected_links[link_key] = []
-            if link_key in el.content:
-                for target in el.content[link_key]:
-                    target_text = strip_link(target)
-                    found = None
-                    for (v, n), path in lookup.items():
-                        if n == target_text:
-                            found = (v, n, path)
-                            break
-                    if found:
-                        _, _, target_path = found
-                        rel_path = os.path.relpath(target_path, el.file_path.parent)
-                        anchor = anchorify(target_text)
-                        md_link = f"[{target_text}]({rel_path}#{anchor})"
-                        expected_links[link_key].append((target_text, target, md_link))
+            found = []
+            for target in el.content.get(link_key, ()):
+                # names are interned, so this shares the string of the target element's name
+                target_text = sys.intern(strip_link(target))
+                md_link = spec_index.markdown_link(target_text, el.file_path.parent)
+                if md_link is not None:
+                    found.append((target_text, target, md_link))
+            expected_links[link_key] = tuple(found)
         el.expected_links = expected_links
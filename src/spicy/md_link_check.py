@@ -6,6 +6,15 @@ from dataclasses import dataclass
 from difflib import SequenceMatcher
 from pathlib import Path
 
+from .documents import DocumentStore
+from .md_scan import (  # noqa: F401 - the section patterns were defined here, so are still imported from here
+    MarkdownScan,
+    get_section_pattern_from_prefix,
+    get_section_reference_pattern_from_prefix,
+    scan_markdown_lines,
+)
+from .suggest import SuggestionIndex
+
 TARGETS_DICT = dict[str, tuple[Path, int]]
 REFS_DICT = defaultdict[str, list[tuple[Path, int]]]
 
@@ -19,23 +28,77 @@ class Edit:
     replacement: str
 
 
-def check_markdown_refs(  # noqa: PLR0913, PLR0912 - yeah, this is big.
+class IgnoredRefs:
+    """Match names against the ignored_refs patterns, remembering the answer for each name."""
+
+    def __init__(self, patterns: list[str]) -> None:
+        """Compile each pattern.
+
+        The patterns are kept apart, rather than joined into one expression,
+        so each keeps its own inline flags and group numbers.
+        """
+        self.patterns = [re.compile(pattern) for pattern in patterns]
+        self._results: dict[str, bool] = {}
+
+    def __contains__(self, name: str) -> bool:
+        """Return whether the whole name matches any of the patterns."""
+        if not self.patterns:
+            return False
+        if (result := self._results.get(name)) is None:
+            result = self._results[name] = any(pattern.fullmatch(name) for pattern in self.patterns)
+        return result
+
+    @property
+    def evaluations(self) -> int:
+        """Return how many names were matched against the patterns, rather than remembered."""
+        return len(self._results)
+
+
+def check_markdown_refs(  # noqa: PLR0913
     file_list: list[Path],
     *,
     base_path: Path,
     prefix: str,
     fix_refs: bool,
-    ignored_refs: list[str],
+    ignored_refs: list[str] | IgnoredRefs,
     helpful: bool = False,
+    documents: DocumentStore | None = None,
 ) -> list[str]:
-    """Check matching refs are correctly linked, optionally fixing them."""
-    files = {path: path.read_text().split("\n") for path in file_list}
-    targets, references = gather_markdown_sections_and_refs(files, prefix, ignored_refs)
+    """Check matching refs are correctly linked, optionally fixing them.
+
+    Files are read through the document store, so fixed files are seen by later stages without reading them again.
+    """
+    documents = documents or DocumentStore()
+    scans = {path: documents.scan(path, prefix) for path in file_list}
+    issue_list, edits = check_scanned_refs(
+        scans,
+        base_path=base_path,
+        fix_refs=fix_refs,
+        ignored_refs=ignored_refs,
+        helpful=helpful,
+    )
+
+    for path, edit_list in edits.items():
+        update_file(path, edit_list, documents)
+
+    return issue_list
+
+
+def check_scanned_refs(  # noqa: C901, PLR0912 - yeah, this is big.
+    scans: dict[Path, MarkdownScan],
+    *,
+    base_path: Path,
+    fix_refs: bool,
+    ignored_refs: list[str] | IgnoredRefs,
+    helpful: bool = False,
+) -> tuple[list[str], dict[Path, list[Edit]]]:
+    """Check matching refs are correctly linked in already scanned files, returning the issues and the fixes."""
+    targets, references = gather_scanned_sections_and_refs(scans, ignored_refs)
 
     absolute_links = {
         target: f"[{target}](/{path.relative_to(base_path)}#{target.lower()})" for target, (path, _) in targets.items()
     }
-    valid_targets = list(targets)
+    suggestions: SuggestionIndex | None = None
 
     issue_list = []
 
@@ -43,10 +106,13 @@ def check_markdown_refs(  # noqa: PLR0913, PLR0912 - yeah, this is big.
 
     # check for completely invalid references
     for ref, list_of_locations in references.items():
-        re_link = get_link_pattern_from_reference(ref)
         for path, line in list_of_locations:
             if ref not in targets:
-                best_alternative = f" Did you mean {closest_string(ref, valid_targets)}" if helpful else ""
+                best_alternative = ""
+                if helpful:
+                    if suggestions is None:
+                        suggestions = SuggestionIndex(targets)
+                    best_alternative = f" Did you mean {suggestions.closest(ref)}"
                 issue = f"Bad reference found: {ref} in {path}({line + 1}) has no matching section."
                 issue_list.append(f"{issue}{best_alternative}")
             else:
@@ -54,23 +120,21 @@ def check_markdown_refs(  # noqa: PLR0913, PLR0912 - yeah, this is big.
                 target_path, _ = targets[ref]
                 local_link = f"[{ref}](#{ref.lower()})" if path == targets[ref][0] else None
                 absolute_link = absolute_links[ref]
-                if path.parent in target_path.parents:
+                if target_path.is_relative_to(path.parent):
                     relative_link = f"[{ref}]({target_path.relative_to(path.parent)}#{ref.lower()})"
                 else:
                     relative_link = absolute_link
 
                 expected = local_link or relative_link
 
-                line_content = files[path][line]
-                m = re_link.search(line_content)
+                actual = scans[path].links.get((ref, line))
                 # check that all references have links
-                if not m:
+                if actual is None:
                     if fix_refs:
                         edits[path].append(Edit(line, ref, expected))
                     else:
                         issue_list.append(f"Reference without a link: {ref} in {path}({line + 1})")
                     continue
-                actual = m.group(1)
                 # check that all links are valid
                 if actual not in [relative_link, expected, absolute_link]:
                     # or update if fix_refs is True
@@ -81,14 +145,14 @@ def check_markdown_refs(  # noqa: PLR0913, PLR0912 - yeah, this is big.
                             f"Reference has bad link: {ref} in {path}({line + 1}) is {actual} but should be {expected}",
                         )
 
-    for path, edit_list in edits.items():
-        update_file(path, edit_list)
-
-    return issue_list
+    return issue_list, edits
 
 
 def closest_string(needle: str, haystack: list[str]) -> str:
-    """Find the closest matching string."""
+    """Find the closest matching string, comparing the needle with every string.
+
+    Kept for compatibility, and as the full comparison SuggestionIndex is tested against; checks use SuggestionIndex.
+    """
     best_guess = ""
     best_score = 0.0
     for guess in haystack:
@@ -105,27 +169,34 @@ def gather_markdown_sections_and_refs(
     ignored_refs: list[str],
 ) -> tuple[TARGETS_DICT, REFS_DICT]:
     """Gather the sections and all possible references."""
+    scans = {path: scan_markdown_lines(content_lines, prefix) for path, content_lines in file_dict.items()}
+    return gather_scanned_sections_and_refs(scans, ignored_refs)
+
+
+def gather_scanned_sections_and_refs(
+    scans: dict[Path, MarkdownScan],
+    ignored_refs: list[str] | IgnoredRefs,
+) -> tuple[TARGETS_DICT, REFS_DICT]:
+    """Gather the sections and all possible references from already scanned files."""
     targets: dict[str, tuple[Path, int]] = {}
     references: defaultdict[str, list[tuple[Path, int]]] = defaultdict(list)
-    re_section = get_section_pattern_from_prefix(prefix)
-    re_reference = get_section_reference_pattern_from_prefix(prefix)
-    ignored = [re.compile(ref) for ref in ignored_refs]
+    ignored = ignored_refs if isinstance(ignored_refs, IgnoredRefs) else IgnoredRefs(ignored_refs)
 
-    for path, content_lines in file_dict.items():
-        for target, lines in get_matches_from_md(content_lines, re_section).items():
+    for path, scan in scans.items():
+        section_lines: set[int] = set()
+        for target, lines in scan.sections.items():
             # Ignore any duplicate sections. Take the first one as valid.
             line, *_ = lines
-            if any(ig.fullmatch(target) for ig in ignored):
+            if target in ignored:
                 continue
             targets[target] = (path, line)
-        for reference, lines in get_matches_from_md(content_lines, re_reference).items():
-            for line in lines:
-                # skip any that are actually sections
-                if (path, line) in targets.values():
-                    continue
-                if any(ig.fullmatch(reference) for ig in ignored):
-                    continue
-                references[reference].append((path, line))
+            section_lines.add(line)
+        for reference, lines in scan.references.items():
+            if reference in ignored:
+                continue
+            # skip any that are actually sections
+            if locations := [(path, line) for line in lines if line not in section_lines]:
+                references[reference].extend(locations)
 
     return targets, references
 
@@ -133,31 +204,29 @@ def gather_markdown_sections_and_refs(
 def update_file(
     file_path: Path,
     edit_list: list[Edit],
+    documents: DocumentStore | None = None,
 ) -> None:
     """Update a line in a file using a replace."""
-    lines = file_path.read_text().split("\n")
+    documents = documents or DocumentStore()
+    lines = list(documents.lines(file_path))
     for edit in edit_list:
         lines[edit.line] = lines[edit.line].replace(edit.actual, edit.replacement)
-    file_path.write_text("\n".join(lines))
-
-
-def get_section_pattern_from_prefix(prefix: str) -> re.Pattern[str]:
-    """Return a regular expression for use when capturing valid section headers."""
-    return re.compile(rf"^#+ ({prefix}_\w+)$")
-
-
-def get_section_reference_pattern_from_prefix(prefix: str) -> re.Pattern[str]:
-    """Return a regular expression for use when capturing section references."""
-    return re.compile(rf"(\b{prefix}_\w+\b)")
+    documents.write(file_path, "\n".join(lines))
 
 
 def get_link_pattern_from_reference(reference: str) -> re.Pattern[str]:
-    """Return a regular expression for use when capturing section references."""
+    """Return a regular expression for use when capturing section references.
+
+    Kept for compatibility; the link check reads the links from the scan of md_scan.
+    """
     return re.compile(rf"(\[{reference}\]\([\w\-\./#]+\))")
 
 
 def get_matches_from_md(md_content_lines: list[str], section_matcher: re.Pattern[str]) -> dict[str, list[int]]:
-    """Get a dictionary of targets to line numbers from a file."""
+    """Get a dictionary of targets to line numbers from a file.
+
+    Kept for compatibility; the link check reads the sections and references from the scan of md_scan.
+    """
     targets: dict[str, list[int]] = defaultdict(list)
     for line_number, text in enumerate(md_content_lines):
         for m in section_matcher.finditer(text):
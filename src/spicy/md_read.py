@@ -1,29 +1,57 @@
 """Support reading markdown files into usable syntax trees."""
 
+from __future__ import annotations
+
 import logging
 import re
-from pathlib import Path
+from functools import cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
 
-from markdown_it import MarkdownIt
-from markdown_it.tree import SyntaxTreeNode
-from mdformat.renderer import MDRenderer
+    from markdown_it import MarkdownIt
+    from markdown_it.token import Token
+    from markdown_it.tree import SyntaxTreeNode
+    from mdformat.renderer import MDRenderer
 
 logger = logging.getLogger(__name__)
 
-# create the markdown objects for general use
+# the markdown objects for general use are created when first needed, so importing spicy stays cheap
+
+
+@cache
+def get_markdown() -> MarkdownIt:
+    """Return the shared markdown parser."""
+    from markdown_it import MarkdownIt  # noqa: PLC0415
+
+    return MarkdownIt()
+
+
+@cache
+def get_md_renderer() -> MDRenderer:
+    """Return the shared mdformat renderer."""
+    from mdformat.renderer import MDRenderer  # noqa: PLC0415
+
+    return MDRenderer()
 
-md = MarkdownIt()
-md_renderer = MDRenderer()
 
 # Loading functions
 
 
 def parse_text_to_syntax_tree(text: str) -> SyntaxTreeNode:
     """Return SyntaxTreeNode for the root of the markdown text."""
-    tokens = list(md.parse(text))
+    from markdown_it.tree import SyntaxTreeNode  # noqa: PLC0415
+
+    tokens = list(get_markdown().parse(text))
     return SyntaxTreeNode(tokens)
 
 
+def parse_text_to_tokens(text: str) -> list[Token]:
+    """Return the flat markdown-it token stream of the markdown text."""
+    return get_markdown().parse(text)
+
+
 def load_syntax_tree(markdown_file_path: Path) -> SyntaxTreeNode:
     """Return SyntaxTreeNode for the root of the markdown file."""
     with markdown_file_path.open() as fh:
@@ -45,25 +73,229 @@ def parse_yes_no(value: str) -> bool | None:
 
 
 def render_node(node: SyntaxTreeNode) -> str:
-    """Return the text of a md node."""
-    return md_renderer.render(node.to_tokens(), md.options, {})
+    """Return the text of a md node.
 
+    Simple paragraphs are rendered directly, anything else is rendered by mdformat.
+    """
+    if node.type == "paragraph" and (rendered := render_simple_paragraph(node)) is not None:
+        return rendered
+    return get_md_renderer().render(node.to_tokens(), get_markdown().options, {})
 
-def get_text_from_node(node: SyntaxTreeNode) -> str:
-    """Return the text of a md node."""
-    buffer = ""
-    if node.type == "text":
-        buffer = node.content
-    elif node.type == "code_inline":
-        buffer = f"`{node.content}`"
-    elif node.type == "code_block":
-        buffer = f"`{node.content.strip()}`"
 
+# Lightweight inline rendering.
+# Only text that mdformat would leave exactly as it is gets rendered here,
+# everything else returns None so the caller can fall back to mdformat.
+
+_re_plain_text = re.compile(r"[A-Za-z0-9 ,.;:'\"()?/%=+\-_]*")
+_re_unsafe_underscore = re.compile(r"(?<![A-Za-z0-9])_|_(?![A-Za-z0-9])")
+_re_plain_href = re.compile(r"[A-Za-z0-9_\-./#]+")
+# lines mdformat escapes, so they are not read as headings, quotes, list items, breaks or setext underlines
+_re_unsafe_line_start = re.compile(r"#{1,6}(?:[ \t]|$)|>|[-*+](?:[ \t]|$)|[0-9]+[.)](?:[ \t]|$)|[-=*_ \t]+$")
+
+
+def _render_plain_text(text: str) -> str | None:
+    if not _re_plain_text.fullmatch(text) or "  " in text or _re_unsafe_underscore.search(text):
+        return None
+    return text
+
+
+def _render_inline_children(node: SyntaxTreeNode) -> str | None:
+    parts = []
     for child in node.children:
-        buffer = (buffer + " " + get_text_from_node(child)).strip()
+        rendered = render_simple_inline(child)
+        if rendered is None:
+            return None
+        parts.append(rendered)
+    return "".join(parts)
+
+
+def _render_simple_code(node: SyntaxTreeNode) -> str | None:
+    code = node.content
+    if "`" in code or code.startswith(" ") or code.endswith(" "):
+        return None
+    return f"`{code}`"
+
+
+def _render_simple_link(node: SyntaxTreeNode) -> str | None:
+    href = node.attrs.get("href")
+    if node.info == "auto" or node.meta.get("label") or "title" in node.attrs:
+        return None
+    if not isinstance(href, str) or not _re_plain_href.fullmatch(href):
+        return None
+    text = _render_inline_children(node)
+    return None if text is None else f"[{text}]({href})"
+
+
+def render_simple_inline(node: SyntaxTreeNode) -> str | None:
+    """Return the markdown for text, links, inline code and emphasis, or None for anything else."""
+    node_type = node.type
+    if node_type == "text":
+        return _render_plain_text(node.content)
+    if node_type == "softbreak":
+        return "\n"
+    if node_type in ("em", "strong"):
+        text = _render_inline_children(node)
+        return None if text is None else f"{node.markup}{text}{node.markup}"
+    renderer = {"code_inline": _render_simple_code, "link": _render_simple_link}.get(node_type)
+    return None if renderer is None else renderer(node)
+
+
+def render_simple_paragraph(node: SyntaxTreeNode) -> str | None:
+    """Return the markdown for a paragraph of simple inline content, as mdformat would, or None."""
+    if len(node.children) != 1 or node.children[0].type != "inline":
+        return None
+    text = _render_inline_children(node.children[0])
+    if not text or text[0].isspace() or text[-1].isspace():
+        return None
+    lines = [line.strip() for line in text.split("\n")]
+    if any(not line or _re_unsafe_line_start.match(line) for line in lines):
+        return None
+    return "\n".join(lines) + "\n"
+
+
+# attribute for the memoized node text, stored with the children list it was built from,
+# so replacing the children invalidates it
+_TEXT_MEMO_ATTRIBUTE = "_spicy_text_memo"
+
+
+def _own_text(node: SyntaxTreeNode | Token) -> str:
+    """Return the text held by the node itself, not its children."""
+    node_type = node.type
+    if node_type == "text":
+        return node.content
+    if node_type == "code_inline":
+        return f"`{node.content}`"
+    if node_type == "code_block":
+        return f"`{node.content.strip()}`"
+    return ""
+
+
+def _memoized_text(node: SyntaxTreeNode) -> str | None:
+    memo = getattr(node, _TEXT_MEMO_ATTRIBUTE, None)
+    if memo is not None and memo[0] is node.children:
+        return memo[1]
+    return None
+
+
+def _join_text(own: str, child_texts: list[str]) -> str:
+    """Join the stripped child texts to the node's own text with single spaces."""
+    if not own:
+        return " ".join(text for text in child_texts if text)
+    # only leaf nodes have text of their own, but keep the exact spacing rules if one ever has children
+    buffer = own
+    for text in child_texts:
+        buffer = (buffer + " " + text).strip()
     return buffer.strip()
 
 
+def get_text_from_node(node: SyntaxTreeNode) -> str:
+    """Return the text of a md node.
+
+    The text of each node with children is built once, iteratively, and remembered,
+    so asking again for the text of the node or any part of it is cheap.
+    """
+    if not node.children:
+        return _own_text(node).strip()
+    if (text := _memoized_text(node)) is not None:
+        return text
+    stack: list[tuple[SyntaxTreeNode, list[SyntaxTreeNode] | None]] = [(node, None)]
+    while stack:
+        current, children = stack.pop()
+        if children is not None:
+            child_texts = [
+                getattr(child, _TEXT_MEMO_ATTRIBUTE)[1] if child.children else _own_text(child).strip()
+                for child in children
+            ]
+            setattr(current, _TEXT_MEMO_ATTRIBUTE, (children, _join_text(_own_text(current), child_texts)))
+        elif _memoized_text(current) is None:
+            children = current.children
+            stack.append((current, children))
+            stack.extend((child, None) for child in children if child.children)
+    return getattr(node, _TEXT_MEMO_ATTRIBUTE)[1]
+
+
+# Token stream interpretation functions
+# A top-level block is read straight from the tokens, with the same text a SyntaxTreeNode would give,
+# so only the blocks needing more than their text are built into a tree.
+
+
+class TokenBlock:
+    """The tokens of one top-level block, with the parts of a SyntaxTreeNode the spec parser reads."""
+
+    __slots__ = ("_text", "end", "start", "tokens")
+
+    def __init__(self, tokens: list[Token], start: int, end: int) -> None:
+        """Construct the view of tokens[start:end]."""
+        self.tokens = tokens
+        self.start = start
+        self.end = end
+        self._text: str | None = None
+
+    @property
+    def type(self) -> str:
+        """Return the type of the block, as the SyntaxTreeNode type."""
+        return self.tokens[self.start].type.removesuffix("_open")
+
+    @property
+    def tag(self) -> str:
+        """Return the html tag of the block."""
+        return self.tokens[self.start].tag
+
+    @property
+    def content(self) -> str:
+        """Return the content of a block without children, such as a code block."""
+        return self.tokens[self.start].content
+
+    @property
+    def text(self) -> str:
+        """Return the text of the block, as get_text_from_node gives for its node."""
+        if self._text is None:
+            self._text = get_text_from_tokens(self.tokens, self.start, self.end)
+        return self._text
+
+    def tree(self) -> SyntaxTreeNode:
+        """Return the block built into a SyntaxTreeNode."""
+        from markdown_it.tree import SyntaxTreeNode  # noqa: PLC0415
+
+        return SyntaxTreeNode(self.tokens[self.start : self.end]).children[0]
+
+    def pretty(self) -> str:
+        """Return a pretty representation of the block's tree, for debugging."""
+        return self.tree().pretty()
+
+
+def split_token_blocks(tokens: list[Token]) -> list[TokenBlock]:
+    """Return the top-level blocks of the token stream, in order."""
+    blocks = []
+    start = 0
+    depth = 0
+    for index, token in enumerate(tokens):
+        depth += token.nesting
+        if depth == 0:
+            blocks.append(TokenBlock(tokens, start, index + 1))
+            start = index + 1
+    return blocks
+
+
+def get_text_from_tokens(tokens: list[Token], start: int = 0, end: int | None = None) -> str:
+    """Return the text of the nodes of tokens[start:end], joined as get_text_from_node joins the text of children."""
+    # the texts found so far within each open token
+    stack: list[list[str]] = [[]]
+    for token in tokens[start:end]:
+        if token.nesting == 1:
+            stack.append([])
+            continue
+        if token.nesting == -1:
+            text = " ".join(stack.pop())
+        elif token.children:
+            text = get_text_from_tokens(token.children)
+        else:
+            text = _own_text(token).strip()
+        if text:
+            stack[-1].append(text)
+    return " ".join(stack[0])
+
+
 def check_node_is(node: SyntaxTreeNode, type_name: str, message: str | None = None) -> None:
     """Check a node is a specific type, raise an IndexError if not."""
     if node.type != type_name:
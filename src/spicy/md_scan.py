@@ -0,0 +1,86 @@
+"""Scan markdown lines once for spec sections, references and the links made to them."""
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+
+@dataclass
+class MarkdownScan:
+    """The sections, references and links found in the lines of one file."""
+
+    sections: defaultdict[str, list[int]] = field(default_factory=lambda: defaultdict(list))
+    references: defaultdict[str, list[int]] = field(default_factory=lambda: defaultdict(list))
+    # the first markdown link to each reference on a line, keyed by (reference, line)
+    links: dict[tuple[str, int], str] = field(default_factory=dict)
+    # how many times a regular expression was run over a line, for the run stats
+    regex_evaluations: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the scan as plain data, for writing as JSON."""
+        return {
+            "sections": self.sections,
+            "references": self.references,
+            "links": [[reference, line, link] for (reference, line), link in self.links.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "MarkdownScan":
+        """Return the scan from the data written by to_dict."""
+        return cls(
+            defaultdict(list, data["sections"]),
+            defaultdict(list, data["references"]),
+            {(reference, line): link for reference, line, link in data["links"]},
+        )
+
+
+def get_section_pattern_from_prefix(prefix: str) -> re.Pattern[str]:
+    """Return a regular expression for use when capturing valid section headers."""
+    return re.compile(rf"^#+ ({prefix}_\w+)$")
+
+
+def get_section_reference_pattern_from_prefix(prefix: str) -> re.Pattern[str]:
+    """Return a regular expression for use when capturing section references."""
+    return re.compile(rf"(\b{prefix}_\w+\b)")
+
+
+def get_links_pattern_from_prefix(prefix: str) -> re.Pattern[str]:
+    """Return a regular expression for use when capturing links to any section, and the section linked."""
+    return re.compile(rf"(\[({prefix}_\w+)\]\([\w\-\./#]+\))")
+
+
+@lru_cache
+def scan_patterns(prefix: str) -> tuple[re.Pattern[str], re.Pattern[str], re.Pattern[str]]:
+    """Return the section, reference and link expressions for a prefix."""
+    return (
+        get_section_pattern_from_prefix(prefix),
+        get_section_reference_pattern_from_prefix(prefix),
+        get_links_pattern_from_prefix(prefix),
+    )
+
+
+def scan_markdown_lines(lines: list[str], prefix: str) -> MarkdownScan:
+    """Walk the lines once, recording the sections, references and links for the prefix."""
+    re_section, re_reference, re_link = scan_patterns(prefix)
+    scan = MarkdownScan()
+    marker = f"{prefix}_"
+    evaluations = 0
+    for line_number, text in enumerate(lines):
+        # most lines mention no spec at all
+        if marker not in text:
+            continue
+        evaluations += 1
+        if text[0] == "#":
+            evaluations += 1
+            if m := re_section.match(text):
+                scan.sections[m.group(1)].append(line_number)
+        for m in re_reference.finditer(text):
+            scan.references[m.group(1)].append(line_number)
+        if "](" in text:
+            evaluations += 1
+            for m in re_link.finditer(text):
+                scan.links.setdefault((m.group(2), line_number), m.group(1))
+    scan.regex_evaluations = evaluations
+    return scan
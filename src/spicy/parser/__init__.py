@@ -1,5 +1,6 @@
 """Module for the spec parsing code."""
 
-from .spec_parser import SpecParser, parse_syntax_tree_to_spec_elements
+from .spec_index import SpecIndex
+from .spec_parser import SpecParser, parse_syntax_tree_to_spec_elements, parse_tokens_to_spec_elements
 
-__all__ = ["SpecParser", "parse_syntax_tree_to_spec_elements"]
+__all__ = ["SpecIndex", "SpecParser", "parse_syntax_tree_to_spec_elements", "parse_tokens_to_spec_elements"]
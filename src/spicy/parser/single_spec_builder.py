@@ -1,16 +1,23 @@
 """Builder for a single spec. Used by the parser."""
 
+from __future__ import annotations
+
 import logging
+import sys
 from collections import defaultdict
 from pathlib import Path
-
-from markdown_it.tree import SyntaxTreeNode
+from typing import TYPE_CHECKING
 
 from spicy.md_read import read_bullet_list, render_node
 
 from .spec_element import SpecElement
 from .use_case_constants import _get_usage_subsection, usage_section_map
 
+if TYPE_CHECKING:  # pragma: no cover
+    from markdown_it.tree import SyntaxTreeNode
+
+    from spicy.md_read import TokenBlock
+
 logger = logging.getLogger(__name__)
 
 
@@ -37,22 +44,24 @@ class SingleSpecBuilder:
         self.parsing_issues: list[str] = []
 
     @staticmethod
-    def make_null() -> "SingleSpecBuilder":
+    def make_null() -> SingleSpecBuilder:
         """Create a null-object version as a placeholder."""
         return SingleSpecBuilder("null", "null", 0, Path(), "null")
 
     def build(self) -> SpecElement:
-        """Build a Spec Element from the gathered data."""
+        """Build a Spec Element from the gathered data.
+
+        The element takes the gathered data rather than a copy, with each section frozen to a tuple.
+        """
         element = SpecElement(
-            self.name,
-            self.variant,
+            sys.intern(self.name),
+            sys.intern(self.variant),
             self.ordering_id,
             self.file_path,
         )
 
         element.title = self.title
-        element.impact = self.impact
-        element.content = self.content
+        element.content = {sys.intern(section): tuple(lines) for section, lines in self.content.items()}
         element.impact = self.impact
         element.detectability = self.detectability
         element.usage_sections = self.usage_sections
@@ -74,7 +83,7 @@ class SingleSpecBuilder:
         logger.debug("Adding para-content: %s", content)
         self.content[section_id].append(content)
 
-    def add_code_block(self, section_id: str, code_block_node: SyntaxTreeNode) -> None:
+    def add_code_block(self, section_id: str, code_block_node: SyntaxTreeNode | TokenBlock) -> None:
         """Use the code block or paste it into content."""
         new_content = code_block_node.content.rstrip()
         logger.debug("Adding code-block: %s", new_content)
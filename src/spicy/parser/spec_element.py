@@ -1,19 +1,40 @@
 """Construct SpecElements as they are read."""
 
 import logging
+import sys
+from collections.abc import Sequence
 from pathlib import Path
 from typing import Any
 
 from spicy.md_read import strip_link
 
-from .spec_utils import expected_links_for_variant, section_name_to_key
+from .spec_utils import expected_links_for_variant, ignored_table, section_name_to_key
 from .use_case_constants import section_map, tcl_map, usage_section_map
 
 logger = logging.getLogger(__name__)
 
 
 class SpecElement:
-    """Spec Element class to store details of the spec element and links to other elements."""
+    """Spec Element class to store details of the spec element and links to other elements.
+
+    Elements are kept for every spec in a run, so they use slots rather than an instance dict.
+    """
+
+    __slots__ = (
+        "content",
+        "detectability",
+        "expected_links",
+        "file_path",
+        "impact",
+        "name",
+        "non_functional_requirement",
+        "ordering_id",
+        "qualification_related",
+        "software_requirement",
+        "title",
+        "usage_sections",
+        "variant",
+    )
 
     def __init__(
         self,
@@ -33,18 +54,50 @@ class SpecElement:
         self.non_functional_requirement: bool | None = None
 
         self.title = ""
-        self.content: dict[str, list[str]] = {}
+        self.content: dict[str, Sequence[str]] = {}
         self.impact: str | None = None
         self.detectability: str | None = None
         self.usage_sections: dict[str, str] = {}
 
         # expected_links is filled out by link-building logic
-        self.expected_links: dict[str, list[tuple[str, str, str]]] = {}
+        self.expected_links: dict[str, Sequence[tuple[str, str, str]]] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Return the slot values for pickling."""
+        return {slot: getattr(self, slot) for slot in SpecElement.__slots__}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore the slot values, sharing the name, variant and section key strings with other elements again."""
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self.name = sys.intern(self.name)
+        self.variant = sys.intern(self.variant)
+        self.content = {sys.intern(key): value for key, value in self.content.items()}
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return what was parsed for the spec as plain data, for writing as JSON.
+
+        The expected links are left out, as they depend on the other specs and are built again when indexing.
+        """
+        data = self.__getstate__()
+        del data["expected_links"]
+        data["file_path"] = self.file_path.as_posix()
+        data["content"] = {key: list(value) for key, value in self.content.items()}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SpecElement":
+        """Return the spec from the data written by to_dict."""
+        element = cls.__new__(cls)
+        content = {key: tuple(lines) for key, lines in data["content"].items()}
+        element.__setstate__({**data, "file_path": Path(data["file_path"]), "content": content, "expected_links": {}})
+        return element
 
     @property
     def all_content(self) -> str:
         """Get all the content, comma separated."""
-        return ", ".join((f"{k}:{v}" for k, v in self.content.items()))
+        # sections are kept as tuples, but shown as the lists they were read as
+        return ", ".join((f"{k}:{list(v) if isinstance(v, tuple) else v}" for k, v in self.content.items()))
 
     def __str__(self) -> str:
         """Return the string representation of the spec."""
@@ -58,7 +111,7 @@ class SpecElement:
     def get_linked_by(self, linkage_term: str) -> list[str]:
         """Return a list of all spec names linked by this term (extract from markdown links if present)."""
         link_content = self.content.get(linkage_term)
-        if isinstance(link_content, list):
+        if isinstance(link_content, (list, tuple)):
             return [strip_link(item) for item in link_content if isinstance(item, str)]
         if link_content is not None:
             logger.warning("No list content for %s - got [%s] instead", linkage_term, link_content)
@@ -92,17 +145,17 @@ class SpecElement:
             return False
         return self.non_functional_requirement
 
-    def verification_criteria(self) -> list[str]:
+    def verification_criteria(self) -> Sequence[str]:
         """Return a list of qualification criteria."""
-        return self.content.get("verification_criteria", [])
+        return self.content.get("verification_criteria", ())
 
-    def description_text(self) -> list[str]:
+    def description_text(self) -> Sequence[str]:
         """Return a list of lines describing the use-case."""
-        return self.content.get("prologue", [])
+        return self.content.get("prologue", ())
 
-    def features_text(self) -> list[str]:
+    def features_text(self) -> Sequence[str]:
         """Return a list of lines describing the features of the use-case."""
-        return self.content.get("features", [])
+        return self.content.get("features", ())
 
     def inputs(self) -> str:
         """Return a list of lines describing the inputs of the use-case."""
@@ -112,13 +165,13 @@ class SpecElement:
         """Return a list of lines describing the outputs of the use-case."""
         return self.usage_sections.get("outputs", "")
 
-    def impact_rationale(self) -> list[str]:
+    def impact_rationale(self) -> Sequence[str]:
         """Return a list of lines describing the tool impact of the use-case."""
-        return self.content.get("tool_impact", [])
+        return self.content.get("tool_impact", ())
 
-    def detectability_rationale(self) -> list[str]:
+    def detectability_rationale(self) -> Sequence[str]:
         """Return a list of lines describing the error detectability of the use-case."""
-        return self.content.get("detectability", [])
+        return self.content.get("detectability", ())
 
     def get_issues(self, config: dict[str, Any]) -> list[str]:
         """Get issues with this spec."""
@@ -130,8 +183,11 @@ class SpecElement:
         """Return a list of problems with this spec."""
         # check we have the minimum linkage
         issues = []
-        # TODO: make this use a helper.
-        ignored_links = dict(line.lower().split(" ") for line in config.get("ignored_links", {}).get(self.variant, []))
+        # a compiled config has built the table of ignored links already, a plain one is split here
+        table = getattr(config, "ignored_link_table", None)
+        if table is None:
+            table = ignored_table(config.get("ignored_links", {}))
+        ignored_links = table.get(self.variant, {})
         required_links = expected_links_for_variant(self.variant, non_functional=self.is_non_functional_requirement)
         for link, target in required_links:
             if ignored_links.get(link.lower()) == target.lower():
@@ -0,0 +1,108 @@
+"""Index spec elements by name and variant for fast lookup."""
+
+import os
+import re
+from collections import defaultdict
+from functools import cached_property, lru_cache
+from pathlib import Path
+
+from spicy.suggest import SuggestionIndex
+
+from .spec_element import SpecElement
+from .spec_utils import expected_links_for_variant, section_name_to_key
+
+SpecVariantMap = defaultdict[str, dict[str, SpecElement]]
+# element -> link key -> names linked
+OutboundLinks = dict[SpecElement, dict[str, frozenset[str]]]
+# (source variant, link key) -> names linked by any spec of the variant
+InboundLinks = defaultdict[tuple[str, str], set[str]]
+
+
+@lru_cache(maxsize=65536)
+def anchorify(text: str) -> str:
+    """Return the mdbook anchor for a heading."""
+    anchor = text.strip().lower().replace(" ", "-")
+    anchor = re.sub(r"[^a-z0-9_-]", "", anchor)
+    anchor = re.sub(r"-+", "-", anchor)
+    return anchor.strip("-")
+
+
+class SpecIndex:
+    """Name and variant lookup tables for a list of spec elements, built once."""
+
+    def __init__(self, elements: list[SpecElement]) -> None:
+        """Construct the lookup tables."""
+        self.elements = elements
+        # when names repeat within a variant, the last one wins
+        self.by_variant: SpecVariantMap = defaultdict(dict)
+        for element in elements:
+            self.by_variant[element.variant][element.name] = element
+        # when names repeat across variants, the first variant wins
+        first_variant: dict[str, str] = {}
+        for element in elements:
+            first_variant.setdefault(element.name, element.variant)
+        self.by_name: dict[str, SpecElement] = {
+            name: self.by_variant[variant][name] for name, variant in first_variant.items()
+        }
+        self._relative_paths: dict[tuple[Path, Path], str] = {}
+        self._suggestions: dict[str, SuggestionIndex] = {}
+
+    def __len__(self) -> int:
+        """Return the number of elements indexed."""
+        return len(self.elements)
+
+    def find(self, name: str) -> SpecElement | None:
+        """Return the element with the given name, or None."""
+        return self.by_name.get(name)
+
+    @cached_property
+    def _links(self) -> tuple[OutboundLinks, InboundLinks]:
+        """Parse the expected links of every indexed spec once, recording them from each spec and to each name."""
+        outbound: OutboundLinks = {}
+        inbound: InboundLinks = defaultdict(set)
+        for variant, specs in self.by_variant.items():
+            link_keys = [section_name_to_key(link) or link for link, _ in expected_links_for_variant(variant)]
+            for spec in specs.values():
+                links = outbound[spec] = {}
+                for link_key in link_keys:
+                    links[link_key] = names = frozenset(spec.get_linked_by(link_key))
+                    inbound[variant, link_key].update(names)
+        return outbound, inbound
+
+    def links_from(self, spec: SpecElement, link_key: str) -> frozenset[str]:
+        """Return the names the spec links to under the link key."""
+        outbound, _ = self._links
+        links = outbound.setdefault(spec, {})
+        if (names := links.get(link_key)) is None:
+            names = links[link_key] = frozenset(spec.get_linked_by(link_key))
+        return names
+
+    def linked_to(self, source_variant: str, link_key: str) -> set[str]:
+        """Return the names linked to under the link key by any spec of the source variant."""
+        _, inbound = self._links
+        if (source_variant, link_key) not in inbound:
+            for spec in self.by_variant.get(source_variant, {}).values():
+                inbound[source_variant, link_key].update(self.links_from(spec, link_key))
+        return inbound[source_variant, link_key]
+
+    def suggestions(self, variant: str) -> SuggestionIndex:
+        """Return the suggestion index over the names of one variant, building it the first time."""
+        if (suggestions := self._suggestions.get(variant)) is None:
+            suggestions = self._suggestions[variant] = SuggestionIndex(self.by_variant.get(variant, {}))
+        return suggestions
+
+    def relative_path(self, target_path: Path, source_directory: Path) -> str:
+        """Return the path of the target relative to the source directory."""
+        key = (source_directory, target_path)
+        if (relative := self._relative_paths.get(key)) is None:
+            relative = os.path.relpath(target_path, source_directory)
+            self._relative_paths[key] = relative
+        return relative
+
+    def markdown_link(self, target_name: str, source_directory: Path) -> str | None:
+        """Return a markdown link to the named element from the source directory, or None if unknown."""
+        target = self.find(target_name)
+        if target is None:
+            return None
+        rel_path = self.relative_path(target.file_path, source_directory)
+        return f"[{target_name}]({rel_path}#{anchorify(target_name)})"
@@ -1,16 +1,24 @@
 """Construct SpecElements as they are read."""
 
-import logging
-from pathlib import Path
+from __future__ import annotations
 
-from markdown_it.tree import SyntaxTreeNode
+import logging
+from typing import TYPE_CHECKING
 
-from spicy.md_read import get_text_from_node, parse_yes_no
+from spicy.deferred import Deferred
+from spicy.md_read import TokenBlock, get_text_from_node, parse_yes_no, split_token_blocks
 
 from .single_spec_builder import SingleSpecBuilder
-from .spec_element import SpecElement
 from .spec_utils import section_name_to_key, spec_name_to_variant
-from .use_case_constants import DETECTABILITY_CLASS, TOOL_IMPACT_CLASS, section_map
+from .use_case_constants import DETECTABILITY_CLASS, TOOL_IMPACT_CLASS, USE_CASE_ID, section_map
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
+
+    from markdown_it.token import Token
+    from markdown_it.tree import SyntaxTreeNode
+
+    from .spec_element import SpecElement
 
 logger = logging.getLogger("SpecParser")
 
@@ -41,11 +49,11 @@ class SpecParser:
         self.parsed_spec_count += 1
         return self.parsed_spec_count - 1
 
-    def _handle_heading(self, node: SyntaxTreeNode) -> None:
+    def _handle_heading(self, node: SyntaxTreeNode | TokenBlock) -> None:
         # figure out which heading level we're at
         level = int(node.tag[1]) - 1
 
-        content = get_text_from_node(node)
+        content = block_text(node)
         self.last_header = content
         self.last_heading_level = level
         self.used_current_spec_level = False
@@ -79,12 +87,12 @@ class SpecParser:
         return header_text.startswith(self.project_prefix)
 
     @staticmethod
-    def _is_use_case(node: SyntaxTreeNode) -> bool:
+    def _is_use_case(node: SyntaxTreeNode | TokenBlock) -> bool:
         """Return true if the node is a use-case code-block."""
-        return bool(node.type == "code_block" and node.content.strip().startswith("ID: "))
+        return bool(node.type == "code_block" and node.content.strip().startswith(USE_CASE_ID))
 
-    def _handle_use_case_node(self, node: SyntaxTreeNode) -> None:
-        use_case_name = node.content.strip().split("ID: ")[1]
+    def _handle_use_case_node(self, node: SyntaxTreeNode | TokenBlock) -> None:
+        use_case_name = node.content.strip().split(USE_CASE_ID)[1]
         self.in_section = "prologue"
         self.section_is_sticky = True
         self.num_cases += 1
@@ -105,8 +113,8 @@ class SpecParser:
 
         self.spec_builders.append(self.builder)
 
-    def _handle_paragraph(self, node: SyntaxTreeNode) -> None:
-        text_content = get_text_from_node(node)
+    def _handle_paragraph(self, node: SyntaxTreeNode | TokenBlock) -> None:
+        text_content = block_text(node)
         if (section_name := looks_like_non_sticky_section(text_content)) is not None:
             section_key = section_name_to_key(section_name)
             logger.debug("looks like non-sticky section %s -> %s", section_name, section_key)
@@ -120,13 +128,15 @@ class SpecParser:
         else:
             logger.debug("builder didn't add %s (no section)", text_content)
 
-    def _handle_bullet_list(self, node: SyntaxTreeNode) -> None:
+    def _handle_bullet_list(self, block: SyntaxTreeNode | TokenBlock) -> None:
+        # lists are only built into a tree when their items are read
+        node = block.tree() if isinstance(block, TokenBlock) and self.in_section is not None else block
         if self.in_section == "usage":
             self.builder.read_usage_bullets(node)
         elif self.in_section is not None:
             self.builder.read_bullets_to_section(node, self.in_section)
         else:  # pragma: no cover
-            logger.debug("Unhandled bullet list : %s", node.pretty())
+            logger.debug("Unhandled bullet list : %s", Deferred(node.pretty))
         if not self.section_is_sticky:
             self.in_section = None
 
@@ -146,7 +156,7 @@ class SpecParser:
             self.builder.parsing_issues.append(f"In {self.builder.location} == {self.detectability=}")
         self.builder.detectability = self.detectability
 
-    def _handle_code_block(self, node: SyntaxTreeNode) -> None:
+    def _handle_code_block(self, node: SyntaxTreeNode | TokenBlock) -> None:
         content = node.content
         if content.startswith(TOOL_IMPACT_CLASS):
             self._handle_tool_impact(content)
@@ -161,10 +171,10 @@ class SpecParser:
         """Build the gathered specs from the builders and return them as a list."""
         return [spec.build() for spec in self.spec_builders]
 
-    def parse_node(self, node: SyntaxTreeNode) -> None:
+    def parse_node(self, node: SyntaxTreeNode | TokenBlock) -> None:
         """Parse a single node."""
-        # Parse a SyntaxTreeNode for common features.
-        logger.debug("Handle %s: %s", node.type, get_text_from_node(node))
+        # Parse a SyntaxTreeNode, or a block of the token stream, for common features.
+        logger.debug("Handle %s: %s", node.type, Deferred(block_text, node))
 
         if self._parse_single_line_section(node):
             return
@@ -183,9 +193,9 @@ class SpecParser:
             elif node.type == "code_block":
                 self._handle_code_block(node)
             else:
-                logger.debug("Unhandled %s\n%s", node.type, node.pretty())
+                logger.debug("Unhandled %s\n%s", node.type, Deferred(node.pretty))
 
-    def _parse_single_line_section(self, node: SyntaxTreeNode) -> bool:
+    def _parse_single_line_section(self, node: SyntaxTreeNode | TokenBlock) -> bool:
         value: tuple[str, str] | None = get_if_single_line_section(node)
         if not value:
             return False
@@ -212,8 +222,27 @@ def parse_syntax_tree_to_spec_elements(project_prefix: str, node: SyntaxTreeNode
     return parser.build_specs()
 
 
+def parse_tokens_to_spec_elements(project_prefix: str, tokens: list[Token], from_file: Path) -> list[SpecElement]:
+    """Parse a markdown-it token stream into a list of Spec Elements, without building a syntax tree.
+
+    The elements are the same as parse_syntax_tree_to_spec_elements gives for the tree of the tokens.
+    """
+    parser = SpecParser(from_file, project_prefix)
+    for block in split_token_blocks(tokens):
+        parser.parse_node(block)
+    return parser.build_specs()
+
+
 # utility functions
 
+
+def block_text(node: SyntaxTreeNode | TokenBlock) -> str:
+    """Return the text of a syntax tree node or a token block."""
+    if isinstance(node, TokenBlock):
+        return node.text
+    return get_text_from_node(node)
+
+
 MAX_WORDS_IN_SECTION_HEADING = 5
 
 
@@ -259,7 +288,7 @@ def looks_like_single_line_field(text_content: str) -> tuple[str, str] | None:
     return simple_preamble, post_colon
 
 
-def get_if_single_line_section(node: SyntaxTreeNode) -> tuple[str, str] | None:
+def get_if_single_line_section(node: SyntaxTreeNode | TokenBlock) -> tuple[str, str] | None:
     """Get the name and value from a single line field, None otherwise."""
-    text = get_text_from_node(node)
+    text = block_text(node)
     return looks_like_single_line_field(text)
@@ -1,7 +1,36 @@
 """Spec specific constants and utility functions."""
 
+from collections.abc import Iterable, Mapping
 from functools import lru_cache
 
+# variant -> lower case link or source name -> lower case target or link name
+IgnoredTable = Mapping[str, Mapping[str, str]]
+
+# the part of a spec name after the project prefix, and the variant it implies
+_spec_name_variants: dict[str, str] = {
+    "STK_NEED": "StakeholderNeed",
+    "STK_REQ": "StakeholderRequirement",
+    "SYS_REQ": "SystemRequirement",
+    "SYS_ELEMENT": "SystemElement",
+    "SW_REQ": "SoftwareRequirement",
+    "SW_ARCH": "SoftwareArchitecture",
+    "SW_UNIT": "SoftwareUnit",
+    "SW_UNIT_TEST": "SoftwareUnitTest",
+    "SW_UNIT_INT": "SoftwareUnitIntegration",
+    "SW_COMP": "SoftwareComponent",
+    "SW_COMP_TEST": "SoftwareComponentTest",
+    "SW_INT": "SoftwareIntegration",
+    "SW_QUAL": "SoftwareQualification",
+    "SYS_INT": "SystemIntegration",
+    "SYS_QUAL": "SystemQualification",
+    "VAL": "Validation",
+}
+
+
+def ignored_table(entries: Mapping[str, list[str]]) -> IgnoredTable:
+    """Split each "Name Target" entry of the ignored links or dependencies into a lookup for each variant."""
+    return {variant: dict(line.lower().split(" ") for line in lines) for variant, lines in entries.items()}
+
 
 def spec_name_to_variant(name: str) -> str | None:
     """Return the variant by guessing from the name, or give up and return None."""
@@ -13,24 +42,7 @@ def spec_name_to_variant(name: str) -> str | None:
     comparison_string = "_".join(variant_parts)
 
     guesses = []
-    for variant_string, variant in {
-        "STK_NEED": "StakeholderNeed",
-        "STK_REQ": "StakeholderRequirement",
-        "SYS_REQ": "SystemRequirement",
-        "SYS_ELEMENT": "SystemElement",
-        "SW_REQ": "SoftwareRequirement",
-        "SW_ARCH": "SoftwareArchitecture",
-        "SW_UNIT": "SoftwareUnit",
-        "SW_UNIT_TEST": "SoftwareUnitTest",
-        "SW_UNIT_INT": "SoftwareUnitIntegration",
-        "SW_COMP": "SoftwareComponent",
-        "SW_COMP_TEST": "SoftwareComponentTest",
-        "SW_INT": "SoftwareIntegration",
-        "SW_QUAL": "SoftwareQualification",
-        "SYS_INT": "SystemIntegration",
-        "SYS_QUAL": "SystemQualification",
-        "VAL": "Validation",
-    }.items():
+    for variant_string, variant in _spec_name_variants.items():
         if comparison_string.startswith(variant_string):
             try:
                 __, post = comparison_string.split(variant_string)
@@ -198,3 +210,15 @@ def spec_is_defined(spec_type_name: str) -> bool:
 def spec_is_software(spec_type_name: str) -> bool:
     """Return whether a spec type is part of a software solution."""
     return spec_type_name in _spec_is_software
+
+
+def related_variants(variants: Iterable[str]) -> set[str]:
+    """Return the variants whose linkage checks involve specs of any of the given variants.
+
+    That is the variants themselves, the variants they link to, and the variants that link to them.
+    """
+    related = set(variants)
+    for variant in list(related):
+        related.update(target for _, target in expected_links_for_variant(variant, include_optional=True))
+        related.update(source for source, _ in expected_backlinks_for_variant(variant, include_optional=True))
+    return related
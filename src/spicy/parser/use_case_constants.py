@@ -1,9 +1,14 @@
 """Use case specific constants and utility functions."""
 
-from markdown_it.tree import SyntaxTreeNode
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
 from spicy.md_read import split_list_item
 
+if TYPE_CHECKING:  # pragma: no cover
+    from markdown_it.tree import SyntaxTreeNode
+
 FEATURES_TITLE = "Features, functions, and technical properties"
 DESCRIPTION_OF_USAGE = "Description of usage"
 PURPOSE = "Purpose:"
@@ -15,6 +20,8 @@ TOOL_IMPACT_HEADING = "Impact analysis of feature"
 TOOL_IMPACT_CLASS = "TI class:"
 DETECTABILITY_HEADING = "Detectability analysis of feature"
 DETECTABILITY_CLASS = "TD class:"
+# the start of a code block naming a use case
+USE_CASE_ID = "ID: "
 
 section_map = {
     "": "prologue",
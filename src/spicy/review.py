@@ -1,11 +1,14 @@
 """Functions to runs checks and review the spec elements."""
 
 import logging
-from collections import Counter, defaultdict
-from collections.abc import Callable
+from collections import Counter
+from collections.abc import Callable, Collection
 from typing import Any
 
+from .config import CompiledConfig, compile_config
+from .deferred import Deferred
 from .parser.spec_element import SpecElement
+from .parser.spec_index import SpecIndex
 from .parser.spec_utils import (
     expected_backlinks_for_variant,
     expected_links_for_variant,
@@ -14,20 +17,32 @@ from .parser.spec_utils import (
     spec_is_defined,
     spec_is_software,
 )
+from .traceability import NO_NODE, TraceGraph
 
-logger = logging.getLogger(__name__)
+# spec flags which hold for everything tracing to a spec holding them, with the attribute giving the flag value
+TRANSITIVE_FLAGS = {"qualification_related": "is_qualification_related"}
 
-SpecVariantMap = defaultdict[str, dict[str, SpecElement]]
+logger = logging.getLogger(__name__)
 
 
-def render_issues_with_elements(
+def render_issues_with_elements(  # noqa: C901, PLR0913
     spec_elements: list[SpecElement],
     *,
     config: dict[str, Any] | None = None,
     render_function: Callable[[str], None] | None = None,
+    spec_index: SpecIndex | None = None,
+    variants: Collection[str] | None = None,
+    focus: Collection[str] | None = None,
+    helpful: bool = False,
 ) -> bool:
-    """Render unresolved issues for each Spec Element."""
-    config = config or {}
+    """Render unresolved issues for each Spec Element.
+
+    Pass the spec_index used when gathering the elements to avoid building it again.
+    Pass variants to limit the spec and linkage checks to specs of those variants.
+    Pass focus to only report the issues of the specs with those names.
+    Pass helpful to suggest the closest spec names for unexpected link targets.
+    """
+    config = compile_config(config or {})
     render_function = render_function or print
     if not spec_elements:
         render_function("No elements.")
@@ -35,30 +50,46 @@ def render_issues_with_elements(
     any_errors = False
     # check for non-unique specs
     for spec_name, count in Counter(x.name for x in spec_elements).items():
-        if count > 1:
+        if count > 1 and (focus is None or spec_name in focus):
             render_function(f"Non unique name {spec_name} has {count} instances")
     # check each spec for any issues
     for spec in spec_elements:
+        if (variants is not None and spec.variant not in variants) or (focus is not None and spec.name not in focus):
+            continue
         for issue in spec.get_issues(config=config):
             render_function(issue)
             any_errors = True
 
-    # prerequisite for this map is that all specs have unique names
-    spec_variant_map: SpecVariantMap = defaultdict(dict)
-    for spec in spec_elements:
-        spec_variant_map[spec.variant][spec.name] = spec
+    # prerequisite for this index is that all specs have unique names
+    if spec_index is None or spec_index.elements is not spec_elements:
+        spec_index = SpecIndex(spec_elements)
 
     for variant in expected_variants():
-        any_errors |= render_spec_linkage_issues(spec_variant_map, render_function, variant, config)
+        if variants is not None and variant not in variants:
+            continue
+        any_errors |= render_spec_linkage_issues(
+            spec_index,
+            render_function,
+            variant,
+            config,
+            focus=focus,
+            helpful=helpful,
+        )
+
+    if config.get("transitives"):
+        any_errors |= render_transitive_issues(spec_index, render_function, config, variants, focus)
 
     return any_errors
 
 
-def render_spec_linkage_issues(
-    spec_variant_map: SpecVariantMap,
+def render_spec_linkage_issues(  # noqa: PLR0913
+    spec_index: SpecIndex,
     render_function: Callable[[str], None],
     spec_type_to_inspect: str,
-    config: dict[str, Any],
+    config: CompiledConfig,
+    *,
+    focus: Collection[str] | None = None,
+    helpful: bool = False,
 ) -> bool:
     """Check all specs links are connected to real specs and any required backlinks are observed."""
     any_errors = False
@@ -66,7 +97,7 @@ def render_spec_linkage_issues(
         msg = f"Spec type [{spec_type_to_inspect}] is not defined."
         raise AssertionError(msg)
 
-    inspected_specs_map = spec_variant_map[spec_type_to_inspect]
+    inspected_specs_map = spec_index.by_variant[spec_type_to_inspect]
     inspected_specs_names = set(inspected_specs_map.keys())
     if not inspected_specs_names:
         return False
@@ -74,36 +105,48 @@ def render_spec_linkage_issues(
         "Have %s spec of type %s (%s)",
         len(inspected_specs_map),
         spec_type_to_inspect,
-        ", ".join(inspected_specs_names),
+        Deferred(", ".join, inspected_specs_names),
     )
 
-    any_errors |= render_spec_simple_linkage_issues(spec_variant_map, render_function, spec_type_to_inspect)
-    any_errors |= render_spec_back_linkage_issues(spec_variant_map, render_function, spec_type_to_inspect, config)
+    any_errors |= render_spec_simple_linkage_issues(
+        spec_index,
+        render_function,
+        spec_type_to_inspect,
+        focus=focus,
+        helpful=helpful,
+    )
+    any_errors |= render_spec_back_linkage_issues(spec_index, render_function, spec_type_to_inspect, config, focus)
 
     return any_errors
 
 
 def render_spec_simple_linkage_issues(
-    spec_variant_map: SpecVariantMap,
+    spec_index: SpecIndex,
     render_function: Callable[[str], None],
     spec_type_to_inspect: str,
+    *,
+    focus: Collection[str] | None = None,
+    helpful: bool = False,
 ) -> bool:
     """Check all specs links are connected to real specs and any required backlinks are observed."""
     any_errors = False
 
-    inspected_specs_map = spec_variant_map[spec_type_to_inspect]
+    inspected_specs_map = spec_index.by_variant[spec_type_to_inspect]
 
     for link, target in expected_links_for_variant(spec_type_to_inspect):
         link_key = section_name_to_key(link) or link
-        target_specs_map = spec_variant_map[target]
-        target_spec_names = set(target_specs_map.keys())
-        logger.debug("Target spec names: %s", ", ".join(target_spec_names))
+        target_specs_map = spec_index.by_variant[target]
+        logger.debug("Target spec names: %s", Deferred(", ".join, target_specs_map))
 
         for inspected_spec in inspected_specs_map.values():
-            fulfilment = set(inspected_spec.get_linked_by(link_key))
-            logger.debug("Fulfilment: %s", ", ".join(fulfilment))
-            if disconnected := fulfilment - target_spec_names:
+            if focus is not None and inspected_spec.name not in focus:
+                continue
+            fulfilment = spec_index.links_from(inspected_spec, link_key)
+            logger.debug("Fulfilment: %s", Deferred(", ".join, fulfilment))
+            if disconnected := {name for name in fulfilment if name not in target_specs_map}:
                 any_errors = True
+                if helpful:
+                    disconnected = {name + suggest_name(spec_index, target, name) for name in disconnected}
                 disconnected_list = ", ".join(sorted(disconnected))
                 render_function(
                     f"{spec_type_to_inspect} {inspected_spec.name} in {inspected_spec.file_path}: "
@@ -112,16 +155,25 @@ def render_spec_simple_linkage_issues(
     return any_errors
 
 
+def suggest_name(spec_index: SpecIndex, variant: str, name: str) -> str:
+    """Return a hint naming the closest spec of the variant, or nothing if none is close."""
+    if closest := spec_index.suggestions(variant).closest(name):
+        return f" (did you mean {closest}?)"
+    return ""
+
+
 def render_spec_back_linkage_issues(
-    spec_variant_map: SpecVariantMap,
+    spec_index: SpecIndex,
     render_function: Callable[[str], None],
     spec_type_to_inspect: str,
-    config: dict[str, Any],
+    config: CompiledConfig,
+    focus: Collection[str] | None = None,
 ) -> bool:
     """Check all specs links are connected to real specs and any required backlinks are observed."""
     any_errors = False
 
-    inspected_specs_map = spec_variant_map[spec_type_to_inspect]
+    inspected_specs_map = spec_index.by_variant[spec_type_to_inspect]
+    ignored_dependencies = config.ignored_dependency_table.get(spec_type_to_inspect, {})
 
     for source, link in expected_backlinks_for_variant(spec_type_to_inspect):
         # unused is per link
@@ -132,18 +184,12 @@ def render_spec_back_linkage_issues(
             unused_target_specs = {name for name, spec in inspected_specs_map.items() if spec.is_software_element}
 
         link_key = section_name_to_key(link) or link
-        source_specs_map = spec_variant_map[source]
-        source_spec_names = set(source_specs_map.keys())
-        logger.debug("Source spec names: %s", ", ".join(source_spec_names))
+        fulfilment = spec_index.linked_to(source, link_key)
+        logger.debug("Linked by %s: %s", source, Deferred(", ".join, fulfilment))
+        unused_target_specs -= fulfilment
+        if focus is not None:
+            unused_target_specs.intersection_update(focus)
 
-        for source_spec in source_specs_map.values():
-            fulfilment = set(source_spec.get_linked_by(link_key))
-            logger.debug("Source link: %s", ", ".join(fulfilment))
-            unused_target_specs = unused_target_specs - fulfilment
-
-        ignored_dependencies = dict(
-            line.lower().split(" ") for line in config.get("ignored_dependencies", {}).get(spec_type_to_inspect, [])
-        )
         if unused_target_specs and ignored_dependencies.get(source.lower()) != link_key.lower():
             any_errors = True
             render_function(f"{spec_type_to_inspect} without a {source} [{link_key}]:")
@@ -152,3 +198,47 @@ def render_spec_back_linkage_issues(
                 render_function(f"\t{unused_target} in {spec.file_path}")
 
     return any_errors
+
+
+def render_transitive_issues(
+    spec_index: SpecIndex,
+    render_function: Callable[[str], None],
+    config: CompiledConfig,
+    variants: Collection[str] | None = None,
+    focus: Collection[str] | None = None,
+) -> bool:
+    """Check no spec is marked without a transitive flag held by a spec it traces to, directly or not.
+
+    With variants or focus, a conflict is reported for the specs of them, and for every spec tracing to one of them
+    however many links away, as a change to any spec a spec traces to can change whether it conflicts.
+    """
+    any_errors = False
+    graph = TraceGraph.from_spec_index(spec_index)
+    in_scope = None
+    if variants is not None or focus is not None:
+        scope = [
+            node
+            for node, spec in enumerate(graph.elements)
+            if (variants is None or spec.variant in variants) and (focus is None or spec.name in focus)
+        ]
+        in_scope = graph.reachable(scope, downstream=True)
+        for node in scope:
+            in_scope[node] = 1
+    for section_name in config["transitives"]:
+        key = section_name_to_key(section_name)
+        if key not in TRANSITIVE_FLAGS:
+            logger.warning("Cannot apply %s transitively", section_name)
+            continue
+        flagged = [node for node, spec in enumerate(graph.elements) if getattr(spec, TRANSITIVE_FLAGS[key])]
+        origins = graph.propagate(flagged)
+        conflicts = [
+            (spec, graph.elements[origin])
+            for node, (spec, origin) in enumerate(zip(graph.elements, origins, strict=True))
+            if origin != NO_NODE and getattr(spec, key) is False and (in_scope is None or in_scope[node])
+        ]
+        if conflicts:
+            any_errors = True
+            render_function(f"Specs marked not {section_name}, tracing to specs which are:")
+            for spec, origin_spec in sorted(conflicts, key=lambda conflict: conflict[0].name):
+                render_function(f"\t{spec.name} in {spec.file_path} traces to {origin_spec.name}")
+    return any_errors
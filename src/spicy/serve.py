@@ -0,0 +1,209 @@
+"""Keep the parsed specs warm in a daemon, answering checks and queries over a Unix socket.
+
+Each request and response is one line of JSON.
+A request names a command, check, query, ping or stop, with the arguments of the command.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import socketserver
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .config import compile_config, find_config_file, load_spicy_config
+from .md_link_check import check_markdown_refs
+from .review import render_issues_with_elements
+from .serve_client import send_request
+from .traceability import TraceGraph
+from .watch import FileWatcher, Workspace
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .config import CompiledConfig
+
+logger = logging.getLogger(__name__)
+
+# how long the daemon waits for a client to send its next request
+REQUEST_TIMEOUT = 5.0
+
+
+class SpecServer:
+    """Answer requests from a workspace kept up to date with the files, re-checking only after a change."""
+
+    def __init__(self, base_path: Path, project_prefix: str, config: CompiledConfig) -> None:
+        """Parse every spec file under the base path."""
+        self.base_path = base_path
+        self.project_prefix = project_prefix
+        self.config_file = find_config_file(base_path)
+        self._config_source = _read_config_source(self.config_file)
+        # the prefix a run without one would use, which is the served one until the config file changes
+        self.config_prefix: str | None = project_prefix
+        self.stopping = False
+        self._load(compile_config(config))
+
+    def _load(self, config: CompiledConfig) -> None:
+        """Parse every spec file found with the config, forgetting every answer."""
+        self.config = config
+        self.watcher = FileWatcher([self.base_path], config)
+        self.workspace = Workspace(self.project_prefix)
+        self.workspace.load(self.watcher.files)
+        self._checks: dict[tuple[bool, bool], dict[str, Any]] = {}
+        self._graph: TraceGraph | None = None
+
+    def refresh(self) -> None:
+        """Re-parse the files changed since the last request, forgetting the answers which depended on them.
+
+        When the config file changed, it is loaded again and every file re-parsed, as any answer could depend on it.
+        """
+        if (source := _read_config_source(self.config_file)) != self._config_source:
+            logger.info("Changed: %s, reloading it", self.config_file)
+            self._config_source = source
+            config = load_spicy_config(self.base_path)
+            self.config_prefix = config.get("prefix")
+            config["prefix"] = self.project_prefix
+            self._load(config)
+            return
+        if changed := self.watcher.poll():
+            logger.info("Changed: %s", ", ".join(sorted(map(str, changed))))
+            self.workspace.update(changed)
+            self._checks.clear()
+            self._graph = None
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Return the response to a request."""
+        command = request.get("command")
+        if command == "ping":
+            return {"ok": True, "path": str(self.base_path.resolve()), "prefix": self.project_prefix}
+        if command == "stop":
+            self.stopping = True
+            return {"ok": True}
+        if command not in {"check", "query"}:
+            return {"ok": False, "error": f"Unknown command {command}"}
+        # refreshed first, as the prefix a run would use comes from the config file
+        self.refresh()
+        if (error := self.mismatch(request)) is not None:
+            return {"ok": False, "error": error}
+        if command == "check":
+            return self.check(check_refs=bool(request.get("check_refs")), helpful=bool(request.get("helpful")))
+        return self.query(str(request.get("name")))
+
+    def mismatch(self, request: dict[str, Any]) -> str | None:
+        """Return why the request is for specs other than those served, or None if it is for these."""
+        if request.get("path") not in {None, str(self.base_path.resolve())}:
+            return f"Serving {self.base_path.resolve()}, not {request['path']}"
+        # file paths are reported as the daemon was given them, so only match a run from the same directory
+        if request.get("cwd") not in {None, str(Path.cwd())}:
+            return f"Serving from {Path.cwd()}, not {request['cwd']}"
+        if (prefix := request.get("prefix") or self.config_prefix) not in {None, self.project_prefix}:
+            return f"Serving prefix {self.project_prefix}, not {prefix}"
+        return None
+
+    def check(self, *, check_refs: bool, helpful: bool) -> dict[str, Any]:
+        """Return the lines and exit code of a check, as a run of spicy would print them."""
+        key = (check_refs, helpful)
+        if (result := self._checks.get(key)) is not None:
+            return result
+        lines: list[str] = []
+        if check_refs and (
+            ref_issues := check_markdown_refs(
+                self.watcher.files,
+                base_path=self.base_path,
+                prefix=self.project_prefix,
+                fix_refs=False,
+                ignored_refs=self.config.ignored_ref_matcher,
+                helpful=helpful,
+                documents=self.workspace.documents,
+            )
+        ):
+            lines = ["Found issues during markdown link checking.", *ref_issues]
+            exit_code = 1
+        elif render_issues_with_elements(
+            self.workspace.elements,
+            config=self.config,
+            render_function=lines.append,
+            spec_index=self.workspace.spec_index,
+            helpful=helpful,
+        ):
+            exit_code = 1
+        else:
+            lines.append(f"No issues found with any of the {len(self.workspace.elements)} specs")
+            exit_code = 0
+        result = self._checks[key] = {"ok": True, "lines": lines, "exit_code": exit_code}
+        return result
+
+    def query(self, name: str) -> dict[str, Any]:
+        """Return what is known about the named spec."""
+        spec_index = self.workspace.spec_index
+        if (spec := spec_index.find(name)) is None:
+            return {"ok": False, "error": f"Unknown spec {name}"}
+        if self._graph is None:
+            self._graph = TraceGraph.from_spec_index(spec_index)
+        return {
+            "ok": True,
+            "name": spec.name,
+            "variant": spec.variant,
+            "file": str(spec.file_path),
+            "links": {key: [target for target, _, _ in links] for key, links in spec.expected_links.items()},
+            "upstream": sorted(self._graph.upstream(spec.name)),
+            "downstream": sorted(self._graph.downstream(spec.name)),
+        }
+
+
+def _read_config_source(config_file: Path) -> bytes | None:
+    """Return the contents of the config file, or None if there is none."""
+    try:
+        return config_file.read_bytes()
+    except OSError:
+        return None
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: _SpecSocketServer
+    # requests are handled one at a time, so a client which sends nothing must not keep the others waiting
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self) -> None:
+        try:
+            for line in self.rfile:
+                try:
+                    response = self.server.spec_server.handle(json.loads(line))
+                except json.JSONDecodeError as error:
+                    response = {"ok": False, "error": f"Bad request: {error}"}
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+                self.wfile.flush()
+        except TimeoutError:
+            logger.debug("Dropped a client which sent no request within %ss", self.timeout)
+
+
+class _SpecSocketServer(socketserver.UnixStreamServer):
+    def __init__(self, socket_path: Path, spec_server: SpecServer) -> None:
+        self.spec_server = spec_server
+        super().__init__(str(socket_path), _RequestHandler)
+
+
+def serve_specs(
+    base_path: Path,
+    project_prefix: str,
+    *,
+    config: CompiledConfig,
+    socket_path: Path,
+) -> None:
+    """Serve requests on the socket until a stop request or an interrupt."""
+    if send_request(socket_path, {"command": "ping"}, timeout=1.0) is not None:
+        logger.error("A spicy daemon is already listening on %s", socket_path)
+        return
+    # left behind by a daemon which did not stop cleanly
+    socket_path.unlink(missing_ok=True)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+    spec_server = SpecServer(base_path, project_prefix, config)
+    logger.info("Serving %s specs from %s on %s", len(spec_server.workspace.elements), base_path, socket_path)
+    with _SpecSocketServer(socket_path, spec_server) as server:
+        try:
+            while not spec_server.stopping:
+                server.handle_request()
+        except KeyboardInterrupt:
+            logger.info("Stopped serving.")
+        finally:
+            socket_path.unlink(missing_ok=True)
@@ -0,0 +1,35 @@
+"""Talk to a running spicy daemon, without importing any of the code the daemon runs."""
+
+import json
+import socket
+from pathlib import Path
+from typing import Any
+
+SOCKET_NAME = "serve.sock"
+
+# how long a client waits for the daemon, which has to re-check after a change
+CLIENT_TIMEOUT = 60.0
+
+
+def socket_path_for(cache_directory: Path) -> Path:
+    """Return where the daemon for a cache directory listens."""
+    return cache_directory / SOCKET_NAME
+
+
+def send_request(socket_path: Path, request: dict[str, Any], timeout: float = CLIENT_TIMEOUT) -> dict[str, Any] | None:
+    """Send a request to the daemon and return its response.
+
+    Return None if no daemon is listening, or it gives no answer which can be read, so the caller can do without it.
+    """
+    if not socket_path.exists():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(timeout)
+            client.connect(str(socket_path))
+            client.sendall(json.dumps(request).encode() + b"\n")
+            with client.makefile("rb") as reader:
+                response = json.loads(reader.readline())
+    except (OSError, ValueError):
+        return None
+    return response if isinstance(response, dict) else None
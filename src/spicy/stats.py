@@ -0,0 +1,155 @@
+"""Time the phases of a run and count what it worked on, for finding where a slow run spends its time."""
+
+from __future__ import annotations
+
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from .md_read import parse_text_to_tokens
+from .parser import parse_tokens_to_spec_elements
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterator
+    from contextlib import AbstractContextManager
+    from pathlib import Path
+
+    from markdown_it.token import Token
+
+    from .parser.spec_element import SpecElement
+    from .parser.spec_index import SpecIndex
+
+# how many of the slowest files to report
+TOP_FILES = 10
+
+
+@dataclass
+class FileStats:
+    """The time spent on one parsed file, and the markdown nodes found in it."""
+
+    path: str
+    bytes: int
+    tokenize_seconds: float
+    parse_seconds: float
+    nodes: Counter[str]
+
+    @property
+    def seconds(self) -> float:
+        """Return the total time spent on the file."""
+        return self.tokenize_seconds + self.parse_seconds
+
+
+def parse_spec_text_with_stats(project_prefix: str, text: str, from_file: Path) -> tuple[list[SpecElement], FileStats]:
+    """Parse the text like parse_spec_text, timing the markdown tokenizing and the spec parsing separately."""
+    start = time.perf_counter()
+    tokens = parse_text_to_tokens(text)
+    tokenized = time.perf_counter()
+    elements = parse_tokens_to_spec_elements(project_prefix, tokens, from_file)
+    parsed = time.perf_counter()
+    nodes = count_nodes(tokens)
+    nodes["root"] += 1
+    return elements, FileStats(str(from_file), len(text.encode()), tokenized - start, parsed - tokenized, nodes)
+
+
+def count_nodes(tokens: list[Token]) -> Counter[str]:
+    """Return the syntax tree nodes the tokens make, by type, without building the tree."""
+    nodes: Counter[str] = Counter()
+    for token in tokens:
+        if token.nesting >= 0:
+            nodes[token.type.removesuffix("_open")] += 1
+        if token.children:
+            nodes.update(count_nodes(token.children))
+    return nodes
+
+
+@dataclass
+class RunStats:
+    """The phase timings and counts of a run."""
+
+    phases: dict[str, float] = field(default_factory=dict)
+    counts: Counter[str] = field(default_factory=Counter)
+    files: list[FileStats] = field(default_factory=list)
+    variants: Counter[str] = field(default_factory=Counter)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the block as the named phase, adding to any time the phase already has."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def add_file(self, file_stats: FileStats) -> None:
+        """Record a parsed file."""
+        self.files.append(file_stats)
+
+    def add_specs(self, spec_index: SpecIndex) -> None:
+        """Count the specs by variant, and the links between them."""
+        self.variants.update(element.variant for element in spec_index.elements)
+        self.counts["specs"] += len(spec_index.elements)
+        self.counts["links"] += sum(
+            len(links) for element in spec_index.elements for links in element.expected_links.values()
+        )
+
+    @property
+    def nodes(self) -> Counter[str]:
+        """Return the markdown nodes of the parsed files, by type."""
+        nodes: Counter[str] = Counter()
+        for file_stats in self.files:
+            nodes.update(file_stats.nodes)
+        return nodes
+
+    def slowest_files(self, count: int = TOP_FILES) -> list[FileStats]:
+        """Return the parsed files which took longest, slowest first."""
+        return sorted(self.files, key=lambda file_stats: -file_stats.seconds)[:count]
+
+    def to_dict(self, top_files: int = TOP_FILES) -> dict[str, Any]:
+        """Return the stats as plain data, for writing as JSON."""
+        return {
+            "phases": self.phases,
+            "counts": dict(self.counts),
+            "tokenize_seconds": sum(file_stats.tokenize_seconds for file_stats in self.files),
+            "parse_seconds": sum(file_stats.parse_seconds for file_stats in self.files),
+            "nodes": dict(self.nodes.most_common()),
+            "variants": dict(self.variants.most_common()),
+            "slowest_files": [
+                {
+                    "path": file_stats.path,
+                    "bytes": file_stats.bytes,
+                    "tokenize_seconds": file_stats.tokenize_seconds,
+                    "parse_seconds": file_stats.parse_seconds,
+                }
+                for file_stats in self.slowest_files(top_files)
+            ],
+        }
+
+    def report(self, top_files: int = TOP_FILES) -> list[str]:
+        """Return the stats as lines of text."""
+        lines = ["Phases:"]
+        lines.extend(f"\t{name}: {seconds * 1000:.1f}ms" for name, seconds in self.phases.items())
+        if self.files:
+            data = self.to_dict(top_files)
+            lines.append(f"\tmarkdown tokenizing, summed over files: {data['tokenize_seconds'] * 1000:.1f}ms")
+            lines.append(f"\tspec parsing, summed over files: {data['parse_seconds'] * 1000:.1f}ms")
+        lines.append("Counts:")
+        lines.extend(f"\t{name}: {count}" for name, count in self.counts.items())
+        if self.variants:
+            lines.append("Specs by variant:")
+            lines.extend(f"\t{variant}: {count}" for variant, count in self.variants.most_common())
+        if self.files:
+            lines.append("Markdown nodes by type:")
+            lines.extend(f"\t{node_type}: {count}" for node_type, count in self.nodes.most_common())
+            lines.append(f"Slowest {top_files} files:")
+            lines.extend(
+                f"\t{file_stats.seconds * 1000:.1f}ms {file_stats.path} ({file_stats.bytes} bytes)"
+                for file_stats in self.slowest_files(top_files)
+            )
+        return lines
+
+
+def timed_phase(stats: RunStats | None, name: str) -> AbstractContextManager[None]:
+    """Return a context timing the named phase, or doing nothing without stats."""
+    return nullcontext() if stats is None else stats.phase(name)
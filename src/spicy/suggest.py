@@ -0,0 +1,77 @@
+"""Suggest the closest known names for a misspelt one, for the helpful output."""
+
+import math
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from difflib import SequenceMatcher
+
+# how many candidates are re-ranked by the slow, exact comparison
+SHORTLIST_SIZE = 32
+
+# how many names sharing the most uncommon trigrams are scored with every trigram, to pick the shortlist
+POOL_SIZE = 8 * SHORTLIST_SIZE
+
+# trigrams found in more than this share of the names, like the project prefix, are too common to gather names by
+COMMON_TRIGRAM_SHARE = 0.1
+
+
+def _pad(text: str) -> str:
+    return f"  {text.lower()} "
+
+
+def trigrams(text: str) -> set[str]:
+    """Return the set of three letter substrings of the text, padded so short texts have some."""
+    padded = _pad(text)
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+class SuggestionIndex:
+    """Trigram index over a fixed set of names, built once and queried for each unknown name.
+
+    The names sharing the most uncommon trigrams with the query are gathered from the index,
+    then scored by all the trigrams they share with it, each weighted by how rare it is (its IDF),
+    so trigrams common to many names, like the spec type, still tell apart names equal in the rest.
+    Only the best scoring shortlist is ranked with SequenceMatcher, so a query does not compare against every name.
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        """Index the names."""
+        self.names = list(dict.fromkeys(names))
+        self._padded = [_pad(name) for name in self.names]
+        self._postings: defaultdict[str, list[int]] = defaultdict(list)
+        for name_id, name in enumerate(self.names):
+            for trigram in trigrams(name):
+                self._postings[trigram].append(name_id)
+        self._common_limit = max(SHORTLIST_SIZE, int(len(self.names) * COMMON_TRIGRAM_SHARE))
+
+    def __len__(self) -> int:
+        """Return the number of names indexed."""
+        return len(self.names)
+
+    def candidates(self, needle: str, limit: int = SHORTLIST_SIZE) -> list[int]:
+        """Return the ids of the names sharing the most trigrams with the needle, weighted by their rarity."""
+        shared = [trigram for trigram in trigrams(needle) if trigram in self._postings]
+        rare = [trigram for trigram in shared if len(self._postings[trigram]) <= self._common_limit]
+        counts: Counter[int] = Counter()
+        for trigram in rare or shared:
+            counts.update(self._postings[trigram])
+        weights = {trigram: math.log(len(self.names) / len(self._postings[trigram])) for trigram in shared}
+        scored = sorted(
+            (-sum(weight for trigram, weight in weights.items() if trigram in self._padded[name_id]), name_id)
+            for name_id, _ in counts.most_common(max(limit, POOL_SIZE))
+        )
+        return [name_id for _, name_id in scored[:limit]]
+
+    def suggest(self, needle: str, count: int = 1) -> list[str]:
+        """Return up to count of the closest names, best first."""
+        scored = []
+        for name_id in self.candidates(needle):
+            score = SequenceMatcher(a=needle, b=self.names[name_id]).ratio()
+            if score > 0:
+                scored.append((-score, name_id))
+        return [self.names[name_id] for _, name_id in sorted(scored)[:count]]
+
+    def closest(self, needle: str) -> str:
+        """Return the closest name, or an empty string if nothing is close."""
+        best = self.suggest(needle)
+        return best[0] if best else ""
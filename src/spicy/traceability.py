@@ -0,0 +1,188 @@
+"""Traceability graph over the spec links, for questions spanning more than one link."""
+
+from array import array
+from collections.abc import Iterable
+
+from .parser.spec_element import SpecElement
+from .parser.spec_index import SpecIndex
+from .parser.spec_utils import expected_links_for_variant, section_name_to_key
+
+NO_NODE = -1
+
+
+def _reverse(offsets: array, targets: array) -> tuple[array, array]:
+    """Return the adjacency arrays with every edge turned around."""
+    counts = [0] * len(offsets)
+    for target in targets:
+        counts[target + 1] += 1
+    reverse_offsets = array("i", counts)
+    for node in range(1, len(reverse_offsets)):
+        reverse_offsets[node] += reverse_offsets[node - 1]
+    reverse_targets = array("i", bytes(4 * len(targets)))
+    fill = array("i", reverse_offsets)
+    for source in range(len(offsets) - 1):
+        for target in targets[offsets[source] : offsets[source + 1]]:
+            reverse_targets[fill[target]] = source
+            fill[target] += 1
+    return reverse_offsets, reverse_targets
+
+
+class TraceGraph:
+    """The specs as integer nodes, with their links stored as compressed adjacency arrays.
+
+    Upstream edges follow the required links of each spec, from the spec to what it traces to,
+    such as from a system requirement to the stakeholder requirement it is derived from.
+    Downstream edges are the same links turned around.
+    """
+
+    def __init__(self, elements: list[SpecElement], links: list[Iterable[int]]) -> None:
+        """Construct the adjacency arrays from the upstream links of each element."""
+        self.elements = elements
+        self.ids = {element.name: node for node, element in enumerate(elements)}
+        self.upstream_offsets = array("i", [0])
+        self.upstream_targets = array("i")
+        for node_links in links:
+            self.upstream_targets.extend(sorted(set(node_links)))
+            self.upstream_offsets.append(len(self.upstream_targets))
+        self.downstream_offsets, self.downstream_targets = _reverse(self.upstream_offsets, self.upstream_targets)
+
+    @classmethod
+    def from_spec_index(cls, spec_index: SpecIndex) -> "TraceGraph":
+        """Build the graph from the required links of every indexed spec."""
+        elements = list(spec_index.by_name.values())
+        ids = {element.name: node for node, element in enumerate(elements)}
+        links = []
+        for element in elements:
+            node_links = []
+            for link, _ in expected_links_for_variant(element.variant):
+                link_key = section_name_to_key(link) or link
+                node_links.extend(ids[name] for name in spec_index.links_from(element, link_key) if name in ids)
+            links.append(node_links)
+        return cls(elements, links)
+
+    def __len__(self) -> int:
+        """Return the number of specs in the graph."""
+        return len(self.elements)
+
+    @property
+    def link_count(self) -> int:
+        """Return the number of links in the graph."""
+        return len(self.upstream_targets)
+
+    def _arrays(self, *, downstream: bool) -> tuple[array, array]:
+        if downstream:
+            return self.downstream_offsets, self.downstream_targets
+        return self.upstream_offsets, self.upstream_targets
+
+    def reachable(self, sources: Iterable[int], *, downstream: bool = False) -> bytearray:
+        """Return a byte per node, set for the nodes reachable from any source, not counting the sources."""
+        offsets, targets = self._arrays(downstream=downstream)
+        seen = bytearray(len(self))
+        frontier = list(sources)
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                for target in targets[offsets[node] : offsets[node + 1]]:
+                    if not seen[target]:
+                        seen[target] = 1
+                        next_frontier.append(target)
+            frontier = next_frontier
+        return seen
+
+    def _names(self, seen: bytearray) -> set[str]:
+        return {self.elements[node].name for node in range(len(seen)) if seen[node]}
+
+    def upstream(self, name: str) -> set[str]:
+        """Return the names of every spec the named spec traces to, directly or not."""
+        return self._names(self.reachable([self.ids[name]]))
+
+    def downstream(self, name: str) -> set[str]:
+        """Return the names of every spec tracing to the named spec, directly or not."""
+        return self._names(self.reachable([self.ids[name]], downstream=True))
+
+    def propagate(self, flagged: Iterable[int], *, downstream: bool = True) -> array:
+        """Return, for each node, a flagged node it is reached from, or NO_NODE.
+
+        One pass from all the flagged nodes at once, so each link is followed at most once.
+        Flagged nodes are their own origin.
+        """
+        offsets, targets = self._arrays(downstream=downstream)
+        origin = array("i", [NO_NODE]) * len(self)
+        frontier = []
+        for node in flagged:
+            origin[node] = node
+            frontier.append(node)
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                for target in targets[offsets[node] : offsets[node + 1]]:
+                    if origin[target] == NO_NODE:
+                        origin[target] = origin[node]
+                        next_frontier.append(target)
+            frontier = next_frontier
+        return origin
+
+    def components(self) -> list[list[int]]:  # noqa: C901
+        """Return the strongly connected components of the upstream graph, with upstream components first."""
+        offsets, targets = self.upstream_offsets, self.upstream_targets
+        index = array("i", [NO_NODE]) * len(self)
+        lowlink = array("i", [0]) * len(self)
+        on_stack = bytearray(len(self))
+        stack: list[int] = []
+        components: list[list[int]] = []
+        counter = 0
+        for root in range(len(self)):
+            if index[root] != NO_NODE:
+                continue
+            # iterative Tarjan, each work item is a node and the position of the next edge to follow
+            work = [(root, offsets[root])]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            while work:
+                node, edge = work[-1]
+                if edge < offsets[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    target = targets[edge]
+                    if index[target] == NO_NODE:
+                        index[target] = lowlink[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = 1
+                        work.append((target, offsets[target]))
+                    elif on_stack[target]:
+                        lowlink[node] = min(lowlink[node], index[target])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        return components
+
+    def closure(self) -> list[int]:
+        """Return the upstream transitive closure, as a bitset of reachable nodes for each node.
+
+        Nodes in a cycle reach each other and themselves.
+        Each bitset has a bit for every node, so this is meant for reports rather than for every run.
+        """
+        offsets, targets = self.upstream_offsets, self.upstream_targets
+        reach = [0] * len(self)
+        # Tarjan finds components that are reached before the components reaching them
+        for component in self.components():
+            bits = 0
+            for node in component:
+                for target in targets[offsets[node] : offsets[node + 1]]:
+                    bits |= reach[target] | (1 << target)
+            for node in component:
+                reach[node] = bits
+        return reach
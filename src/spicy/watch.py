@@ -0,0 +1,161 @@
+"""Watch the spec files and re-analyse only what changed."""
+
+import logging
+import time
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import Any
+
+from .config import compile_config
+from .discovery import spec_file_finder
+from .documents import DocumentStore
+from .gather import build_expected_links, parse_spec_text
+from .md_link_check import check_markdown_refs
+from .parser.spec_element import SpecElement
+from .parser.spec_index import SpecIndex
+from .parser.spec_utils import related_variants
+from .review import render_issues_with_elements
+
+logger = logging.getLogger(__name__)
+
+FileSignature = tuple[int, int]
+
+
+class FileWatcher:
+    """Poll the markdown files under some paths for changes, without needing any file system service.
+
+    The listing of each directory is kept, so only the directories which changed are listed again.
+    """
+
+    def __init__(self, watched_paths: list[Path], config: Mapping[str, Any] | None = None) -> None:
+        """Construct the basic properties, taking a first snapshot of the files.
+
+        The files excluded by the config, or ignored by git, are not watched.
+        """
+        self.watched_paths = watched_paths
+        self.finders = {path: spec_file_finder(path, config or {}) for path in watched_paths}
+        self.snapshot = self.scan()
+
+    @property
+    def files(self) -> list[Path]:
+        """Return the files seen in the last snapshot."""
+        return list(self.snapshot)
+
+    def scan(self) -> dict[Path, FileSignature]:
+        """Return the modification time and size of every watched file."""
+        signatures: dict[Path, FileSignature] = {}
+        paths = [
+            found for path in self.watched_paths for found in (self.finders[path].find() if path.is_dir() else [path])
+        ]
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signatures[path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def poll(self) -> set[Path]:
+        """Return the files added, modified or removed since the last poll."""
+        previous, self.snapshot = self.snapshot, self.scan()
+        changed = {path for path, signature in self.snapshot.items() if previous.get(path) != signature}
+        changed.update(path for path in previous if path not in self.snapshot)
+        return changed
+
+
+class Workspace:
+    """Keep the parsed elements in memory, re-parsing only the files that change."""
+
+    def __init__(self, project_prefix: str, documents: DocumentStore | None = None) -> None:
+        """Construct the basic properties."""
+        self.project_prefix = project_prefix
+        self.documents = documents or DocumentStore()
+        self.elements_by_file: dict[Path, list[SpecElement]] = {}
+        self.spec_index = SpecIndex([])
+
+    @property
+    def elements(self) -> list[SpecElement]:
+        """Return all the elements, in file order."""
+        return self.spec_index.elements
+
+    def _parse(self, path: Path) -> list[SpecElement]:
+        return parse_spec_text(self.project_prefix, self.documents.text(path), path)
+
+    def _relink(self) -> None:
+        elements = [element for path in sorted(self.elements_by_file) for element in self.elements_by_file[path]]
+        self.spec_index = SpecIndex(elements)
+        build_expected_links(elements, self.spec_index)
+
+    def load(self, paths: list[Path]) -> None:
+        """Parse all the files from scratch."""
+        self.elements_by_file = {path: self._parse(path) for path in paths}
+        self._relink()
+
+    def update(self, changed_paths: set[Path]) -> set[str]:
+        """Re-parse the changed files and return the variants with checks affected by the change."""
+        changed_variants: set[str] = set()
+        for path in changed_paths:
+            self.documents.forget(path)
+            changed_variants.update(element.variant for element in self.elements_by_file.pop(path, []))
+            if path.is_file():
+                self.elements_by_file[path] = self._parse(path)
+                changed_variants.update(element.variant for element in self.elements_by_file[path])
+        self._relink()
+        return related_variants(changed_variants)
+
+
+def watch_specs(  # noqa: PLR0913
+    watched_paths: list[Path],
+    project_prefix: str,
+    *,
+    config: dict[str, Any],
+    base_path: Path,
+    check_refs: bool = False,
+    helpful: bool = False,
+    render_function: Callable[[str], None] = print,
+    interval: float = 0.5,
+    max_cycles: int | None = None,
+) -> None:
+    """Analyse the specs, then re-analyse whenever a file changes, until interrupted."""
+    config = compile_config(config)
+    watcher = FileWatcher(watched_paths, config)
+    workspace = Workspace(project_prefix)
+    workspace.load(watcher.files)
+
+    def analyse(variants: set[str] | None) -> None:
+        if check_refs:
+            for issue in check_markdown_refs(
+                watcher.files,
+                base_path=base_path,
+                prefix=project_prefix,
+                fix_refs=False,
+                ignored_refs=config.ignored_ref_matcher,
+                helpful=helpful,
+                documents=workspace.documents,
+            ):
+                render_function(issue)
+        if not render_issues_with_elements(
+            workspace.elements,
+            config=config,
+            render_function=render_function,
+            spec_index=workspace.spec_index,
+            variants=variants,
+            helpful=helpful,
+        ):
+            render_function(f"No issues found with any of the {len(workspace.elements)} specs")
+
+    analyse(None)
+    cycles = 0
+    try:
+        while max_cycles is None or cycles < max_cycles:
+            cycles += 1
+            time.sleep(interval)
+            if not (changed := watcher.poll()):
+                continue
+            start = time.perf_counter()
+            variants = workspace.update(changed)
+            render_function(f"Changed: {', '.join(sorted(map(str, changed)))}")
+            analyse(variants)
+            logger.debug("Re-analysed %s files in %.1fms", len(changed), (time.perf_counter() - start) * 1000)
+    except KeyboardInterrupt:
+        logger.info("Stopped watching.")
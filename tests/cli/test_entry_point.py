@@ -1,8 +1,12 @@
 """Test the use spec checker cli."""
 
+import json
 import logging
+import pstats
 import re
 import shutil
+import subprocess
+import sys
 from pathlib import Path
 
 import pytest
@@ -155,3 +159,154 @@ def test_entry_point_fix_reference_links(tmpdir: Path, fixable_link_data_path: P
 
     # errors are suppressed if they are fixed
     assert result.exit_code == 0, result.stdout
+
+
+def test_parallel_jobs(test_data_path: Path) -> None:
+    """Test the jobs option reports the same issues as a serial run."""
+    runner = CliRunner()
+    serial = runner.invoke(run, ["-p", "TD", str(test_data_path / "spec")])
+    parallel = runner.invoke(run, ["-p", "TD", "--jobs", "2", str(test_data_path / "spec")])
+    assert parallel.exit_code == serial.exit_code
+    assert parallel.stdout == serial.stdout
+
+
+def test_cache_options(test_data_path: Path, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Test the parse cache is used by default and can be cleared or disabled."""
+    runner = CliRunner()
+    spec_args = ["-p", "TD", "--cache-dir", str(tmp_path), str(test_data_path / "spec")]
+    with caplog.at_level(logging.INFO):
+        first = runner.invoke(run, spec_args)
+        assert "Parse cache: 0 hits" in caplog.text
+        caplog.clear()
+
+        second = runner.invoke(run, spec_args)
+        assert "0 misses" in caplog.text
+        assert second.stdout == first.stdout
+        caplog.clear()
+
+        runner.invoke(run, [*spec_args, "--clear-cache"])
+        assert "Parse cache: 0 hits" in caplog.text
+        caplog.clear()
+
+        runner.invoke(run, [*spec_args, "--no-cache"])
+        assert "Parse cache" not in caplog.text
+
+
+def test_changed_since(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Test only the specs affected by the changes since a git ref are reported."""
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "spicy.yaml").write_text("prefix: TD\n")
+    (docs / "stakeholder.md").write_text("# TD_STK_REQ_one\n\nThe **TD** does one.\n")
+    (docs / "system.md").write_text(
+        "# TD_SYS_REQ_x\n\nThe **TD** does x.\n\nDerived from:\n\n- TD_STK_REQ_one\n\n"
+        "# TD_SYS_REQ_y\n\nThe **TD** does y.\n\nDerived from:\n\n- TD_STK_REQ_missing\n",
+    )
+    identity = ["-c", "user.name=spicy", "-c", "user.email=spicy@example.com"]
+    for command in (["init", "-q"], ["add", "."], ["commit", "-q", "-m", "base"]):
+        subprocess.run(["git", *identity, *command], check=True, capture_output=True, cwd=tmp_path)
+    (docs / "stakeholder.md").write_text("# TD_STK_REQ_uno\n\nThe **TD** does one.\n")
+
+    runner = CliRunner()
+    cache_args = ["--cache-dir", str(tmp_path / "cache"), str(docs)]
+    result = runner.invoke(run, ["--changed-since", "HEAD", *cache_args])
+    assert result.exit_code == 1
+    assert "TD_SYS_REQ_x in" in result.stdout
+    assert "TD_STK_REQ_one" in result.stdout
+    assert "TD_SYS_REQ_y" not in result.stdout
+
+    with caplog.at_level(logging.ERROR):
+        result = runner.invoke(run, ["--changed-since", "not-a-ref", *cache_args])
+        assert result.exit_code == 1
+        assert "Unable to find the files changed since not-a-ref" in caplog.text
+        caplog.clear()
+
+        result = runner.invoke(run, ["--changed-since", "HEAD", "--no-cache", *cache_args])
+        assert result.exit_code == 1
+        assert "without the cache" in caplog.text
+
+
+# generous, as the suite runs on slow machines too, the heavy modules are checked for by name
+IMPORT_TIME_BUDGET_MICROSECONDS = 500_000
+
+
+def test_import_time() -> None:
+    """Test importing the command line stays cheap, leaving the markdown and yaml modules until a run needs them."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import spicy.entry_point"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    # each line is "import time: self | cumulative | module", with the module indented by its depth
+    cumulative = {
+        module.strip(): int(total) for _, total, module in (line.split("|") for line in result.stderr.splitlines()[1:])
+    }
+    assert not {"markdown_it", "mdformat", "yaml"} & cumulative.keys()
+    assert cumulative["spicy.entry_point"] < IMPORT_TIME_BUDGET_MICROSECONDS
+
+
+def test_stats_options(positive_test_data_path: Path, tmp_path: Path) -> None:
+    """Test the stats are reported as text and JSON, and the run can be profiled."""
+    runner = CliRunner()
+    stats_file = tmp_path / "stats.json"
+    profile_file = tmp_path / "run.prof"
+    result = runner.invoke(
+        run,
+        [
+            *["-p", "POS", "--no-cache", "--stats"],
+            *["--stats-json", str(stats_file), "--profile", str(profile_file)],
+            str(positive_test_data_path),
+        ],
+    )
+    assert "Phases:" in result.stderr
+    assert "Slowest 10 files:" in result.stderr
+    stats = json.loads(stats_file.read_text())
+    assert list(stats["phases"]) == ["discovery", "read", "parse", "link", "review"]
+    assert stats["counts"]["regex_evaluations"] == 0
+    assert stats["counts"]["files"] == 1
+    assert pstats.Stats(str(profile_file)).total_calls > 0
+
+
+def test_shard_and_merge(test_data_path: Path, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Test checking the merged indexes of every shard reports the same as checking the files."""
+    spec_path = str(test_data_path / "spec")
+    runner = CliRunner()
+    common = ["-p", "TD", "--cache-dir", str(tmp_path / "cache")]
+    for check_args in ([], ["--check-refs"]):
+        whole = runner.invoke(run, [*common, "--no-daemon", *check_args, spec_path])
+        for number in (1, 2, 3):
+            output = str(tmp_path / "shards" / f"{number}.json")
+            result = runner.invoke(run, [*common, "--shard", f"{number}/3", "-o", output, spec_path])
+            assert result.exit_code == 0, result.output
+        merged = runner.invoke(run, [*common, *check_args, "--merge", str(tmp_path / "shards"), spec_path])
+        assert (merged.exit_code, merged.stdout) == (whole.exit_code, whole.stdout)
+
+    result = runner.invoke(run, [*common, "--shard", "1/3", spec_path])
+    assert result.exit_code == 1
+    usage_error = 2
+    result = runner.invoke(run, [*common, "--shard", "4/3", "-o", str(tmp_path / "bad.json"), spec_path])
+    assert result.exit_code == usage_error
+    with caplog.at_level(logging.ERROR, logger="spicy.entry_point"):
+        result = runner.invoke(run, [*common, "--merge", str(tmp_path / "shards" / "1.json"), spec_path])
+    assert result.exit_code == 1
+    assert "missing shards 2/3, 3/3" in caplog.text
+
+
+def test_compile_and_link(test_data_path: Path, tmp_path: Path) -> None:
+    """Test checking the linked indexes of each file reports the same as checking the files."""
+    spec_path = test_data_path / "spec"
+    runner = CliRunner()
+    common = ["-p", "TD", "--no-cache"]
+    whole = runner.invoke(run, [*common, str(spec_path)])
+    link_args = []
+    for spec_file in sorted(spec_path.glob("*.md")):
+        output = tmp_path / f"{spec_file.name}.spicy.json"
+        result = runner.invoke(run, [*common, "-o", str(output), str(spec_file)])
+        assert result.exit_code == 0, result.output
+        link_args.extend(["--merge", str(output)])
+    linked = runner.invoke(run, [*common, *link_args, str(spec_path)])
+    assert (linked.exit_code, linked.stdout) == (whole.exit_code, whole.stdout)
+
+    result = runner.invoke(run, [*common, *link_args, str(test_data_path / "simple")])
+    assert result.exit_code == 1
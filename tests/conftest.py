@@ -1,9 +1,32 @@
 """pytest configuration and fixtures."""
 
+import os
+from collections.abc import Callable
 from pathlib import Path
 
 import pytest
 
+import spicy.cache
+
+
+@pytest.fixture(autouse=True)
+def user_cache_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keep the caches of runs without --cache-dir in the test's own directory, not the user's."""
+    cache_directory = tmp_path / "user_cache"
+    monkeypatch.setattr(spicy.cache, "user_cache_directory", lambda: cache_directory)
+    return cache_directory
+
+
+@pytest.fixture
+def touch_later() -> Callable[[Path], None]:
+    """Return a function moving the modification time of a file forward, so a change is seen on coarse file systems."""
+
+    def touch(path: Path) -> None:
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    return touch
+
 
 @pytest.fixture
 def test_data_path() -> Path:
@@ -1,6 +1,7 @@
 """Test the use-cases parser."""
 
 import logging
+import pickle
 from pathlib import Path
 
 import pytest
@@ -62,6 +63,14 @@ def test_spec_element_construction(basic_spec_element: SpecElement) -> None:
     assert not basic_spec_element.get_linked_by("fulfils")
 
 
+def test_spec_element_str_shows_sections_as_lists(spec_element_with_links: SpecElement) -> None:
+    """Test the sections are shown as lists, whether read as lists or kept as tuples."""
+    listed = str(spec_element_with_links)
+    assert "fulfils:['PRJ_SYS_REQ_installation_guidance']" in listed
+    spec_element_with_links.content = {key: tuple(value) for key, value in spec_element_with_links.content.items()}
+    assert str(spec_element_with_links) == listed
+
+
 def test_spec_element_misuse(basic_spec_element: SpecElement, caplog: pytest.LogCaptureFixture) -> None:
     """Test the basic spec element construction."""
     basic_spec_element.content["non-list"] = "This is just a string"  # type: ignore[assignment]
@@ -173,3 +182,15 @@ def test_spec_element_issues(basic_spec_element: SpecElement) -> None:
     }
     issues = spec_with_missing_links.get_issues(ignored_config)
     assert not issues
+
+
+def test_spec_element_is_compact(spec_element_with_links: SpecElement) -> None:
+    """Test elements have no instance dict, and unpickled elements share their strings."""
+    assert not hasattr(spec_element_with_links, "__dict__")
+
+    copies = pickle.loads(pickle.dumps([spec_element_with_links]))
+    first = pickle.loads(pickle.dumps(spec_element_with_links))
+    assert copies[0].variant is first.variant
+    assert copies[0].name is first.name
+    assert next(iter(copies[0].content)) is next(iter(first.content))
+    assert first.get_linked_by("fulfils") == ["PRJ_SYS_REQ_installation_guidance"]
@@ -0,0 +1,60 @@
+"""Test the spec index."""
+
+from pathlib import Path
+
+from spicy.parser.spec_element import SpecElement
+from spicy.parser.spec_index import SpecIndex, anchorify
+
+
+def test_anchorify() -> None:
+    """Test heading text is turned into an mdbook anchor."""
+    assert anchorify("TD_SYS_REQ_thing") == "td_sys_req_thing"
+    assert anchorify(" A heading -- with (punctuation) ") == "a-heading-with-punctuation"
+
+
+def test_spec_index_lookup() -> None:
+    """Test elements can be found by name and by variant."""
+    need = SpecElement("TD_STK_NEED_a", "StakeholderNeed", 0, Path("docs/needs.md"))
+    req = SpecElement("TD_STK_REQ_b", "StakeholderRequirement", 1, Path("docs/reqs/reqs.md"))
+    elements = [need, req]
+    index = SpecIndex(elements)
+
+    assert len(index) == len(elements)
+    assert index.find("TD_STK_NEED_a") is need
+    assert index.find("TD_STK_NEED_missing") is None
+    assert index.by_variant["StakeholderRequirement"] == {"TD_STK_REQ_b": req}
+    assert not index.by_variant["SystemRequirement"]
+
+    assert index.markdown_link("TD_STK_NEED_a", req.file_path.parent) == "[TD_STK_NEED_a](../needs.md#td_stk_need_a)"
+    assert index.markdown_link("TD_STK_NEED_missing", req.file_path.parent) is None
+
+
+def test_spec_index_duplicates() -> None:
+    """Test duplicate names resolve the same way every time."""
+    first = SpecElement("TD_DUPE", "SystemRequirement", 0, Path("a.md"))
+    second = SpecElement("TD_DUPE", "SystemRequirement", 1, Path("b.md"))
+    other = SpecElement("TD_DUPE", "SystemElement", 2, Path("c.md"))
+    index = SpecIndex([first, second, other])
+
+    assert index.find("TD_DUPE") is second
+    assert index.by_variant["SystemElement"]["TD_DUPE"] is other
+
+
+def test_spec_index_links() -> None:
+    """Test links are parsed once, and looked up from each spec and to each variant."""
+    need = SpecElement("TD_STK_NEED_a", "StakeholderNeed", 0, Path("docs/needs.md"))
+    first = SpecElement("TD_STK_REQ_b", "StakeholderRequirement", 1, Path("docs/reqs.md"))
+    first.content["implements"] = ["[TD_STK_NEED_a](needs.md#td_stk_need_a)", "TD_STK_NEED_gone"]
+    second = SpecElement("TD_STK_REQ_c", "StakeholderRequirement", 2, Path("docs/reqs.md"))
+    second.content["implements"] = ["TD_STK_NEED_a"]
+    second.content["notes"] = ["TD_STK_NEED_noted"]
+    index = SpecIndex([need, first, second])
+
+    assert index.links_from(first, "implements") == {"TD_STK_NEED_a", "TD_STK_NEED_gone"}
+    assert index.links_from(need, "implements") == frozenset()
+    assert index.linked_to("StakeholderRequirement", "implements") == {"TD_STK_NEED_a", "TD_STK_NEED_gone"}
+    assert not index.linked_to("SystemRequirement", "derived_from")
+
+    # links outside the expected ones are parsed when first asked for
+    assert index.links_from(second, "notes") == {"TD_STK_NEED_noted"}
+    assert index.linked_to("StakeholderRequirement", "notes") == {"TD_STK_NEED_noted"}
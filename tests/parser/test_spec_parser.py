@@ -1,18 +1,21 @@
 """Test the use-cases parser."""
 
 import logging
+from collections import Counter
 from pathlib import Path
 
 import pytest
+from markdown_it.tree import SyntaxTreeNode
 
 from spicy.gather import get_elements_from_files
-from spicy.md_read import load_syntax_tree, parse_text_to_syntax_tree
+from spicy.md_read import get_text_from_node, load_syntax_tree, parse_text_to_syntax_tree, parse_text_to_tokens
 from spicy.parser.spec_element import SpecElement
 from spicy.parser.spec_parser import (
     SpecParser,
     looks_like_non_sticky_section,
     looks_like_single_line_field,
     parse_syntax_tree_to_spec_elements,
+    parse_tokens_to_spec_elements,
 )
 
 
@@ -245,9 +248,74 @@ def test_valid_sys_req(test_data_path: Path, caplog: pytest.LogCaptureFixture) -
     assert not issues
 
 
+def test_debug_logging_is_deferred(
+    test_data_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test the node text and tree dumps for debug logging are only built when debug logging is enabled."""
+    from_file = test_data_path / "spec" / "spec_sys2_system_requirements.md"
+    node = load_syntax_tree(from_file)
+    text_calls: list[SyntaxTreeNode] = []
+    pretty_calls: list[SyntaxTreeNode] = []
+
+    def counting_get_text_from_node(counted_node: SyntaxTreeNode) -> str:
+        text_calls.append(counted_node)
+        return get_text_from_node(counted_node)
+
+    def counting_pretty(counted_node: SyntaxTreeNode, *args: int, **kwargs: bool) -> str:
+        pretty_calls.append(counted_node)
+        return original_pretty(counted_node, *args, **kwargs)
+
+    original_pretty = SyntaxTreeNode.pretty
+    monkeypatch.setattr("spicy.parser.spec_parser.get_text_from_node", counting_get_text_from_node)
+    monkeypatch.setattr(SyntaxTreeNode, "pretty", counting_pretty)
+
+    with caplog.at_level(logging.INFO, logger="SpecParser"):
+        quiet_specs = parse_syntax_tree_to_spec_elements("TD", node, from_file)
+    quiet_text_calls = len(text_calls)
+    assert not pretty_calls
+    # each top level node is only walked for the single line field check and by its handler
+    assert max(Counter(map(id, text_calls)).values()) <= 2  # noqa: PLR2004
+
+    text_calls.clear()
+    with caplog.at_level(logging.DEBUG, logger="SpecParser"):
+        verbose_specs = parse_syntax_tree_to_spec_elements("TD", node, from_file)
+
+    # debug logging walks every top level node again for its message
+    assert len(text_calls) >= quiet_text_calls + len(node.children)
+    assert [str(x) for x in verbose_specs] == [str(x) for x in quiet_specs]
+
+
+def test_token_parser_matches_tree_parser(test_data_path: Path) -> None:
+    """Test parsing the token stream gives the same specs as parsing the syntax tree, for all the test data."""
+    for from_file in sorted(test_data_path.glob("**/*.md")):
+        text = from_file.read_text()
+        tree = parse_text_to_syntax_tree(text)
+        tokens = parse_text_to_tokens(text)
+        for project_prefix in ("TD", "PRE", "CDU", "BDLNK", "FIXME", "HIER", "POS"):
+            tree_specs = parse_syntax_tree_to_spec_elements(project_prefix, tree, from_file)
+            token_specs = parse_tokens_to_spec_elements(project_prefix, tokens, from_file)
+            assert [spec.__getstate__() for spec in token_specs] == [spec.__getstate__() for spec in tree_specs], (
+                from_file,
+                project_prefix,
+            )
+
+
 # test the free functions
 
 
+def test_built_specs_are_frozen(test_data_path: Path) -> None:
+    """Test built specs hold their sections as tuples, with shared variant and key strings."""
+    spec_elements = get_elements_from_files("CDU", [test_data_path / "cookie_spec"])
+    assert spec_elements
+    for spec in spec_elements:
+        assert all(isinstance(lines, tuple) for lines in spec.content.values())
+        assert all(isinstance(links, tuple) for links in spec.expected_links.values())
+    first, *others = [spec for spec in spec_elements if spec.variant == "SoftwareUnit"]
+    assert all(spec.variant is first.variant for spec in others)
+
+
 def test_looks_like_non_sticky_section() -> None:
     """Test the looks_like_non_sticky_section function."""
     assert looks_like_non_sticky_section("Ok:")
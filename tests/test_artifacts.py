@@ -0,0 +1,107 @@
+"""Test the partial indexes written by shards and merged for checking."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from spicy.artifacts import (
+    PartialIndex,
+    build_partial_index,
+    merge_indexes,
+    parse_shard,
+    read_indexes,
+    select_shard,
+    shard_of,
+)
+from spicy.documents import DocumentStore
+from spicy.gather import parse_spec_text
+from spicy.md_scan import MarkdownScan, scan_markdown_lines
+from spicy.parser.spec_element import SpecElement
+
+
+def test_spec_element_round_trip(test_data_path: Path) -> None:
+    """Test every parsed field survives being written as JSON and read back."""
+    for spec_file in sorted(test_data_path.glob("**/*.md")):
+        for element in parse_spec_text("TD", spec_file.read_text(), spec_file):
+            restored = SpecElement.from_dict(json.loads(json.dumps(element.to_dict())))
+            assert restored.__getstate__() == element.__getstate__()
+
+
+def test_markdown_scan_round_trip(test_data_path: Path) -> None:
+    """Test the sections, references and links survive being written as JSON and read back."""
+    lines = (test_data_path / "md_links" / "correct.md").read_text().split("\n")
+    scan = scan_markdown_lines(lines, "PRE")
+    assert scan.links
+    restored = MarkdownScan.from_dict(json.loads(json.dumps(scan.to_dict())))
+    assert (restored.sections, restored.references, restored.links) == (scan.sections, scan.references, scan.links)
+
+
+def test_parse_shard() -> None:
+    """Test shards count from one, and anything else is refused."""
+    assert parse_shard("2/3") == (2, 3)
+    for text in ("0/3", "4/3", "1", "a/b", "-1/3"):
+        with pytest.raises(ValueError, match="is not a shard"):
+            parse_shard(text)
+
+
+def test_shards_split_the_files(test_data_path: Path) -> None:
+    """Test every file is in exactly one shard, whatever the path is relative to."""
+    paths = sorted(test_data_path.glob("**/*.md"))
+    shard_count = 3
+    shards = [select_shard(paths, test_data_path, (number, shard_count)) for number in range(1, shard_count + 1)]
+    assert sorted(path for shard in shards for path in shard) == paths
+    relative = [path.relative_to(test_data_path) for path in paths]
+    assert [shard_of(path, Path(), shard_count) for path in relative] == [
+        shard_of(path, test_data_path, shard_count) for path in paths
+    ]
+
+
+def test_merge_indexes(test_data_path: Path, tmp_path: Path) -> None:
+    """Test merged shards hold every file in order, and incomplete or conflicting indexes are refused."""
+    spec_path = test_data_path / "spec"
+    paths = sorted(spec_path.glob("*.md"))
+    documents = DocumentStore()
+    shard_count = 2
+    for number in range(1, shard_count + 1):
+        shard_paths = select_shard(paths, spec_path, (number, shard_count))
+        elements = [parse_spec_text("TD", path.read_text(), path) for path in shard_paths]
+        index = build_partial_index("TD", shard_paths, elements, documents, shard=(number, shard_count))
+        index.write(tmp_path / "shards" / f"{number}.json")
+
+    indexes = read_indexes([tmp_path / "shards"])
+    merged = merge_indexes(indexes)
+    assert [artifact.path for artifact in merged.files] == paths
+    assert [element.name for element in merged.elements] == [
+        element.name for path in paths for element in parse_spec_text("TD", path.read_text(), path)
+    ]
+
+    with pytest.raises(ValueError, match="missing shards 2/2"):
+        merge_indexes(indexes[:1])
+    # every shard of the run split two ways is there, but the index of a run in one shard is of another run
+    with pytest.raises(ValueError, match=r"cannot merge shards of runs split 1 and 2 ways: 1/1, 1/2, 2/2"):
+        merge_indexes([*indexes, PartialIndex("TD", shard=(1, 1))])
+    with pytest.raises(ValueError, match="cannot merge indexes of TD and of OTHER"):
+        merge_indexes([indexes[0], PartialIndex("OTHER")])
+    assert merge_indexes([*indexes, indexes[0]]).files == merged.files
+    changed = PartialIndex.read(tmp_path / "shards" / "1.json")
+    changed.files[0].digest = "changed"
+    with pytest.raises(ValueError, match="more than one version of"):
+        merge_indexes([*indexes, changed])
+    with pytest.raises(ValueError, match="no indexes"):
+        merge_indexes([])
+    (tmp_path / "bad.json").write_text("{}")
+    with pytest.raises(ValueError, match=r"bad\.json: not a spicy index"):
+        read_indexes([tmp_path / "bad.json"])
+
+
+def test_index_of_one_file_is_stable(test_data_path: Path, tmp_path: Path) -> None:
+    """Test the index of a file is the same, byte for byte, however often it is written."""
+    spec_file = test_data_path / "spec" / "spec_sys1_stakeholder_needs.md"
+    written = []
+    for attempt in range(2):
+        elements = [parse_spec_text("TD", spec_file.read_text(), spec_file)]
+        index_path = tmp_path / f"{attempt}.spicy.json"
+        build_partial_index("TD", [spec_file], elements, DocumentStore()).write(index_path)
+        written.append(index_path.read_bytes())
+    assert written[0] == written[1]
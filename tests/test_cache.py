@@ -0,0 +1,122 @@
+"""Test the parse cache."""
+
+import pickle
+import shutil
+from pathlib import Path
+
+import pytest
+
+from spicy import cache as spicy_cache
+from spicy.cache import ParseCache, default_cache_directory
+from spicy.gather import get_elements_from_files
+
+
+def test_cache_hits_and_misses(test_data_path: Path, tmp_path: Path) -> None:
+    """Test unchanged files are loaded from the cache and changed files are parsed again."""
+    work_dir = tmp_path / "spec"
+    shutil.copytree(test_data_path / "spec", work_dir)
+    file_count = len(list(work_dir.glob("*.md")))
+
+    cache = ParseCache(tmp_path / "cache", "TD")
+    uncached = get_elements_from_files("TD", [work_dir])
+    first = get_elements_from_files("TD", [work_dir], cache=cache)
+    assert (cache.hits, cache.misses) == (0, file_count)
+
+    cache = ParseCache(tmp_path / "cache", "TD")
+    second = get_elements_from_files("TD", [work_dir], cache=cache)
+    assert (cache.hits, cache.misses) == (file_count, 0)
+    assert [str(x) for x in second] == [str(x) for x in first] == [str(x) for x in uncached]
+    assert [x.expected_links for x in second] == [x.expected_links for x in uncached]
+
+    changed_file = work_dir / "spec_sys1_stakeholder_needs.md"
+    changed_file.write_text(changed_file.read_text() + "\n## TD_STK_NEED_added_later\n")
+    cache = ParseCache(tmp_path / "cache", "TD")
+    third = get_elements_from_files("TD", [work_dir], cache=cache)
+    assert (cache.hits, cache.misses) == (file_count - 1, 1)
+    assert any(x.name == "TD_STK_NEED_added_later" for x in third)
+
+
+def test_cache_is_keyed_by_prefix(test_data_path: Path, tmp_path: Path) -> None:
+    """Test a different prefix does not reuse the cached elements."""
+    spec_file = test_data_path / "spec" / "spec_sys1_stakeholder_needs.md"
+    cache = ParseCache(tmp_path, "TD")
+    assert get_elements_from_files("TD", [spec_file], cache=cache)
+
+    cache = ParseCache(tmp_path, "STK")
+    assert not get_elements_from_files("STK", [spec_file], cache=cache)
+    assert cache.misses == 1
+
+
+def test_cache_is_keyed_by_source(test_data_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test an edit to the source of spicy, which leaves its version as it was, does not reuse the cached elements."""
+    spec_file = test_data_path / "spec" / "spec_sys1_stakeholder_needs.md"
+    assert get_elements_from_files("TD", [spec_file], cache=ParseCache(tmp_path, "TD"))
+
+    monkeypatch.setattr(spicy_cache, "source_digest", lambda: "edited")
+    cache = ParseCache(tmp_path, "TD")
+    assert get_elements_from_files("TD", [spec_file], cache=cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_clear_cache(test_data_path: Path, tmp_path: Path) -> None:
+    """Test clearing the cache removes all the entries."""
+    cache = ParseCache(tmp_path / "cache", "TD")
+    get_elements_from_files("TD", [test_data_path / "spec"], cache=cache)
+    assert any((tmp_path / "cache").iterdir())
+
+    cache.clear()
+    assert not (tmp_path / "cache").exists()
+    cache.clear()
+
+
+def test_clear_cache_keeps_other_files(test_data_path: Path, tmp_path: Path) -> None:
+    """Test clearing a cache directory which holds other files removes only the entries, keeping those files."""
+    cache_dir = tmp_path / "cache"
+    kept = [cache_dir / "keep.txt", cache_dir / "ab" / "notes.json", cache_dir / "serve.sock"]
+    for path in kept:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    cache = ParseCache(cache_dir, "TD")
+    get_elements_from_files("TD", [test_data_path / "spec"], cache=cache)
+    cache.store_revision("HEAD", {})
+
+    cache.clear()
+    assert sorted(path for path in cache_dir.glob("**/*") if path.is_file()) == sorted(kept)
+    assert sorted(cache_dir.iterdir()) == sorted([cache_dir / "ab", cache_dir / "keep.txt", cache_dir / "serve.sock"])
+
+
+def test_unwritable_cache_is_skipped(
+    test_data_path: Path,
+    tmp_path: Path,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test a cache directory which cannot be written is warned about once, and the run carries on without it."""
+    blocker = tmp_path / "not_a_directory"
+    blocker.write_text("")
+    cache = ParseCache(blocker / "cache", "TD")
+    elements = get_elements_from_files("TD", [test_data_path / "spec"], cache=cache)
+    assert [str(x) for x in elements] == [str(x) for x in get_elements_from_files("TD", [test_data_path / "spec"])]
+    cache.store_revision("HEAD", {})
+    assert not cache.writable
+    assert sum("Unable to write" in record.message for record in caplog.records) == 1
+
+
+def test_unreadable_entries_are_parsed_again(test_data_path: Path, tmp_path: Path) -> None:
+    """Test an entry which is not the JSON the cache writes, such as a planted pickle, is ignored, never loaded."""
+    spec_file = test_data_path / "spec" / "spec_sys1_stakeholder_needs.md"
+    cache = ParseCache(tmp_path, "TD")
+    elements = get_elements_from_files("TD", [spec_file], cache=cache)
+    entry_path = next(tmp_path.glob("*/*.json"))
+    for planted in (pickle.dumps(elements), b"[{}]"):
+        entry_path.write_bytes(planted)
+        cache = ParseCache(tmp_path, "TD")
+        assert [str(x) for x in get_elements_from_files("TD", [spec_file], cache=cache)] == [str(x) for x in elements]
+        assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_default_cache_directory_is_outside_the_checkout(tmp_path: Path) -> None:
+    """Test the default cache directory is kept out of the working directory, and differs for each."""
+    checkout = tmp_path / "checkout"
+    assert not default_cache_directory(checkout).is_relative_to(checkout)
+    assert default_cache_directory(checkout) != default_cache_directory(checkout / "other")
+    assert default_cache_directory(checkout) == default_cache_directory(checkout / "other" / "..")
@@ -0,0 +1,97 @@
+"""Test analysing only the specs affected by changes since a git revision."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from spicy.cache import ParseCache
+from spicy.changes import Changes, gather_changed_spec_index
+from spicy.gather import get_elements_from_files
+
+STAKEHOLDER_REQS = "# TD_STK_REQ_one\n\nThe **TD** does one.\n\n# TD_STK_REQ_two\n\nThe **TD** does two.\n"
+SYSTEM_REQS = (
+    "# TD_SYS_REQ_x\n\nThe **TD** does x.\n\nDerived from:\n\n- TD_STK_REQ_one\n\n"
+    "# TD_SYS_REQ_y\n\nThe **TD** does y.\n\nDerived from:\n\n- TD_STK_REQ_missing\n"
+)
+
+
+def git(repository: Path, *args: str) -> None:
+    """Run a git command in the repository."""
+    subprocess.run(
+        ["git", "-c", "user.name=spicy", "-c", "user.email=spicy@example.com", *args],
+        check=True,
+        capture_output=True,
+        cwd=repository,
+    )
+
+
+@pytest.fixture
+def repository(tmp_path: Path) -> Path:
+    """Return a git repository with a committed spec directory."""
+    repository = tmp_path / "repository"
+    docs = repository / "docs"
+    docs.mkdir(parents=True)
+    (docs / "spicy.yaml").write_text("prefix: TD\n")
+    (docs / "stakeholder.md").write_text(STAKEHOLDER_REQS)
+    (docs / "system.md").write_text(SYSTEM_REQS)
+    git(repository, "init", "-q")
+    git(repository, "add", ".")
+    git(repository, "commit", "-q", "-m", "base")
+    return repository
+
+
+def test_changes_since(repository: Path) -> None:
+    """Test modified, removed and untracked files are all changes."""
+    docs = repository / "docs"
+    (docs / "stakeholder.md").write_text(STAKEHOLDER_REQS + "\nMore.\n")
+    (docs / "system.md").unlink()
+    (docs / "new.md").write_text("# TD_STK_REQ_new\n")
+
+    changes = Changes.since("HEAD", docs)
+    assert changes.paths == {"docs/stakeholder.md", "docs/system.md", "docs/new.md"}
+    assert changes.contains(docs / "new.md")
+    assert not changes.contains(docs / "spicy.yaml")
+    assert changes.base_text("docs/system.md") == SYSTEM_REQS
+    assert changes.base_text("docs/new.md") is None
+
+
+def test_only_changed_files_are_parsed(repository: Path, tmp_path: Path) -> None:
+    """Test the unchanged files come from the index of the revision once it has them."""
+    docs = repository / "docs"
+    (docs / "stakeholder.md").write_text(STAKEHOLDER_REQS.replace("TD_STK_REQ_one", "TD_STK_REQ_uno"))
+
+    cache = ParseCache(tmp_path / "cache", "TD")
+    changed = gather_changed_spec_index("TD", [docs], Changes.since("HEAD", docs), cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert changed.changed_files == 1
+    assert changed.affected == {"TD_STK_REQ_one", "TD_STK_REQ_uno", "TD_SYS_REQ_x"}
+    assert [str(x) for x in changed.spec_index.elements] == [str(x) for x in get_elements_from_files("TD", [docs])]
+
+    cache = ParseCache(tmp_path / "cache", "TD")
+    again = gather_changed_spec_index("TD", [docs], Changes.since("HEAD", docs), cache=cache)
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert again.affected == changed.affected
+
+
+def test_removed_specs_affect_their_dependents(repository: Path, tmp_path: Path) -> None:
+    """Test the specs linking to the specs of a removed file are affected."""
+    docs = repository / "docs"
+    (docs / "stakeholder.md").unlink()
+
+    cache = ParseCache(tmp_path / "cache", "TD")
+    changed = gather_changed_spec_index("TD", [docs], Changes.since("HEAD", docs), cache=cache)
+    assert changed.changed_files == 0
+    assert changed.affected == {"TD_STK_REQ_one", "TD_STK_REQ_two", "TD_SYS_REQ_x"}
+
+
+def test_removed_links_affect_their_targets(repository: Path, tmp_path: Path) -> None:
+    """Test the spec a changed spec no longer links to is affected, as it has lost a link."""
+    docs = repository / "docs"
+    (docs / "system.md").write_text(SYSTEM_REQS.replace("- TD_STK_REQ_one", "- TD_STK_REQ_two"))
+    git(repository, "commit", "-q", "-am", "link two")
+    (docs / "system.md").write_text(SYSTEM_REQS)
+
+    cache = ParseCache(tmp_path / "cache", "TD")
+    changed = gather_changed_spec_index("TD", [docs], Changes.since("HEAD", docs), cache=cache)
+    assert changed.affected == {"TD_SYS_REQ_x", "TD_STK_REQ_one", "TD_STK_REQ_two"}
@@ -0,0 +1,75 @@
+"""Test the config.py module."""
+
+from pathlib import Path
+
+from spicy.config import CompiledConfig, compile_config, load_spicy_config
+from spicy.gather import gather_all_elements
+from spicy.review import render_issues_with_elements
+
+CONFIG_TEXT = """---
+prefix: PROJ
+ignored_refs:
+  - PROJ_ENV_VAR
+  - PROJ_VAL_TEST_.*
+ignored_links:
+  SoftwareUnitTest:
+    - Tests SoftwareUnit
+ignored_dependencies:
+  SoftwareUnit:
+    - SoftwareUnitTest Tests
+"""
+
+
+def test_load_compiled_config(tmp_path: Path) -> None:
+    """Test the loaded config is compiled, and its tables are built once."""
+    (tmp_path / "spicy.yaml").write_text(CONFIG_TEXT)
+    config = load_spicy_config(tmp_path, prefix=None)
+
+    assert isinstance(config, CompiledConfig)
+    assert config["prefix"] == "PROJ"
+    assert config.ignored_link_table == {"SoftwareUnitTest": {"tests": "softwareunit"}}
+    assert config.ignored_dependency_table == {"SoftwareUnit": {"softwareunittest": "tests"}}
+    assert "PROJ_VAL_TEST_one" in config.ignored_ref_matcher
+    assert "PROJ_SW_UNIT_one" not in config.ignored_ref_matcher
+    assert config.ignored_link_table is config.ignored_link_table
+
+    assert compile_config(config) is config
+    assert load_spicy_config(tmp_path, prefix="OTHER")["prefix"] == "OTHER"
+
+
+def test_empty_compiled_config(tmp_path: Path) -> None:
+    """Test a missing config has empty tables."""
+    config = load_spicy_config(tmp_path)
+    assert config == {}
+    assert config.ignored_link_table == {}
+    assert config.ignored_dependency_table == {}
+    assert "PROJ_ENV_VAR" not in config.ignored_ref_matcher
+
+
+def test_ignored_dependencies(tmp_path: Path) -> None:
+    """Test the compiled ignored dependencies are used by the review."""
+    (tmp_path / "spicy.yaml").write_text(CONFIG_TEXT)
+    md_file = tmp_path / "units.md"
+    md_file.write_text("# PROJ_SW_UNIT_cookie_counter\n\nCounts cookies.\n")
+
+    def review(config: dict[str, object]) -> list[str]:
+        lines: list[str] = []
+        elements = gather_all_elements("PROJ", md_file)
+        render_issues_with_elements(elements, config=config, render_function=lines.append)
+        return lines
+
+    assert any("SoftwareUnit without a SoftwareUnitTest" in line for line in review({}))
+    assert not any("SoftwareUnit without a SoftwareUnitTest" in line for line in review(load_spicy_config(tmp_path)))
+
+
+def test_spec_issues_use_either_config(tmp_path: Path) -> None:
+    """Test a spec ignores the same links with the compiled config as with the plain one."""
+    (tmp_path / "spicy.yaml").write_text(CONFIG_TEXT)
+    md_file = tmp_path / "tests.md"
+    md_file.write_text("# PROJ_SW_UNIT_TEST_cookie_counter\n\nTests counting cookies.\n")
+    (element,) = gather_all_elements("PROJ", md_file)
+    compiled = load_spicy_config(tmp_path)
+
+    assert any("Tests SoftwareUnit" in issue for issue in element.get_issues({}))
+    assert element.get_issues(compiled) == element.get_issues(dict(compiled))
+    assert not any("Tests SoftwareUnit" in issue for issue in element.get_issues(compiled))
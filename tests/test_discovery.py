@@ -0,0 +1,92 @@
+"""Test finding the markdown files of a spec tree."""
+
+import os
+from pathlib import Path
+
+from spicy.discovery import IgnorePattern, IgnoreRules, SpecFileFinder, parse_ignore_patterns, spec_file_finder
+
+
+def _write(path: Path, text: str = "") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def _age(root: Path) -> None:
+    """Move the modification time of every directory back, so their listings are kept."""
+    for directory in [root, *(path for path in root.glob("**/*") if path.is_dir())]:
+        stat = directory.stat()
+        os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns - 60_000_000_000))
+
+
+def test_ignore_patterns() -> None:
+    """Test gitignore patterns match as git matches them."""
+    rules = IgnoreRules(
+        parse_ignore_patterns(["# comment", "", "*.tmp.md", "/top.md", "build/", "docs/**/draft_?.md", "!keep.tmp.md"]),
+    )
+    cases = {
+        ("a.tmp.md", False): True,
+        ("sub/a.tmp.md", False): True,
+        ("keep.tmp.md", False): False,
+        ("top.md", False): True,
+        ("sub/top.md", False): None,
+        ("build", True): True,
+        ("build", False): None,
+        ("sub/build", True): True,
+        ("docs/draft_1.md", False): True,
+        ("docs/a/b/draft_2.md", False): True,
+        ("docs/draft_10.md", False): None,
+    }
+    for (path, is_dir), ignored in cases.items():
+        assert rules.decide(path, is_dir=is_dir) is ignored, path
+    assert IgnorePattern.parse("# comment") is None
+    assert IgnorePattern.parse(r"\#hash.md") is not None
+
+
+def test_finder_matches_sorted_glob(test_data_path: Path) -> None:
+    """Test the files found are those a sorted glob finds, when none are ignored."""
+    expected = sorted(path for path in test_data_path.glob("**/*.md") if path.is_file())
+    assert SpecFileFinder(test_data_path, gitignore=False).find() == expected
+
+
+def test_finder_leaves_out_ignored_files(tmp_path: Path) -> None:
+    """Test the excluded files and the files git ignores are not found, and their directories not walked."""
+    _write(tmp_path / ".git" / "spec.md")
+    _write(tmp_path / ".gitignore", "docs/generated.md\n")
+    docs = tmp_path / "docs"
+    spec = _write(docs / "spec.md")
+    kept = _write(docs / "drafts" / "kept.md")
+    _write(docs / "generated.md")
+    _write(docs / "book" / "spec.md")
+    _write(docs / "node_modules" / "package" / "README.md")
+    vendored = _write(docs / "vendor" / "spec.md")
+    _write(docs / "drafts" / "draft.md")
+    _write(docs / ".gitignore", "node_modules/\n/book\n")
+    _write(docs / "drafts" / ".gitignore", "*.md\n!kept.md\n")
+
+    finder = spec_file_finder(docs, {"exclude": ["vendor/"]})
+    assert finder.find() == [kept, spec]
+    assert finder.listed == len(["docs", "drafts"])
+    assert SpecFileFinder(tmp_path).find() == [kept, spec, vendored]
+
+    (tmp_path / ".git" / "spec.md").unlink()
+    (tmp_path / ".git").rmdir()
+    # outside a git work tree, only the excludes leave files out
+    assert SpecFileFinder(docs).find() == sorted(docs.glob("**/*.md"))
+    assert spec_file_finder(docs, {"gitignore": False}).find() == SpecFileFinder(docs).find()
+
+
+def test_finder_keeps_listings(tmp_path: Path) -> None:
+    """Test only the directories which changed are listed again."""
+    first = _write(tmp_path / "a" / "first.md")
+    _write(tmp_path / "b" / "other.md")
+    _age(tmp_path)
+    finder = SpecFileFinder(tmp_path)
+    found = finder.find()
+    listed = finder.listed
+    assert finder.find() == found
+    assert finder.listed == listed
+
+    second = _write(tmp_path / "a" / "second.md")
+    assert finder.find() == [first, second, tmp_path / "b" / "other.md"]
+    assert finder.listed == listed + 1
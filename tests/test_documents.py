@@ -0,0 +1,72 @@
+"""Test the shared document store."""
+
+import shutil
+from pathlib import Path
+
+from spicy.documents import DocumentStore
+from spicy.gather import get_elements_from_files
+from spicy.md_link_check import check_markdown_refs
+
+
+def test_document_store_reads_once(tmp_path: Path) -> None:
+    """Test the text, lines and scan all come from a single read."""
+    md_file = tmp_path / "doc.md"
+    md_file.write_text("# PRE_heading\n\nSome text.\n")
+    documents = DocumentStore()
+
+    assert md_file not in documents
+    assert documents.lines(md_file) == ["# PRE_heading", "", "Some text.", ""]
+    assert documents.text(md_file).startswith("# PRE_heading")
+    assert documents.scan(md_file, "PRE").sections == {"PRE_heading": [0]}
+    assert md_file in documents
+    assert documents.reads == 1
+
+    documents.write(md_file, "# PRE_replaced\n")
+    assert md_file.read_text() == "# PRE_replaced\n"
+    assert documents.lines(md_file) == ["# PRE_replaced", ""]
+    assert documents.reads == 1
+
+    md_file.write_text("# PRE_changed_on_disk\n")
+    documents.forget(md_file)
+    assert documents.lines(md_file) == ["# PRE_changed_on_disk", ""]
+    assert documents.reads == 2  # noqa: PLR2004
+
+
+def test_document_store_scans_once(tmp_path: Path) -> None:
+    """Test the scan of a file is kept until the file changes."""
+    md_file = tmp_path / "doc.md"
+    md_file.write_text("# PRE_heading\n\nSee PRE_other.\n")
+    documents = DocumentStore()
+
+    scan = documents.scan(md_file, "PRE")
+    assert scan.references == {"PRE_heading": [0], "PRE_other": [2]}
+    assert documents.scan(md_file, "PRE") is scan
+    assert documents.scan(md_file, "OTHER") is not scan
+
+    documents.write(md_file, "# PRE_replaced\n")
+    assert documents.scan(md_file, "PRE").sections == {"PRE_replaced": [0]}
+
+
+def test_fixed_refs_are_parsed_from_buffers(fixable_link_data_path: Path, tmp_path: Path) -> None:
+    """Test fixing refs then parsing reads every file only once."""
+    work_dir = tmp_path / "fixable"
+    shutil.copytree(fixable_link_data_path, work_dir)
+    file_list = sorted(work_dir.glob("**/*.md"))
+    documents = DocumentStore()
+
+    issues = check_markdown_refs(
+        file_list,
+        base_path=work_dir,
+        prefix="FIXME",
+        fix_refs=True,
+        ignored_refs=[],
+        documents=documents,
+    )
+    elements = get_elements_from_files("FIXME", file_list, documents=documents)
+
+    assert not issues
+    assert elements
+    assert documents.reads == len(file_list)
+    assert documents.writes
+    for path in file_list:
+        assert documents.text(path) == path.read_text()
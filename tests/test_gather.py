@@ -1,8 +1,17 @@
 """Test the use-cases parser."""
 
+import shutil
 from pathlib import Path
 
-from spicy.gather import gather_all_elements, get_elements_from_files
+from spicy.gather import (
+    file_may_contain_specs,
+    gather_all_elements,
+    gather_spec_index,
+    get_elements_from_files,
+    may_contain_specs,
+)
+from spicy.md_read import parse_text_to_tokens
+from spicy.parser import parse_tokens_to_spec_elements
 
 
 def test_gather_all_elements(test_data_path: Path) -> None:
@@ -19,3 +28,55 @@ def test_gather_on_directory(test_data_path: Path) -> None:
 
     assert isinstance(spec_element_list, list)
     assert len(spec_element_list) > 1
+
+
+def test_gather_with_multiple_jobs(test_data_path: Path) -> None:
+    """Test parsing in a process pool gives the same elements in the same order."""
+    paths = [test_data_path / "spec", test_data_path / "use_cases"]
+    serial = get_elements_from_files("TD", paths)
+    parallel = get_elements_from_files("TD", paths, jobs=2)
+
+    assert [str(x) for x in parallel] == [str(x) for x in serial]
+    assert [x.expected_links for x in parallel] == [x.expected_links for x in serial]
+
+
+def test_prefilter_keeps_every_file_with_specs(test_data_path: Path) -> None:
+    """Test no file with specs in it is skipped, whatever the prefix."""
+    for prefix in ("TD", "PRE", "CDU", "BDLNK", "FIXME", "HIER", "POS"):
+        for spec_file in sorted(test_data_path.glob("**/*.md")):
+            text = spec_file.read_text()
+            if parse_tokens_to_spec_elements(prefix, parse_text_to_tokens(text), spec_file):
+                assert may_contain_specs(prefix, text), (prefix, spec_file)
+                assert file_may_contain_specs(prefix, spec_file), (prefix, spec_file)
+
+
+def test_prefilter_skips_prose(tmp_path: Path) -> None:
+    """Test text with neither the prefix nor a use case id is skipped, and the prefix may be escaped."""
+    assert not may_contain_specs("MY_PROJ", "# Introduction\n\nNothing to see here.\n")
+    assert may_contain_specs("MY_PROJ", "# MY\\_PROJ_SYS_1\n")
+    assert may_contain_specs("MY_PROJ", "    ID: UC_1\n")
+    prose = tmp_path / "prose.md"
+    prose.write_text("# Introduction\n")
+    empty = tmp_path / "empty.md"
+    empty.write_text("")
+    assert not file_may_contain_specs("TD", prose)
+    assert not file_may_contain_specs("TD", empty)
+    assert gather_all_elements("TD", tmp_path) == []
+
+
+def test_gather_leaves_out_excluded_files(test_data_path: Path, tmp_path: Path) -> None:
+    """Test gathering from a directory leaves out the files the config excludes, as a run does."""
+    docs = tmp_path / "docs"
+    shutil.copytree(test_data_path / "spec", docs / "spec")
+    shutil.copytree(test_data_path / "spec", docs / "vendor" / "spec")
+    config = {"exclude": ["vendor/"]}
+
+    spec_index = gather_spec_index("TD", [docs], config=config)
+    assert spec_index.elements
+    assert all("vendor" not in element.file_path.parts for element in spec_index.elements)
+    assert [str(x) for x in spec_index.elements] == [str(x) for x in get_elements_from_files("TD", [docs / "spec"])]
+    assert [str(x) for x in get_elements_from_files("TD", [docs], config=config)] == [
+        str(x) for x in spec_index.elements
+    ]
+    assert [str(x) for x in gather_all_elements("TD", docs, config=config)] == [str(x) for x in spec_index.elements]
+    assert len(gather_all_elements("TD", docs)) == 2 * len(spec_index.elements)
@@ -5,7 +5,9 @@ import shutil
 from pathlib import Path
 
 from spicy.md_link_check import (
+    IgnoredRefs,
     check_markdown_refs,
+    gather_markdown_sections_and_refs,
     get_link_pattern_from_reference,
     get_matches_from_md,
     get_section_pattern_from_prefix,
@@ -53,6 +55,43 @@ def test_get_matches_from_md(test_data_path: Path) -> None:
     assert found["PRE_first_heading"] < found["PRE_second_heading"]
 
 
+def test_ignored_refs() -> None:
+    """Test the ignored refs match whole names against any of the patterns."""
+    ignored = IgnoredRefs(["PRE_ENV_VAR", "PRE_VAL_TEST_.*"])
+    assert "PRE_ENV_VAR" in ignored
+    assert "PRE_VAL_TEST_one" in ignored
+    assert "PRE_ENV_VAR_two" not in ignored
+    assert "XPRE_VAL_TEST_one" not in ignored
+    # answers are remembered per name
+    assert "PRE_VAL_TEST_one" in ignored
+    assert set(ignored._results) == {"PRE_ENV_VAR", "PRE_VAL_TEST_one", "PRE_ENV_VAR_two", "XPRE_VAL_TEST_one"}  # noqa: SLF001
+
+    assert "PRE_ENV_VAR" not in IgnoredRefs([])
+
+
+def test_ignored_refs_keep_their_own_flags_and_groups() -> None:
+    """Test each pattern keeps its inline flags and group numbers, as if it were matched on its own."""
+    ignored = IgnoredRefs(["(PRE)_ENV", "(?i)prj_env_.*", r"PRE_(X+)_\1"])
+    assert "PRJ_ENV_VAR" in ignored
+    assert "pre_env" not in ignored
+    assert "PRE_XX_XX" in ignored
+    assert "PRE_XX_X" not in ignored
+
+
+def test_gather_markdown_sections_and_refs() -> None:
+    """Test the sections are not counted as references, but duplicate sections are."""
+    files = {
+        Path("a.md"): ["# PRE_first", "See PRE_second and PRE_ignored", "# PRE_first"],
+        Path("b.md"): ["## PRE_second", "See PRE_first"],
+    }
+    targets, references = gather_markdown_sections_and_refs(files, "PRE", ["PRE_ign.*"])
+    assert targets == {"PRE_first": (Path("a.md"), 0), "PRE_second": (Path("b.md"), 0)}
+    assert references == {
+        "PRE_second": [(Path("a.md"), 1)],
+        "PRE_first": [(Path("a.md"), 2), (Path("b.md"), 1)],
+    }
+
+
 def test_check_markdown_refs(test_data_path: Path, tmpdir: Path) -> None:
     """Test the markdown link checker can find issues."""
     work_dir = Path(tmpdir / "mutable_md")
@@ -4,18 +4,25 @@ import logging
 from pathlib import Path
 
 import pytest
+from markdown_it.tree import SyntaxTreeNode
 
 from spicy.md_read import (
     check_node_is,
+    get_markdown,
+    get_md_renderer,
     get_text_from_node,
     list_item_parts,
     load_syntax_tree,
     parse_text_to_syntax_tree,
+    parse_text_to_tokens,
     parse_yes_no,
     read_bullet_list,
     read_titled_bullet_list,
     render_node,
+    render_simple_inline,
+    render_simple_paragraph,
     split_list_item,
+    split_token_blocks,
     strip_link,
 )
 
@@ -89,6 +96,70 @@ def test_read_and_re_render() -> None:
             assert render_node(node.children[0]) == sub_text
 
 
+SIMPLE_PARAGRAPHS = [
+    "[TD_SYS_REQ_a](other.md#td_sys_req_a)",
+    "**Inputs:**\nPaper bag. Ennui. Cookies.",
+    "TD_UNIT_TEST_a_test: PASS with `code` and _emphasis_.",
+    "\\- not a list item",
+    "1\\. not a numbered item",
+    "-- em dash start",
+    "\\---",
+    "a\n\\===",
+    "_leading underscore",
+    "trailing_ underscore",
+    "snake_case_words",
+    "a * star",
+    "escaped \\ backslash",
+    "an [unlinked] bracket",
+    'a [titled](link.md "title")',
+    "a [spaced](<link with spaces.md>)",
+    "an <http://auto.link>",
+    "an & ampersand &amp; entity",
+    "a `` code`with`ticks `` span",
+    "Wow![link](image.md)",
+    "two  spaces",
+]
+
+
+@pytest.mark.parametrize("paragraph", SIMPLE_PARAGRAPHS)
+def test_simple_paragraph_rendering_matches_mdformat(paragraph: str) -> None:
+    """Test the lightweight renderer either matches mdformat or declines to render."""
+    node = parse_text_to_syntax_tree(paragraph).children[0]
+    assert node.type == "paragraph"
+    rendered = render_simple_paragraph(node)
+    if rendered is not None:
+        assert rendered == get_md_renderer().render(node.to_tokens(), get_markdown().options, {})
+
+
+def test_simple_paragraph_rendering_of_test_data(test_data_path: Path) -> None:
+    """Test the lightweight renderer matches mdformat for the paragraphs in the test data, and handles most of them."""
+    paragraphs = [
+        node
+        for md_file in sorted(test_data_path.glob("**/*.md"))
+        for node in load_syntax_tree(md_file).walk()
+        if node.type == "paragraph"
+    ]
+    rendered = [(node, render_simple_paragraph(node)) for node in paragraphs]
+    for node, text in rendered:
+        assert text is None or text == get_md_renderer().render(node.to_tokens(), get_markdown().options, {})
+    assert sum(text is not None for _, text in rendered) > len(paragraphs) * 0.9
+
+
+def test_simple_inline_rendering() -> None:
+    """Test inline nodes are rendered directly, or declined."""
+    inline = parse_text_to_syntax_tree("See [TD_A](a.md#td_a) and `x`, *y*.").children[0].children[0]
+    assert [render_simple_inline(child) for child in inline.children] == [
+        "See ",
+        "[TD_A](a.md#td_a)",
+        " and ",
+        "`x`",
+        ", ",
+        "*y*",
+        ".",
+    ]
+    assert render_simple_inline(parse_text_to_syntax_tree("---").children[0]) is None
+
+
 def test_paragraph_node() -> None:
     """Test multi-line paragraph node."""
     test_data = [
@@ -143,6 +214,61 @@ def test_get_text_from_node(caplog: pytest.LogCaptureFixture) -> None:
         assert get_text_from_node(node) == "`code block():\n    line2()\nlast_line = 1`"
 
 
+def _recursive_text_from_node(node: SyntaxTreeNode) -> str:
+    """Build the node text the simple, recursive way, as a reference for get_text_from_node."""
+    buffer = ""
+    if node.type == "text":
+        buffer = node.content
+    elif node.type == "code_inline":
+        buffer = f"`{node.content}`"
+    elif node.type == "code_block":
+        buffer = f"`{node.content.strip()}`"
+    for child in node.children:
+        buffer = (buffer + " " + _recursive_text_from_node(child)).strip()
+    return buffer.strip()
+
+
+def test_get_text_from_node_matches_recursive(test_data_path: Path) -> None:
+    """Test the text of every node in the test data matches the simple recursive definition."""
+    for md_file in sorted(test_data_path.glob("**/*.md")):
+        root = load_syntax_tree(md_file)
+        for node in root.walk():
+            assert get_text_from_node(node) == _recursive_text_from_node(node), (md_file, node.pretty())
+
+
+def test_token_blocks_match_syntax_tree(test_data_path: Path) -> None:
+    """Test each top-level block of the token stream reads the same as the top-level node of the tree."""
+    for md_file in sorted(test_data_path.glob("**/*.md")):
+        text = md_file.read_text()
+        nodes = parse_text_to_syntax_tree(text).children
+        blocks = split_token_blocks(parse_text_to_tokens(text))
+        assert len(blocks) == len(nodes)
+        for block, node in zip(blocks, nodes, strict=True):
+            assert (block.type, block.tag, block.text) == (node.type, node.tag, get_text_from_node(node)), md_file
+            if not node.children:
+                assert block.content == node.content
+            assert block.tree().pretty() == node.pretty()
+
+    deep_text = " ".join(f"word{index}" for index in range(5000))
+    (block,) = split_token_blocks(parse_text_to_tokens("> " * 10 + deep_text))
+    assert block.text == deep_text
+
+
+def test_get_text_from_node_is_remembered() -> None:
+    """Test the node text is built once, but rebuilt if the node children are replaced."""
+    root = parse_text_to_syntax_tree("- first part `code` last part")
+    list_item = root.children[0].children[0]
+    assert get_text_from_node(root) == "first part `code` last part"
+    assert get_text_from_node(list_item) == "first part `code` last part"
+
+    list_item.children = []
+    assert get_text_from_node(list_item) == ""
+
+    deep_text = " ".join(f"word{index}" for index in range(5000))
+    root = parse_text_to_syntax_tree("> " * 10 + deep_text)
+    assert get_text_from_node(root) == deep_text
+
+
 def test_check_node_is() -> None:
     """Test the node type checker."""
     tree = parse_text_to_syntax_tree("Simple paragraph")
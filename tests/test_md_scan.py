@@ -0,0 +1,44 @@
+"""Test the md_scan.py module."""
+
+from pathlib import Path
+
+from spicy.md_link_check import get_link_pattern_from_reference, get_matches_from_md
+from spicy.md_scan import (
+    get_section_pattern_from_prefix,
+    get_section_reference_pattern_from_prefix,
+    scan_markdown_lines,
+)
+
+
+def test_scan_markdown_lines() -> None:
+    """Test a single scan finds the sections, references and links."""
+    lines = [
+        "# PRE_first",
+        "",
+        "See [PRE_second](other.md#pre_second) and PRE_third, then [PRE_second](#pre_second).",
+        "Nothing to see here.",
+        "## PRE_second is not a section heading",
+    ]
+    scan = scan_markdown_lines(lines, "PRE")
+    assert scan.sections == {"PRE_first": [0]}
+    assert scan.references == {"PRE_first": [0], "PRE_second": [2, 2, 4], "PRE_third": [2]}
+    # only the first link to a reference on a line is kept
+    assert scan.links == {("PRE_second", 2): "[PRE_second](other.md#pre_second)"}
+    # the two headings are matched as sections and searched for references, line 2 for references and links
+    heading_and_link_evaluations = 6
+    assert scan.regex_evaluations == heading_and_link_evaluations
+
+
+def test_scan_matches_separate_patterns(test_data_path: Path) -> None:
+    """Test the scan finds the same things as matching each pattern separately."""
+    for md_file in sorted(test_data_path.glob("**/*.md")):
+        lines = md_file.read_text().split("\n")
+        for prefix in ["PRE", "CDU", "BDLNK", "FIXME"]:
+            scan = scan_markdown_lines(lines, prefix)
+            assert scan.sections == get_matches_from_md(lines, get_section_pattern_from_prefix(prefix))
+            references = get_matches_from_md(lines, get_section_reference_pattern_from_prefix(prefix))
+            assert scan.references == references
+            for reference, line_numbers in references.items():
+                for line in line_numbers:
+                    m = get_link_pattern_from_reference(reference).search(lines[line])
+                    assert scan.links.get((reference, line)) == (m.group(1) if m else None)
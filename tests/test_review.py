@@ -9,6 +9,7 @@ import pytest
 
 from spicy.gather import gather_all_elements
 from spicy.parser.spec_element import SpecElement
+from spicy.parser.spec_utils import related_variants
 from spicy.review import render_issues_with_elements
 
 
@@ -136,3 +137,84 @@ def test_linkage(
         assert any(re.search(expected_output, line) for line in lines), lines
     for unexpected_output in unexpected_outputs:
         assert not any(re.search(unexpected_output, line) for line in lines), lines
+
+
+def test_helpful_suggests_unexpected_link_targets(tmp_path: Path) -> None:
+    """Test the helpful option suggests the closest spec for an unexpected link target."""
+    md_file = tmp_path / "specs.md"
+    md_file.write_text(
+        "# TD_STK_REQ_order_a_cookie\n\nThe **TD** takes orders.\n\n"
+        "# TD_STK_REQ_eat_a_cookie\n\nThe **TD** eats.\n\n"
+        "# TD_SYS_REQ_cookie_website\n\nThe **TD** has a site.\n\nDerived from:\n\n- TD_STK_REQ_order_a_cooky\n",
+    )
+    spec_elements = gather_all_elements("TD", md_file)
+
+    lines: list[str] = []
+    render_issues_with_elements(spec_elements, config={}, render_function=lines.append)
+    assert any(line.endswith("unexpected StakeholderRequirement TD_STK_REQ_order_a_cooky") for line in lines), lines
+
+    lines = []
+    render_issues_with_elements(spec_elements, config={}, render_function=lines.append, helpful=True)
+    expected = "TD_STK_REQ_order_a_cooky (did you mean TD_STK_REQ_order_a_cookie?)"
+    assert any(line.endswith(expected) for line in lines), lines
+
+
+def test_transitive_flags_conflicts(tmp_path: Path) -> None:
+    """Test specs marked without a transitive flag held upstream are reported, only when configured."""
+    md_file = tmp_path / "specs.md"
+    md_file.write_text(
+        "# TD_STK_REQ_safe\n\nThe **TD** is safe.\n\nQualification relevant: yes\n\n"
+        "# TD_SYS_REQ_unmarked\n\nThe **TD** checks.\n\nDerived from:\n\n- TD_STK_REQ_safe\n\n"
+        "# TD_SYS_REQ_unsafe\n\nThe **TD** guesses.\n\nDerived from:\n\n- TD_STK_REQ_safe\n\n"
+        "Qualification relevant: no\n\n"
+        "# TD_SW_REQ_deep\n\nThe **TD** software guesses.\n\nRealises:\n\n- TD_SYS_REQ_unsafe\n\n"
+        "Qualification relevant: no\n",
+    )
+    spec_elements = gather_all_elements("TD", md_file)
+
+    lines: list[str] = []
+    render_issues_with_elements(spec_elements, config={}, render_function=lines.append)
+    assert not any("traces to" in line for line in lines), lines
+
+    lines = []
+    render_issues_with_elements(spec_elements, config={"transitives": ["TQP relevant"]}, render_function=lines.append)
+    conflicts = [line.strip() for line in lines if "traces to" in line]
+    assert conflicts == [
+        f"TD_SW_REQ_deep in {md_file} traces to TD_STK_REQ_safe",
+        f"TD_SYS_REQ_unsafe in {md_file} traces to TD_STK_REQ_safe",
+    ]
+
+
+def test_transitive_flags_conflicts_beyond_one_link(tmp_path: Path) -> None:
+    """Test a conflict is reported for a spec several links from the specs checked, as watching and changes check."""
+    md_file = tmp_path / "specs.md"
+    md_file.write_text(
+        "# TD_STK_REQ_safe\n\nThe **TD** is safe.\n\nQualification relevant: yes\n\n"
+        "# TD_SYS_REQ_middle\n\nThe **TD** checks.\n\nDerived from:\n\n- TD_STK_REQ_safe\n\n"
+        "# TD_SW_REQ_deep\n\nThe **TD** software guesses.\n\nRealises:\n\n- TD_SYS_REQ_middle\n\n"
+        "Qualification relevant: no\n",
+    )
+    spec_elements = gather_all_elements("TD", md_file)
+    config = {"transitives": ["TQP relevant"]}
+    expected = [f"TD_SW_REQ_deep in {md_file} traces to TD_STK_REQ_safe"]
+
+    def conflicts(**kwargs: Any) -> list[str]:  # noqa: ANN401
+        lines: list[str] = []
+        render_issues_with_elements(spec_elements, config=config, render_function=lines.append, **kwargs)
+        return [line.strip() for line in lines if "traces to" in line]
+
+    assert conflicts() == expected
+    assert conflicts(variants=related_variants({"StakeholderRequirement"})) == expected
+    assert conflicts(focus={"TD_STK_REQ_safe", "TD_SYS_REQ_middle"}) == expected
+    assert conflicts(focus={"TD_SW_REQ_deep"}) == expected
+    assert conflicts(variants={"StakeholderNeed"}) == []
+
+
+def test_transitive_flags_unknown(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """Test flags which cannot be applied transitively are reported and skipped."""
+    md_file = tmp_path / "specs.md"
+    md_file.write_text("# TD_STK_REQ_safe\n\nThe **TD** is safe.\n")
+    spec_elements = gather_all_elements("TD", md_file)
+    with caplog.at_level(logging.WARNING, logger="spicy.review"):
+        render_issues_with_elements(spec_elements, config={"transitives": ["Inputs"]}, render_function=print)
+    assert "Cannot apply Inputs transitively" in caplog.text
@@ -0,0 +1,158 @@
+"""Test the daemon keeping the specs warm."""
+
+import shutil
+import socket
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from spicy import entry_point, serve
+from spicy.entry_point import run
+from spicy.serve import SpecServer, serve_specs
+from spicy.serve_client import send_request, socket_path_for
+
+
+def _start_daemon(spec_path: Path, socket_path: Path) -> threading.Thread:
+    """Start serving the specs, returning once the daemon answers."""
+    thread = threading.Thread(
+        target=serve_specs,
+        args=(spec_path, "TD"),
+        kwargs={"config": {}, "socket_path": socket_path},
+    )
+    thread.start()
+    deadline = time.monotonic() + 30
+    while send_request(socket_path, {"command": "ping"}, timeout=1.0) is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return thread
+
+
+def test_spec_server_handle(test_data_path: Path, tmp_path: Path, touch_later: Callable[[Path], None]) -> None:
+    """Test checks are answered from the warm workspace, and only re-checked after a change."""
+    work_dir = tmp_path / "spec"
+    shutil.copytree(test_data_path / "spec", work_dir)
+    server = SpecServer(work_dir, "TD", {})
+
+    check = server.handle({"command": "check", "path": str(work_dir.resolve()), "prefix": "TD"})
+    assert check["ok"]
+    assert check["exit_code"] == 1
+    assert check["lines"]
+    assert server.handle({"command": "check"}) is check
+
+    changed_file = work_dir / "spec_sys1_stakeholder_needs.md"
+    changed_file.write_text(changed_file.read_text() + "\n## TD_STK_NEED_added_later\n")
+    touch_later(changed_file)
+    rechecked = server.handle({"command": "check"})
+    assert rechecked is not check
+    assert any("TD_STK_NEED_added_later" in line for line in rechecked["lines"])
+
+    query = server.handle({"command": "query", "name": "TD_STK_NEED_added_later"})
+    assert query["ok"]
+    assert query["variant"] == "StakeholderNeed"
+    assert query["file"] == str(changed_file)
+    assert not query["upstream"]
+
+    assert not server.handle({"command": "query", "name": "TD_STK_NEED_unknown"})["ok"]
+    assert not server.handle({"command": "check", "prefix": "OTHER"})["ok"]
+    assert not server.handle({"command": "check", "path": str(tmp_path)})["ok"]
+    assert not server.handle({"command": "unknown"})["ok"]
+    assert not server.stopping
+    assert server.handle({"command": "stop"})["ok"]
+    assert server.stopping
+
+
+def test_serve_round_trip(test_data_path: Path, tmp_path: Path) -> None:
+    """Test a run asks the daemon for the check, printing the same as a run without it."""
+    spec_path = test_data_path / "spec"
+    cache_dir = tmp_path / "cache"
+    socket_path = socket_path_for(cache_dir)
+    assert send_request(socket_path, {"command": "ping"}) is None
+
+    runner = CliRunner()
+    args = ["-p", "TD", "--cache-dir", str(cache_dir), str(spec_path)]
+    local = runner.invoke(run, ["--no-daemon", *args])
+
+    thread = _start_daemon(spec_path, socket_path)
+
+    served = runner.invoke(run, args)
+    assert served.exit_code == local.exit_code
+    assert served.stdout == local.stdout
+    assert served.stdout.splitlines() == send_request(socket_path, {"command": "check"})["lines"]
+
+    result = runner.invoke(run, ["--stop-serving", "--cache-dir", str(cache_dir)])
+    assert result.exit_code == 0
+    thread.join(timeout=30)
+    assert not thread.is_alive()
+    assert not socket_path.exists()
+
+    result = runner.invoke(run, ["--stop-serving", "--cache-dir", str(cache_dir)])
+    assert result.exit_code == 1
+
+
+def test_unreadable_replies_are_no_answer(tmp_path: Path) -> None:
+    """Test a reply which is empty, not JSON or not an object is taken as no daemon, rather than failing the run."""
+    socket_path = tmp_path / "spicy.sock"
+    replies = [b"", b"not json\n", b'{"ok": tru', b"[1, 2]\n"]
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(str(socket_path))
+        listener.listen()
+
+        def answer() -> None:
+            for reply in replies:
+                connection, _ = listener.accept()
+                with connection:
+                    connection.recv(1024)
+                    connection.sendall(reply)
+
+        thread = threading.Thread(target=answer, daemon=True)
+        thread.start()
+        for _ in replies:
+            assert send_request(socket_path, {"command": "check"}, timeout=5.0) is None
+        thread.join(timeout=5)
+
+
+def test_idle_client_is_dropped(test_data_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a client which connects and sends nothing does not keep the daemon from answering others."""
+    monkeypatch.setattr(serve._RequestHandler, "timeout", 0.2)  # noqa: SLF001
+    socket_path = socket_path_for(tmp_path / "cache")
+    thread = _start_daemon(test_data_path / "spec", socket_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as idle:
+        idle.connect(str(socket_path))
+        assert send_request(socket_path, {"command": "ping"}, timeout=5.0) is not None
+        assert send_request(socket_path, {"command": "stop"}, timeout=5.0) == {"ok": True}
+    thread.join(timeout=30)
+    assert not thread.is_alive()
+
+
+def test_config_changes_are_loaded(test_data_path: Path, tmp_path: Path) -> None:
+    """Test a change to spicy.yaml is answered with, rather than the config the daemon started with."""
+    work_dir = tmp_path / "spec"
+    shutil.copytree(test_data_path / "spec", work_dir)
+    server = SpecServer(work_dir, "TD", {})
+    assert server.handle({"command": "query", "name": "TD_STK_NEED_get_a_cookie"})["ok"]
+    check = server.handle({"command": "check"})
+
+    (work_dir / "spicy.yaml").write_text("prefix: TD\nexclude:\n  - spec_sys1_stakeholder_needs.md\n")
+    assert not server.handle({"command": "query", "name": "TD_STK_NEED_get_a_cookie"})["ok"]
+    assert server.handle({"command": "check"})["lines"] != check["lines"]
+
+    # a run without a prefix would now use the config's, which is not the one served
+    (work_dir / "spicy.yaml").write_text("prefix: OTHER\n")
+    assert not server.handle({"command": "check"})["ok"]
+    assert server.handle({"command": "check", "prefix": "TD"})["ok"]
+
+
+def test_verbose_runs_check_locally(test_data_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test a verbose run does not ask the daemon, which cannot print the run's debug output."""
+    asked: list[Path] = []
+    monkeypatch.setattr(entry_point, "check_with_daemon", lambda base_path, *_, **__: asked.append(base_path))
+    runner = CliRunner()
+    args = ["-p", "TD", "--cache-dir", str(tmp_path / "cache"), str(test_data_path / "spec")]
+    runner.invoke(run, ["-v", *args])
+    assert asked == []
+    runner.invoke(run, args)
+    assert asked == [test_data_path / "spec"]
@@ -0,0 +1,87 @@
+"""Test the run stats."""
+
+from collections import Counter
+from pathlib import Path
+
+from spicy.cache import ParseCache
+from spicy.gather import gather_spec_index, parse_spec_text
+from spicy.md_read import parse_text_to_syntax_tree, parse_text_to_tokens
+from spicy.stats import RunStats, count_nodes, parse_spec_text_with_stats, timed_phase
+
+
+def test_parse_with_stats_matches_parse(test_data_path: Path) -> None:
+    """Test parsing with stats gives the same elements, and counts the markdown nodes."""
+    spec_file = test_data_path / "spec" / "spec_sys1_stakeholder_needs.md"
+    text = spec_file.read_text()
+    elements, file_stats = parse_spec_text_with_stats("TD", text, spec_file)
+    assert [str(x) for x in elements] == [str(x) for x in parse_spec_text("TD", text, spec_file)]
+    assert file_stats.path == str(spec_file)
+    assert file_stats.bytes == len(text.encode())
+    assert file_stats.nodes["root"] == 1
+    assert file_stats.nodes["heading"] >= len(elements)
+    assert file_stats.seconds == file_stats.tokenize_seconds + file_stats.parse_seconds
+
+
+def test_count_nodes_matches_syntax_tree(test_data_path: Path) -> None:
+    """Test the nodes counted from the tokens are the nodes of the syntax tree, apart from the root."""
+    for md_file in sorted(test_data_path.glob("**/*.md")):
+        text = md_file.read_text()
+        nodes = count_nodes(parse_text_to_tokens(text))
+        nodes["root"] += 1
+        assert nodes == Counter(node.type for node in parse_text_to_syntax_tree(text).walk()), md_file
+
+
+def test_phases_add_up() -> None:
+    """Test a phase timed twice keeps the total, and no stats time nothing."""
+    stats = RunStats()
+    with stats.phase("review"):
+        pass
+    first = stats.phases["review"]
+    with timed_phase(stats, "review"):
+        pass
+    assert stats.phases["review"] >= first
+    with timed_phase(None, "review"):
+        pass
+    assert list(stats.phases) == ["review"]
+
+
+def test_gather_stats(test_data_path: Path, tmp_path: Path) -> None:
+    """Test gathering records the phases, counts and parsed files, and cached files are counted but not parsed."""
+    spec_path = test_data_path / "spec"
+    file_count = len(list(spec_path.glob("*.md")))
+    cache = ParseCache(tmp_path, "TD")
+
+    stats = RunStats()
+    spec_index = gather_spec_index("TD", [spec_path], cache=cache, stats=stats)
+    assert list(stats.phases) == ["read", "parse", "link"]
+    assert stats.counts["files"] == stats.counts["parsed_files"] == len(stats.files) == file_count
+    assert stats.counts["specs"] == len(spec_index.elements) == sum(stats.variants.values())
+    assert stats.counts["links"] == sum(len(x) for spec in spec_index.elements for x in spec.expected_links.values())
+
+    top_files = 2
+    data = stats.to_dict(top_files=top_files)
+    assert len(data["slowest_files"]) == top_files
+    assert data["slowest_files"][0]["tokenize_seconds"] + data["slowest_files"][0]["parse_seconds"] >= (
+        data["slowest_files"][1]["tokenize_seconds"] + data["slowest_files"][1]["parse_seconds"]
+    )
+    report = stats.report(top_files=top_files)
+    assert "Slowest 2 files:" in report
+    assert f"\tfiles: {file_count}" in report
+
+    stats = RunStats()
+    gather_spec_index("TD", [spec_path], cache=cache, stats=stats)
+    assert (stats.counts["files"], stats.counts["parsed_files"], stats.files) == (file_count, 0, [])
+
+
+def test_skipped_files_are_counted(test_data_path: Path, tmp_path: Path) -> None:
+    """Test files with no specs in them are counted, but neither parsed nor cached."""
+    spec_file = test_data_path / "spec" / "spec_sys1_stakeholder_needs.md"
+    prose = tmp_path / "prose.md"
+    prose.write_text("# Introduction\n\nNothing to see here.\n")
+    cache = ParseCache(tmp_path / "cache", "TD")
+
+    stats = RunStats()
+    gather_spec_index("TD", [spec_file, prose], cache=cache, stats=stats)
+    assert (stats.counts["files"], stats.counts["parsed_files"], stats.counts["skipped_files"]) == (2, 1, 1)
+    assert [file_stats.path for file_stats in stats.files] == [str(spec_file)]
+    assert cache.misses == 1
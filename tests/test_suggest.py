@@ -0,0 +1,46 @@
+"""Test the suggest.py module."""
+
+import pytest
+
+from spicy.md_link_check import closest_string
+from spicy.suggest import SuggestionIndex, trigrams
+
+NAMES = [f"PRE_{kind}_{topic}" for kind in ["SW_REQ", "SYS_REQ", "SW_UNIT"] for topic in ["cookie", "milk", "oven"]]
+
+
+def test_trigrams() -> None:
+    """Test trigrams are padded so even short names have some."""
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+    assert trigrams("ABC") == trigrams("abc")
+
+
+@pytest.mark.parametrize(
+    "needle",
+    ["PRE_SW_REQ_cookies", "PRE_SYS_REQ_milky", "PRE_SW_UNT_oven", "PRE_SW_REQ", "cookie", "x"],
+)
+def test_closest_matches_full_comparison(needle: str) -> None:
+    """Test the shortlist finds the same best match as comparing against every name."""
+    index = SuggestionIndex(NAMES)
+    assert index.closest(needle) == closest_string(needle, NAMES)
+
+
+def test_suggest() -> None:
+    """Test suggestions are ordered best first, and nothing is suggested from no names."""
+    index = SuggestionIndex(NAMES + NAMES)
+    assert len(index) == len(NAMES)
+    first, second = index.suggest("PRE_SW_REQ_milk_", count=2)
+    assert first == "PRE_SW_REQ_milk"
+    assert second != first
+
+    assert SuggestionIndex([]).closest("PRE_SW_REQ_milk") == ""
+
+
+def test_closest_matches_full_comparison_on_many_names() -> None:
+    """Test names differing only in trigrams common to many names, like the spec type, are told apart."""
+    kinds = ["STK_NEED", "SYS_REQ", "SYS_ELEM", "SW_REQ", "SW_ARCH", "SW_COMP", "SW_UNIT", "SW_UNIT_TEST"]
+    names = [f"PRE_{kind}_spec_{number:06d}" for kind in kinds for number in range(250)]
+    index = SuggestionIndex(names)
+    needles = [f"PRE_{kind}_spec_{number:06d}_missing" for kind in kinds for number in (7,)]
+    needles += ["PRE_SW_UNT_spec_000042", "PRE_SYS_REQ_spec_00099", "pre_sw_comp_spec_000249"]
+    for needle in needles:
+        assert index.closest(needle) == closest_string(needle, names), needle
@@ -0,0 +1,50 @@
+"""Test the traceability graph."""
+
+from pathlib import Path
+
+from spicy.gather import gather_all_elements
+from spicy.parser.spec_element import SpecElement
+from spicy.parser.spec_index import SpecIndex
+from spicy.traceability import NO_NODE, TraceGraph
+
+
+def make_graph(links: list[list[int]]) -> TraceGraph:
+    """Return a graph of anonymous specs with the given upstream links."""
+    elements = [
+        SpecElement(f"TD_SYS_REQ_{node}", "SystemRequirement", node, Path("specs.md")) for node in range(len(links))
+    ]
+    return TraceGraph(elements, links)
+
+
+def test_reachability() -> None:
+    """Test the upstream and downstream specs are found through any number of links."""
+    # 3 -> 1 -> 0, 2 -> 0, 4 alone
+    graph = make_graph([[], [0], [0], [1, 1], []])
+    assert (len(graph), graph.link_count) == (5, 3)
+    assert graph.upstream("TD_SYS_REQ_3") == {"TD_SYS_REQ_1", "TD_SYS_REQ_0"}
+    assert graph.downstream("TD_SYS_REQ_0") == {"TD_SYS_REQ_1", "TD_SYS_REQ_2", "TD_SYS_REQ_3"}
+    assert graph.downstream("TD_SYS_REQ_4") == set()
+    assert list(graph.reachable([1, 2])) == [1, 0, 0, 0, 0]
+
+
+def test_propagate() -> None:
+    """Test a flag reaches everything downstream, naming where it came from."""
+    graph = make_graph([[], [0], [1], [], [3]])
+    assert list(graph.propagate([0, 3])) == [0, 0, 0, 3, 3]
+    assert list(graph.propagate([1], downstream=False)) == [1, 1, NO_NODE, NO_NODE, NO_NODE]
+
+
+def test_closure_with_cycle() -> None:
+    """Test the closure of a graph where some specs trace to each other."""
+    # 0 -> 1 -> 2 -> 1, 3 -> 0
+    graph = make_graph([[1], [2], [1], [0]])
+    assert sorted(sorted(component) for component in graph.components()) == [[0], [1, 2], [3]]
+    assert graph.closure() == [0b0110, 0b0110, 0b0110, 0b0111]
+
+
+def test_from_spec_index(test_data_path: Path) -> None:
+    """Test the graph follows the required links of the gathered specs."""
+    spec_elements = gather_all_elements("TD", test_data_path / "linkage" / "system_requirement_to_system_element.md")
+    graph = TraceGraph.from_spec_index(SpecIndex(spec_elements))
+    assert graph.upstream("TD_SYS_ELEMENT_operations_terminal") == {"TD_SYS_REQ_bag_ordering"}
+    assert graph.downstream("TD_SYS_REQ_bag_ordering") == {"TD_SYS_ELEMENT_operations_terminal"}
@@ -0,0 +1,93 @@
+"""Test the watch mode."""
+
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from spicy.parser.spec_utils import related_variants
+from spicy.watch import FileWatcher, Workspace, watch_specs
+
+
+def test_file_watcher_poll(tmp_path: Path, touch_later: Callable[[Path], None]) -> None:
+    """Test the watcher reports added, modified and removed files."""
+    first = tmp_path / "first.md"
+    first.write_text("# TD_STK_NEED_first\n")
+    watcher = FileWatcher([tmp_path])
+    assert watcher.files == [first]
+    assert not watcher.poll()
+
+    second = tmp_path / "sub" / "second.md"
+    second.parent.mkdir()
+    second.write_text("# TD_STK_NEED_second\n")
+    assert watcher.poll() == {second}
+
+    first.write_text("# TD_STK_NEED_first_changed\n")
+    touch_later(first)
+    assert watcher.poll() == {first}
+
+    second.unlink()
+    assert watcher.poll() == {second}
+    assert not watcher.poll()
+
+
+def test_workspace_update(test_data_path: Path, tmp_path: Path) -> None:
+    """Test only the changed file is re-parsed, and the affected variants are reported."""
+    work_dir = tmp_path / "spec"
+    shutil.copytree(test_data_path / "spec", work_dir)
+    workspace = Workspace("TD")
+    workspace.load(sorted(work_dir.glob("*.md")))
+    element_count = len(workspace.elements)
+    unchanged = {id(element) for element in workspace.elements}
+
+    changed_file = work_dir / "spec_sys1_stakeholder_needs.md"
+    changed_file.write_text(changed_file.read_text() + "\n## TD_STK_NEED_added_later\n")
+    variants = workspace.update({changed_file})
+
+    assert len(workspace.elements) == element_count + 1
+    assert workspace.spec_index.find("TD_STK_NEED_added_later")
+    assert variants == related_variants({"StakeholderNeed"})
+    assert "StakeholderRequirement" in variants
+    assert "SoftwareUnit" not in variants
+    reparsed = [element for element in workspace.elements if id(element) not in unchanged]
+    assert {element.file_path for element in reparsed} == {changed_file}
+
+    changed_file.unlink()
+    workspace.update({changed_file})
+    assert not workspace.spec_index.find("TD_STK_NEED_added_later")
+
+
+def test_watch_specs(
+    positive_test_data_path: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    touch_later: Callable[[Path], None],
+) -> None:
+    """Test the watch loop reports the initial state, then only reports again after a change."""
+    work_dir = tmp_path / "positive"
+    shutil.copytree(positive_test_data_path, work_dir)
+    spec_file = work_dir / "complete_spec.md"
+    sleeps: list[float] = []
+
+    def fake_sleep(interval: float) -> None:
+        sleeps.append(interval)
+        if len(sleeps) == 2:  # noqa: PLR2004
+            spec_file.write_text(spec_file.read_text() + "\n## POS_SYS_REQ_added_later\n")
+            touch_later(spec_file)
+
+    monkeypatch.setattr("spicy.watch.time.sleep", fake_sleep)
+    lines: list[str] = []
+    watch_specs(
+        [work_dir],
+        "POS",
+        config={},
+        base_path=work_dir,
+        render_function=lines.append,
+        interval=0,
+        max_cycles=3,
+    )
+    assert len(sleeps) == 3  # noqa: PLR2004
+    assert lines[0].startswith("No issues found with any of the"), lines
+    assert lines[1] == f"Changed: {spec_file}", lines
+    assert any("POS_SYS_REQ_added_later" in line for line in lines[2:]), lines